@@ -0,0 +1,2 @@
+from .corpus_generator import generate_corpus, generate_document
+from .throughput_benchmark import run_benchmark, compare_results
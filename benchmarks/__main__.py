@@ -0,0 +1,63 @@
+import json
+import argparse
+from benchmarks import generate_corpus, run_benchmark, compare_results
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                              description="Generates synthetic corpora and benchmarks the pipeline.")
+    commands = argument_parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Generate a synthetic corpus.")
+    generate.add_argument("--output", required=True, help="The directory the documents are written into.")
+    generate.add_argument("--files", type=int, default=10000)
+    generate.add_argument("--columns", type=int, default=5)
+    generate.add_argument("--rows", type=int, default=10)
+    generate.add_argument("--header-error-rate", type=float, default=0.0)
+    generate.add_argument("--date-error-rate", type=float, default=0.0)
+    generate.add_argument("--sum-error-rate", type=float, default=0.0)
+    generate.add_argument("--seed", type=int, default=0)
+
+    run = commands.add_parser("run", help="Benchmark the pipeline over a corpus.")
+    run.add_argument("--corpus", required=True, help="The directory of the documents.")
+    run.add_argument("--parser", default="html-fast", help="The registered parser type.")
+    run.add_argument("--db", default="memory", help="The registered db manager type.")
+    run.add_argument("--limit", type=int, default=None, help="The maximum amount of files to run.")
+    run.add_argument("--output", default=None, help="A json file to write the results into.")
+
+    compare = commands.add_parser("compare", help="Compare two benchmark results.")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+
+    arguments = argument_parser.parse_args()
+
+    if arguments.command == "generate":
+        result = generate_corpus(arguments.output,
+                                 files=arguments.files,
+                                 columns=arguments.columns,
+                                 rows=arguments.rows,
+                                 header_error_rate=arguments.header_error_rate,
+                                 date_error_rate=arguments.date_error_rate,
+                                 sum_error_rate=arguments.sum_error_rate,
+                                 seed=arguments.seed)
+    elif arguments.command == "run":
+        result = run_benchmark(arguments.corpus, parser_type=arguments.parser, db_type=arguments.db,
+                               limit=arguments.limit)
+
+        if arguments.output:
+            with open(arguments.output, 'w') as f:
+                json.dump(result, f, indent=4)
+    else:
+        with open(arguments.baseline, 'r') as f:
+            baseline = json.load(f)
+
+        with open(arguments.current, 'r') as f:
+            current = json.load(f)
+
+        result = compare_results(baseline, current)
+
+    print(json.dumps(result, indent=4))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+import os
+import json
+import random
+from datetime import datetime, timedelta
+from consts import YEAR, MONTH, DAY, HEADER_MAX_LENGTH, MAX_ROW_SUM
+
+FIRST_NAMES = ["Daniel", "Shane", "Nicole", "Kristin", "Amanda", "Robert", "Maria", "James", "Linda", "Michael"]
+LAST_NAMES = ["Brown", "Barnes", "Carpenter", "Duarte", "Gray", "Jones", "Fletcher", "Dean", "Sawyer", "Martin"]
+COMPANIES = ["LLC", "PLC", "Group", "Inc", "and Sons", "Ltd"]
+COUNTRIES = ["Chad", "Peru", "Norway", "Japan", "Kenya", "Chile", "Nepal", "Oman", "Italy", "Ghana"]
+OCCUPATIONS = ["Loss adjuster, chartered", "Clinical research associate", "Geologist", "Tax adviser", "Actuary"]
+CELL_STYLES = ["font-weight:bold", "font-style:italic", "font-weight:bold; font-style:italic"]
+CORPUS_INFO_FILE = "corpus.json"
+
+
+def _person(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _header_cells(rng: random.Random, columns: int, invalid: bool) -> list:
+    """Builds header cells whose concatenated text is within HEADER_MAX_LENGTH, or over it if invalid.
+    """
+
+    budget = max(1, int(HEADER_MAX_LENGTH) // columns - 2)
+    cells = [" "] + [f" {_person(rng)[:budget]} " for _ in range(columns - 1)]
+
+    if invalid:
+        cells[-1] = f" {'Header overflow ' * (int(HEADER_MAX_LENGTH) // 16 + 1)}"
+
+    return cells
+
+
+def _first_row_values(rng: random.Random, values: int, invalid: bool) -> list:
+    """Builds the numeric values of the first row, summing to at most MAX_ROW_SUM or over it if invalid.
+    """
+
+    share = int(MAX_ROW_SUM) // values
+
+    if invalid:
+        return [rng.randint(share + 1, share * 2 + 1) for _ in range(values)]
+
+    return [rng.randint(0, share) for _ in range(values)]
+
+
+def _creation_date(rng: random.Random, invalid: bool) -> datetime:
+    """Builds a creation date up to the maximum valid date, or after it if invalid.
+    """
+
+    max_date = datetime(int(YEAR), int(MONTH), int(DAY))
+    offset = timedelta(days=rng.randint(1, 20 * 365))
+
+    return max_date + offset if invalid else max_date - offset
+
+
+def generate_document(rng: random.Random,
+                      index: int,
+                      columns: int = 5,
+                      rows: int = 10,
+                      header_error: bool = False,
+                      date_error: bool = False,
+                      sum_error: bool = False) -> str:
+    """Builds a single table document in the format of documents/*_table.html.
+
+    Args:
+        rng: The random generator to draw the content from.
+        index: The index of the document, makes its id unique.
+        columns: The amount of columns of the table, the first one holds the row names.
+        rows: The amount of body rows.
+        header_error: Whether the header is too long.
+        date_error: Whether the creation date is after the maximum date.
+        sum_error: Whether the first row sums to more than MAX_ROW_SUM.
+
+    Returns:
+        The html of the document.
+    """
+
+    occupation = rng.choice(OCCUPATIONS)
+    table_id = f"Table{index}{''.join(char for char in occupation if char.isalnum())}"
+    lines = [f'<table id="{table_id}">', f"<caption>Table {index} {occupation}</caption>", "<thead>", "<tr>"]
+    lines += [f"<th>{cell}</th>" for cell in _header_cells(rng, columns, header_error)]
+    lines += ["</tr>", "</thead>", "<tbody>"]
+
+    for row in range(rows):
+        values = _first_row_values(rng, columns - 1, sum_error) if row == 0 else \
+            [rng.randint(0, 2000) for _ in range(columns - 1)]
+        lines += ["<tr>", f'<td align="left" style="font-weight:bold"> {rng.choice(LAST_NAMES)} '
+                          f'{rng.choice(COMPANIES)} </td>']
+        lines += [f'<td align="left" style="{rng.choice(CELL_STYLES)}"> {value} </td>' for value in values]
+        lines += ["</tr>"]
+
+    creation_date = _creation_date(rng, date_error)
+    lines += [f"</tbody><tfoot><tr><td>Creation: {creation_date.day}{creation_date.strftime('%b%Y')} "
+              f"{rng.choice(COUNTRIES)}</td></tr></tfoot>", "</table>"]
+
+    return "\n".join(lines) + "\n"
+
+
+def generate_corpus(output_dir: str,
+                    files: int = 10000,
+                    columns: int = 5,
+                    rows: int = 10,
+                    header_error_rate: float = 0.0,
+                    date_error_rate: float = 0.0,
+                    sum_error_rate: float = 0.0,
+                    seed: int = 0) -> dict:
+    """Writes a synthetic corpus of table documents, the same seed always generates the same corpus.
+    The settings are kept next to the documents in corpus.json, so benchmark results can report them.
+
+    Args:
+        output_dir: The directory the documents are written into, it is created if it does not exist.
+        files: The amount of documents.
+        columns: The amount of columns of every table.
+        rows: The amount of body rows of every table.
+        header_error_rate: The fraction of documents whose header is too long.
+        date_error_rate: The fraction of documents whose creation date is after the maximum date.
+        sum_error_rate: The fraction of documents whose first row sums to more than the maximum.
+        seed: The seed of the random generator.
+
+    Returns:
+        The settings of the corpus.
+    """
+
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+
+    for index in range(files):
+        document = generate_document(rng, index, columns, rows,
+                                     header_error=rng.random() < header_error_rate,
+                                     date_error=rng.random() < date_error_rate,
+                                     sum_error=rng.random() < sum_error_rate)
+
+        with open(os.path.join(output_dir, f"{index}_table.html"), 'w') as f:
+            f.write(document)
+
+    corpus_info = {"files": files, "columns": columns, "rows": rows, "header_error_rate": header_error_rate,
+                   "date_error_rate": date_error_rate, "sum_error_rate": sum_error_rate, "seed": seed}
+
+    with open(os.path.join(output_dir, CORPUS_INFO_FILE), 'w') as f:
+        json.dump(corpus_info, f)
+
+    return corpus_info
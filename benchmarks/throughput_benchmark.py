@@ -0,0 +1,158 @@
+import os
+import sys
+import json
+import platform
+import resource
+import subprocess
+from glob import iglob
+from time import perf_counter_ns
+from datetime import datetime, timezone
+from parsers import parser_wrapper
+from benchmarks.corpus_generator import CORPUS_INFO_FILE
+
+STAGES = ("read", "parse", "extract", "validate", "write")
+PARSER_ARGUMENTS = {"id_tag": "table",
+                    "title_tag": "caption",
+                    "head_tag": "thead",
+                    "body_tag": "tbody",
+                    "footer_tag": "tfoot",
+                    "extract_country_and_date_from_footer": True,
+                    "country_date_regex": r"Creation: (\d{1,2}[A-Za-z]{3}\d{4}) ([A-Za-z]+)",
+                    "date_format": "%d%b%Y"}
+
+
+def current_rss_mb() -> float:
+    """Returns the resident memory of the process, falling back to its peak where /proc is not available.
+    """
+
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 10
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def stage_statistics(latencies_ns: list, extra_ns: int, peak_rss_mb: float) -> dict:
+    latencies_ns = sorted(latencies_ns)
+    total_seconds = (sum(latencies_ns) + extra_ns) / 1e9
+
+    return {"files": len(latencies_ns),
+            "total_seconds": round(total_seconds, 6),
+            "files_per_second": round(len(latencies_ns) / total_seconds, 2) if total_seconds else None,
+            "p50_ms": round(percentile(latencies_ns, 0.50) / 1e6, 4),
+            "p99_ms": round(percentile(latencies_ns, 0.99) / 1e6, 4),
+            "peak_rss_mb": round(peak_rss_mb, 2)}
+
+
+def timed_stage(stage: str, latencies: dict, peak_rss: dict, func, *args, **kwargs):
+    """Runs a stage of a single file, adds its latency to latencies and the resident memory after it to peak_rss.
+
+    Returns:
+        The result of the stage.
+    """
+
+    start = perf_counter_ns()
+    result = func(*args, **kwargs)
+    latencies[stage].append(perf_counter_ns() - start)
+    peak_rss[stage] = max(peak_rss[stage], current_rss_mb())
+
+    return result
+
+
+def run_benchmark(corpus_dir: str,
+                  parser_type: str = "html-fast",
+                  db_type: str = "memory",
+                  limit: int | None = None,
+                  **parser_kwargs) -> dict:
+    """Runs every file of a corpus through each stage of the pipeline, one stage after the other on a single thread,
+    timing every stage of every file. The resident memory is sampled after every stage of every file, outside of the
+    timed part.
+
+    Args:
+        corpus_dir: A directory of documents, e.g. one written by `generate_corpus`.
+        parser_type: The registered parser to benchmark.
+        db_type: The registered DBManager the write stage writes into, "memory" needs no network access.
+        limit: The maximum amount of files to run, all of them if None.
+        parser_kwargs: Overrides of the parser's arguments.
+
+    Returns:
+        The results, with the files per second, p50/p99 latency and peak resident memory of every stage and of the
+        whole pipeline, along with the commit, platform and corpus settings they were measured with.
+    """
+
+    parser = parser_wrapper.get_parser(parser_type, **{**PARSER_ARGUMENTS, "db_type": db_type, **parser_kwargs})
+    batcher = parser.create_batcher(summary=None)
+    latencies = {stage: [] for stage in STAGES}
+    peak_rss = {stage: 0.0 for stage in STAGES}
+    files = 0
+
+    for file_name in iglob(os.path.join(corpus_dir, "*.html")):
+        if limit is not None and files >= limit:
+            break
+
+        content = timed_stage("read", latencies, peak_rss, parser.read_file, file_name)
+        parser.html_document = timed_stage("parse", latencies, peak_rss, parser.load_document, content)
+        page_data = timed_stage("extract", latencies, peak_rss, parser.extract_page)
+        discrepancies = timed_stage("validate", latencies, peak_rss, parser.find_discrepancies, parser.document_view)
+        timed_stage("write", latencies, peak_rss, parser.write_page, page_data, discrepancies, batcher=batcher)
+
+        files += 1
+
+    close_start = perf_counter_ns()
+    batcher.close()
+    close_ns = perf_counter_ns() - close_start
+
+    end_to_end = [sum(latencies[stage][i] for stage in STAGES) for i in range(files)]
+    corpus_info_path = os.path.join(corpus_dir, CORPUS_INFO_FILE)
+    corpus_info = None
+
+    if os.path.exists(corpus_info_path):
+        with open(corpus_info_path, 'r') as f:
+            corpus_info = json.load(f)
+
+    return {"commit": current_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "parser_type": parser_type,
+            "db_type": db_type,
+            "corpus": corpus_info,
+            "stages": {stage: stage_statistics(latencies[stage], close_ns if stage == "write" else 0, peak_rss[stage])
+                       for stage in STAGES},
+            "end_to_end": stage_statistics(end_to_end, close_ns, max(peak_rss.values()))}
+
+
+def compare_results(baseline: dict, current: dict) -> dict:
+    """Compares two benchmark results stage by stage.
+
+    Returns:
+        The ratio of the current to the baseline files per second of every stage and of the whole pipeline, above 1
+        means the current run is faster.
+    """
+
+    comparison = {}
+    stages = {**{stage: (baseline["stages"][stage], current["stages"][stage]) for stage in STAGES},
+              "end_to_end": (baseline["end_to_end"], current["end_to_end"])}
+
+    for stage, (before, after) in stages.items():
+        if before["files_per_second"] and after["files_per_second"]:
+            comparison[stage] = round(after["files_per_second"] / before["files_per_second"], 3)
+        else:
+            comparison[stage] = None
+
+    return comparison
@@ -1,6 +1,36 @@
-from dotenv import load_dotenv
+import os
 
-load_dotenv()
 
-from .mongo import MONGODB_URI, DB_NAME
+def _find_env_file() -> str | None:
+    """Looks for a .env file from this package up to the root, like `dotenv.find_dotenv` does, so python-dotenv is
+    only imported when there is a file for it to load.
+    """
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+
+    while True:
+        if os.path.isfile(os.path.join(directory, ".env")):
+            return os.path.join(directory, ".env")
+
+        if os.path.dirname(directory) == directory:
+            return None
+
+        directory = os.path.dirname(directory)
+
+
+if env_file := _find_env_file():
+    from dotenv import load_dotenv
+
+    load_dotenv(env_file)
+
+from .mongo import (MONGODB_URI, DB_NAME, MONGODB_MAX_POOL_SIZE, MONGODB_MIN_POOL_SIZE, MONGODB_MAX_IDLE_TIME_MS,
+                    MONGODB_CONNECT_TIMEOUT_MS, MONGODB_SERVER_SELECTION_TIMEOUT_MS, MONGODB_SOCKET_TIMEOUT_MS)
 from .default_validation_values import YEAR, MONTH, DAY, HEADER_MAX_LENGTH, MAX_ROW_SUM
+from .default_parser_values import (MAX_WORKERS, QUEUE_SIZE, CHUNK_SIZE, WATCH_POLL_INTERVAL, WATCH_SETTLE_TIME,
+                                    WATCH_BATCH_WINDOW, WATCH_MAX_BATCH_SIZE, STREAM_BLOCK_SIZE, DEDUP_EXPECTED_TABLES,
+                                    DEDUP_FALSE_POSITIVE_RATE, LEASE_BATCH_SIZE, LEASE_SECONDS, LEASE_HEARTBEAT_INTERVAL,
+                                    LEASE_POLL_INTERVAL, PROFILE_TOP_N, PROFILE_SAMPLE_EVERY, PROFILE_TRACE_MEMORY)
+from .default_db_values import (WRITE_BATCH_SIZE, WRITE_FLUSH_INTERVAL, SQLITE_PATH, SQLITE_BUSY_TIMEOUT,
+                                FIND_BATCH_SIZE, SLOW_QUERY_SECONDS, SPOOL_SEGMENT_SIZE, SPOOL_RETRY_INITIAL_DELAY,
+                                SPOOL_RETRY_MAX_DELAY, SPOOL_CLOSE_TIMEOUT,
+                                SPOOL_DRAIN_TIMEOUT)
@@ -0,0 +1,13 @@
+import os
+
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", 500))
+WRITE_FLUSH_INTERVAL = float(os.getenv("WRITE_FLUSH_INTERVAL", 1.0))
+SQLITE_PATH = os.getenv("SQLITE_PATH", "beaconcure.db")
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", 30))
+FIND_BATCH_SIZE = int(os.getenv("FIND_BATCH_SIZE", 1000))
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", 0.5))
+SPOOL_SEGMENT_SIZE = int(os.getenv("SPOOL_SEGMENT_SIZE", 64 * 1024 * 1024))
+SPOOL_RETRY_INITIAL_DELAY = float(os.getenv("SPOOL_RETRY_INITIAL_DELAY", 0.1))
+SPOOL_RETRY_MAX_DELAY = float(os.getenv("SPOOL_RETRY_MAX_DELAY", 30))
+SPOOL_CLOSE_TIMEOUT = float(os.getenv("SPOOL_CLOSE_TIMEOUT", 30))
+SPOOL_DRAIN_TIMEOUT = float(os.getenv("SPOOL_DRAIN_TIMEOUT", 30))
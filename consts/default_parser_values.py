@@ -0,0 +1,19 @@
+import os
+
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+QUEUE_SIZE = int(os.getenv("QUEUE_SIZE", 64))
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 16))
+WATCH_POLL_INTERVAL = float(os.getenv("WATCH_POLL_INTERVAL", 0.5))
+WATCH_SETTLE_TIME = float(os.getenv("WATCH_SETTLE_TIME", 0.25))
+WATCH_BATCH_WINDOW = float(os.getenv("WATCH_BATCH_WINDOW", 0.05))
+WATCH_MAX_BATCH_SIZE = int(os.getenv("WATCH_MAX_BATCH_SIZE", 256))
+STREAM_BLOCK_SIZE = int(os.getenv("STREAM_BLOCK_SIZE", 1024 * 1024))
+DEDUP_EXPECTED_TABLES = int(os.getenv("DEDUP_EXPECTED_TABLES", 10_000_000))
+DEDUP_FALSE_POSITIVE_RATE = float(os.getenv("DEDUP_FALSE_POSITIVE_RATE", 0.001))
+LEASE_BATCH_SIZE = int(os.getenv("LEASE_BATCH_SIZE", 100))
+LEASE_SECONDS = float(os.getenv("LEASE_SECONDS", 60))
+LEASE_HEARTBEAT_INTERVAL = float(os.getenv("LEASE_HEARTBEAT_INTERVAL", 15))
+LEASE_POLL_INTERVAL = float(os.getenv("LEASE_POLL_INTERVAL", 5))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", 20))
+PROFILE_SAMPLE_EVERY = int(os.getenv("PROFILE_SAMPLE_EVERY", 1))
+PROFILE_TRACE_MEMORY = os.getenv("PROFILE_TRACE_MEMORY", "1") not in ("0", "false", "False")
@@ -1,5 +1,10 @@
+from importlib import import_module
 from .db_factory import DBFactory
+from .indexes import Index, COLLECTION_INDEXES
 from .db_manager import DBManager
+from .write_batcher import WriteBatcher
+from .write_spool import WriteSpool
+from .discrepancy_analytics import DiscrepancyAnalytics
 
 manager_factory = DBFactory()
 
@@ -13,4 +18,17 @@ def register_db_manager(db_type: str):
     return decorator
 
 
-from .mongodb import MongoDBManager
+manager_factory.register_module("mongo", "data_layer.mongodb.mongodb_manager")
+manager_factory.register_module("memory", "data_layer.memory.memory_manager")
+manager_factory.register_module("sqlite", "data_layer.sqlite.sqlite_manager")
+
+LAZY_ATTRIBUTES = {"MongoDBManager": "data_layer.mongodb",
+                   "MemoryDBManager": "data_layer.memory",
+                   "SQLiteDBManager": "data_layer.sqlite"}
+
+
+def __getattr__(name: str):
+    if name in LAZY_ATTRIBUTES:
+        return getattr(import_module(LAZY_ATTRIBUTES[name]), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
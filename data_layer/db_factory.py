@@ -1,15 +1,40 @@
+from importlib import import_module
 from data_layer.db_manager import DBManager
 
 
 class DBFactory:
     def __init__(self):
         self._managers = {}
+        self._modules = {}
 
     def register_manager(self, db_type: str, db_manager: DBManager):
         self._managers[db_type] = db_manager
 
-    def get_manager(self, db_type: str, *args, **kwargs) -> DBManager:
+    def register_module(self, db_type: str, module_name: str):
+        """Registers the module that implements a db type by name, the module (and the driver it depends on) is only
+        imported once the db type is first requested, where it registers its class through `register_db_manager`.
+        """
+
+        self._modules[db_type] = module_name
+
+    @property
+    def db_types(self) -> list:
+        return sorted(self._managers.keys() | self._modules.keys())
+
+    def get_manager_class(self, db_type: str) -> type:
+        """Returns the class registered for db_type, importing its module first if it was registered by name.
+
+        Raises:
+            ValueError: If nothing is registered for db_type.
+        """
+
+        if db_type not in self._managers and db_type in self._modules:
+            import_module(self._modules[db_type])
+
         if db_type in self._managers:
-            return self._managers[db_type](*args, **kwargs)
+            return self._managers[db_type]
 
         raise ValueError(f"Unknown db type: {db_type}")
+
+    def get_manager(self, db_type: str, *args, **kwargs) -> DBManager:
+        return self.get_manager_class(db_type)(*args, **kwargs)
@@ -1,9 +1,79 @@
+from uuid import uuid4
+from functools import wraps
+from time import perf_counter
+from typing import Iterator
 from abc import ABC, abstractmethod
+from consts import FIND_BATCH_SIZE, SLOW_QUERY_SECONDS
+from instrumentation import metrics, get_logger
+from data_layer.indexes import Index, COLLECTION_INDEXES
+
+logger = get_logger("data_layer")
+
+INSTRUMENTED_OPERATIONS = ("insert", "find", "update", "delete", "replace", "upsert", "aggregate")
+
+db_operation_seconds = metrics.histogram("db_operation_seconds", "Latency of every db operation.")
+db_operation_errors = metrics.counter("db_operation_errors_total", "DB operations that failed.")
+db_operations_in_flight = metrics.gauge("db_operations_in_flight", "DB operations that are currently running.")
+db_slow_operations = metrics.counter("db_slow_operations_total", "DB operations slower than SLOW_QUERY_SECONDS.")
+
+
+def instrument_operation(func, backend: str):
+    """Wraps a db operation so its latency, failures and concurrency are recorded under its backend's name.
+    Operations slower than SLOW_QUERY_SECONDS are logged along with their collection and query.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        db_operations_in_flight.inc(backend=backend)
+        start = perf_counter()
+
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            duration = perf_counter() - start
+            db_operation_seconds.observe(duration, backend=backend, operation=func.__name__)
+            db_operations_in_flight.dec(backend=backend)
+
+            if duration > SLOW_QUERY_SECONDS:
+                collection_name = kwargs.get("collection_name", args[1] if len(args) > 1 else None)
+                query = kwargs.get("query", args[2] if len(args) > 2 and func.__name__ != "insert" else None)
+                db_slow_operations.inc(backend=backend, operation=func.__name__, collection=collection_name)
+                logger.warning("Slow %s %s on %s took %.3fs, query: %s", backend, func.__name__, collection_name,
+                               duration, query)
+
+        if result is None or result is False:
+            db_operation_errors.inc(backend=backend, operation=func.__name__)
+
+        return result
+
+    wrapper.instrumented = True
+
+    return wrapper
 
 
 class DBManager(ABC):
     def __init__(self, *args, **kwargs):
-        pass
+        """The base of every db manager, it declares the indexes the collections need and each implementation
+        creates them in its own way.
+
+        Args:
+            indexes: Lists of Index by collection name, defaults to COLLECTION_INDEXES.
+        """
+
+        self.indexes: dict = kwargs.get("indexes", COLLECTION_INDEXES)
+
+    def __init_subclass__(cls, **kwargs):
+        """Instruments the db operations every implementation defines, so each backend reports the same metrics.
+        """
+
+        super().__init_subclass__(**kwargs)
+
+        for operation in INSTRUMENTED_OPERATIONS:
+            func = cls.__dict__.get(operation)
+
+            if func is not None and not getattr(func, "__isabstractmethod__", False) \
+                    and not getattr(func, "instrumented", False):
+                setattr(cls, operation, instrument_operation(func, backend=cls.__name__))
 
     @abstractmethod
     def connect(self):
@@ -28,3 +98,192 @@ class DBManager(ABC):
     @abstractmethod
     def disconnect(self):
         raise NotImplementedError(f"Function `disconnect` is not implemented for: {self.__class__.__name__}")
+
+    def replace(self, collection_name: str, query: dict, data: list) -> int | None:
+        """Atomically replaces the records matching a query with new records, readers see either all of the old
+        records or all of the new ones.
+
+        Args:
+            collection_name: The name of the collection.
+            query: The query of the records that are to be replaced, e.g. {"document_id": {"$in": ["1", "2"]}}.
+            data: The new records, records without an `_id` are given one.
+
+        Returns:
+            How many records were replaced, or None if nothing changed because the replacement failed.
+        """
+
+        raise NotImplementedError(f"Function `replace` is not implemented for: {self.__class__.__name__}")
+
+    def upsert(self, collection_name: str, data: list):
+        """Inserts records or replaces the stored records with the same `_id`, so writing the same records again has
+        no further effect.
+
+        Args:
+            collection_name: The name of the collection.
+            data: The records, every record must have an `_id`.
+
+        Returns:
+            An object with the `upserted_ids` of the records that were written, the others were rejected by the db,
+            e.g. by a unique index. None if the write failed as a whole and can be retried.
+        """
+
+        raise NotImplementedError(f"Function `upsert` is not implemented for: {self.__class__.__name__}")
+
+    def claim(self, collection_name: str, record_id: str, query: dict, new_data: dict) -> bool:
+        """Atomically sets fields of the record with the given `_id` if it matches a query, or inserts it if there is
+        no such record, e.g. to take over a lease that expired. Concurrent claims of the same record, from any
+        process, never both succeed while the record does not match the query after the first one.
+
+        Args:
+            collection_name: The name of the collection.
+            record_id: The `_id` of the record.
+            query: The conditions the stored record must meet, e.g. {"expires": {"$lt": 1700000000}}.
+            new_data: The fields that are set, an inserted record is built from them and the plain fields of the query.
+
+        Returns:
+            Whether the record was set or inserted, False if it did not match or the claim failed.
+        """
+
+        raise NotImplementedError(f"Function `claim` is not implemented for: {self.__class__.__name__}")
+
+    def aggregate(self, collection_name: str, pipeline: list, batch_size: int = FIND_BATCH_SIZE) -> Iterator[dict]:
+        """Runs a mongo style aggregation pipeline over a collection, on the server where the backend has one.
+
+        Args:
+            collection_name: The name of the collection the pipeline runs on.
+            pipeline: The stages of the pipeline, e.g. [{"$group": {"_id": "$country", "count": {"$sum": 1}}}].
+            batch_size: The number of results returned in every batch.
+
+        Returns:
+            An iterator over the results or None if the pipeline failed.
+        """
+
+        raise NotImplementedError(f"Function `aggregate` is not implemented for: {self.__class__.__name__}")
+
+    def generate_id(self):
+        """Generates a unique id for a record before it is inserted, so it can be referenced before it is written.
+        """
+
+        return uuid4().hex
+
+    def create_index(self, collection_name: str, index: Index) -> bool:
+        """Creates an index on a collection if it does not exist yet, backends without indexes have nothing to create.
+
+        Returns:
+            False if the index could not be created, True otherwise.
+        """
+
+        return True
+
+    def drop_index(self, collection_name: str, index: Index) -> bool:
+        """Drops an index of a collection if it exists, backends without indexes have nothing to drop.
+
+        Returns:
+            False if the index could not be dropped, True otherwise.
+        """
+
+        return True
+
+    def index_usage(self, collection_name: str) -> dict:
+        """Reports how many queries used each index of a collection since it was created or the process started.
+
+        Returns:
+            The number of uses by index name, queries that used no index are counted under "collection scan" if the
+            backend reports them.
+        """
+
+        return {}
+
+    def ensure_indexes(self, collection_names: list | None = None) -> list:
+        """Creates the declared indexes of the given collections, or of every collection, that do not exist yet.
+
+        Args:
+            collection_names: The names of the collections, defaults to every collection in self.indexes.
+
+        Returns:
+            The (collection name, index name) of every index that could not be created.
+        """
+
+        failed = []
+
+        for collection_name in collection_names or list(self.indexes):
+            for index in self.indexes.get(collection_name, []):
+                if not self.create_index(collection_name, index):
+                    failed.append((collection_name, index.name))
+
+        return failed
+
+    def drop_secondary_indexes(self, collection_names: list | None = None) -> list:
+        """Drops the declared indexes that are not unique, so a bulk load does not have to maintain them, they are
+        built in a single pass by `ensure_indexes` once the load is done. Unique indexes are kept since they guard
+        the data that is being loaded.
+
+        Args:
+            collection_names: The names of the collections, defaults to every collection in self.indexes.
+
+        Returns:
+            The (collection name, index name) of every index that could not be dropped.
+        """
+
+        failed = []
+
+        for collection_name in collection_names or list(self.indexes):
+            for index in self.indexes.get(collection_name, []):
+                if not index.unique and not self.drop_index(collection_name, index):
+                    failed.append((collection_name, index.name))
+
+        return failed
+
+    def paginate(self, collection_name: str, query: dict | None = None, page_size: int = FIND_BATCH_SIZE,
+                 key: str = "_id", projection: dict | None = None, start_after=None) -> Iterator[list]:
+        """Iterates over the results of a query page by page with keyset pagination.
+        Every page is a new query sorted by the key for the records whose key is greater than the last key of the
+        previous page, so deep pages are as fast as the first one and a scan can be resumed from the last key it saw.
+
+        Args:
+            collection_name: The name of the collection to be searched upon.
+            query: The query that is to be executed, e.g. {"country": "Chad"}.
+            page_size: The maximum number of records in a page.
+            key: A unique top level field to paginate by, it is always part of the projected records.
+            projection: The fields to include, e.g. {"document id": 1}, or to exclude, e.g. {"body": 0}.
+            start_after: The key to resume after, the scan starts from the first record if it is None.
+
+        Yields:
+            Lists of up to `page_size` records sorted by the key.
+        """
+
+        if projection:
+            if any(projection.values()):
+                projection = {**projection, key: 1}
+            else:
+                projection = {field: value for field, value in projection.items() if field != key}
+
+        while True:
+            page_query = dict(query or {})
+
+            if start_after is not None:
+                condition = page_query.get(key)
+
+                if isinstance(condition, dict) and all(operator.startswith("$") for operator in condition):
+                    condition = dict(condition)
+                else:
+                    condition = {} if key not in page_query else {"$eq": condition}
+
+                condition["$gt"] = start_after
+                page_query[key] = condition
+
+            results = self.find(collection_name, page_query, projection=projection or None, sort=[(key, 1)],
+                                limit=page_size, batch_size=page_size)
+
+            if results is None:
+                return
+
+            page = list(results)
+
+            if page:
+                yield page
+
+            if len(page) < page_size:
+                return
+
+            start_after = page[-1][key]
@@ -0,0 +1,159 @@
+from collections import Counter
+from data_layer.db_manager import DBManager
+from instrumentation import get_logger
+
+logger = get_logger("data_layer.analytics")
+
+SUMMARY_KEY = ("discrepancy_type", "country", "month")
+
+# "creation date" is stored as dd-mm-YYYY, months are reported as YYYY-MM so they sort chronologically.
+MONTH_EXPRESSION = {"$cond": [{"$ifNull": ["$creation date", False]},
+                              {"$concat": [{"$substrCP": ["$creation date", 6, 4]}, "-",
+                                           {"$substrCP": ["$creation date", 3, 2]}]},
+                              None]}
+
+
+def creation_month(creation_date: str | None) -> str | None:
+    """The client side twin of MONTH_EXPRESSION, e.g. "05-03-2021" into "2021-03".
+    """
+
+    return f"{creation_date[6:10]}-{creation_date[3:5]}" if creation_date else None
+
+
+class DiscrepancyAnalytics:
+    def __init__(self, db_manager: DBManager,
+                 discrepancy_collection: str = "html discrepancies",
+                 summary_collection: str = "discrepancy summary"):
+        """Rolls the discrepancies up on the db server with aggregation pipelines, so only the compact summaries are
+        sent back. Every discrepancy carries the "country" and "creation date" of its document, so no join with the
+        page data is needed.
+        The counts by discrepancy type, country and month can also be kept in a materialized summary collection that
+        `record` updates incrementally as discrepancies are written, so dashboards read a handful of small records
+        instead of running a rollup.
+
+        Args:
+            db_manager: A DBManager whose backend supports `aggregate`, e.g. MongoDBManager or SQLiteDBManager.
+            discrepancy_collection: The name of the collection the discrepancies are stored in.
+            summary_collection: The name of the materialized summary collection.
+        """
+
+        self.db_manager: DBManager = db_manager
+        self.discrepancy_collection: str = discrepancy_collection
+        self.summary_collection: str = summary_collection
+
+    def discrepancies_by_type_country_month(self, query: dict | None = None) -> list:
+        """Counts the discrepancies per discrepancy type per country per month.
+
+        Args:
+            query: Limits the rollup to the matching discrepancies, e.g. {"validator": "DateValidator"}.
+
+        Returns:
+            A list of {"discrepancy_type", "country", "month", "count"} sorted by month, country and type.
+        """
+
+        return list(self.db_manager.aggregate(self.discrepancy_collection, self._rollup_pipeline(query)) or [])
+
+    @staticmethod
+    def _rollup_pipeline(query: dict | None = None) -> list:
+        return [{"$match": query or {}},
+                {"$group": {"_id": {"discrepancy_type": "$discrepancy_type",
+                                    "country": "$country",
+                                    "month": MONTH_EXPRESSION},
+                            "count": {"$sum": 1}}},
+                {"$project": {"_id": 0,
+                              "discrepancy_type": "$_id.discrepancy_type",
+                              "country": "$_id.country",
+                              "month": "$_id.month",
+                              "count": 1}},
+                {"$sort": {"month": 1, "country": 1, "discrepancy_type": 1}}]
+
+    def documents_failing_validators(self, min_validators: int = 2, query: dict | None = None,
+                                     limit: int = 0) -> list:
+        """Finds the documents that more than one validator found discrepancies in.
+
+        Args:
+            min_validators: The minimal number of distinct failing validators.
+            query: Limits the search to the matching discrepancies, e.g. {"country": "Chad"}.
+            limit: The maximum number of documents to return, 0 for no limit.
+
+        Returns:
+            A list of {"document_id", "validators", "validator_count", "discrepancies"}, the documents failing the most
+            validators first.
+        """
+
+        pipeline = [{"$match": query or {}},
+                    {"$group": {"_id": "$document_id",
+                                "validators": {"$addToSet": "$validator"},
+                                "discrepancies": {"$sum": 1}}},
+                    {"$project": {"_id": 0,
+                                  "document_id": "$_id",
+                                  "validators": 1,
+                                  "validator_count": {"$size": "$validators"},
+                                  "discrepancies": 1}},
+                    {"$match": {"validator_count": {"$gte": min_validators}}},
+                    {"$sort": {"validator_count": -1, "document_id": 1}}]
+
+        if limit:
+            pipeline.append({"$limit": limit})
+
+        return list(self.db_manager.aggregate(self.discrepancy_collection, pipeline) or [])
+
+    def record(self, discrepancies: list, amount: int = 1):
+        """Adds newly written discrepancies to the materialized summary, or removes deleted ones with amount=-1.
+        Every distinct (discrepancy type, country, month) is a single atomic increment, so concurrent writers never
+        lose counts.
+
+        Args:
+            discrepancies: The discrepancy records.
+            amount: 1 for written discrepancies, -1 for deleted ones.
+        """
+
+        counts = Counter((discrepancy.get("discrepancy_type"), discrepancy.get("country"),
+                          creation_month(discrepancy.get("creation date"))) for discrepancy in discrepancies)
+
+        for key, count in counts.items():
+            if not self.db_manager.update(collection_name=self.summary_collection,
+                                          query=dict(zip(SUMMARY_KEY, key)),
+                                          update_type="$inc",
+                                          new_data={"count": count * amount},
+                                          upsert=True):
+                logger.error("Failed to update the discrepancy summary of %s", key)
+
+    def rebuild_summary(self) -> int:
+        """Recomputes the materialized summary from every stored discrepancy, e.g. after it was first enabled.
+        The summary is replaced in a single `replace`, and kept as it is if the rollup fails.
+
+        Returns:
+            The number of summary records, or None if the summary could not be rebuilt.
+        """
+
+        results = self.db_manager.aggregate(self.discrepancy_collection, self._rollup_pipeline())
+
+        if results is None:
+            logger.error("Failed to roll up %s, the discrepancy summary was kept", self.discrepancy_collection)
+
+            return None
+
+        rollup = list(results)
+
+        if self.db_manager.replace(collection_name=self.summary_collection, query={}, data=rollup) is None:
+            logger.error("Failed to replace the discrepancy summary")
+
+            return None
+
+        return len(rollup)
+
+    def summary(self, query: dict | None = None) -> list:
+        """Reads the materialized summary.
+
+        Args:
+            query: Limits the summary to the matching records, e.g. {"country": "Chad", "month": "2021-03"}.
+
+        Returns:
+            A list of {"discrepancy_type", "country", "month", "count"} sorted by month, country and type.
+        """
+
+        return list(self.db_manager.find(self.summary_collection, {**(query or {}), "count": {"$gt": 0}},
+                                         projection={"_id": 0},
+                                         sort=[(field, 1) for field in ("month", "country", "discrepancy_type")])
+                    or [])
@@ -0,0 +1,30 @@
+class Index:
+    __slots__ = ("fields", "unique")
+
+    def __init__(self, *fields: str, unique: bool = False):
+        """An index a collection needs, declared once and ensured by every DBManager in its own way.
+
+        Args:
+            fields: The (top level) fields of the index, in order.
+            unique: Whether two records may not share the same values. Records that are missing the fields do not
+                take part in a unique index.
+        """
+
+        self.fields: tuple = fields
+        self.unique: bool = unique
+
+    @property
+    def name(self) -> str:
+        return "_".join(self.fields) + ("_unique" if self.unique else "") + "_index"
+
+    def __repr__(self) -> str:
+        return f"Index({', '.join(map(repr, self.fields))}{', unique=True' if self.unique else ''})"
+
+
+COLLECTION_INDEXES = {"html data": [Index("document id", unique=True), Index("country"), Index("creation date"),
+                                    Index("fingerprint")],
+                      "html discrepancies": [Index("document_id"), Index("discrepancy_type")],
+                      "discrepancy summary": [Index("discrepancy_type", "country", "month", unique=True)],
+                      "validator configs": [Index("validator", unique=True)],
+                      "table aliases": [Index("file", "document id", unique=True), Index("alias_of")],
+                      "ingest leases": [Index("run", "state")]}
@@ -0,0 +1 @@
+from .memory_manager import MemoryDBManager
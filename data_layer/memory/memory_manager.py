@@ -0,0 +1,168 @@
+from itertools import islice
+from threading import Lock
+from types import SimpleNamespace
+from typing import Iterator
+from data_layer import DBManager, register_db_manager
+from data_layer.memory.memory_query import matches, project, sort_key, run_pipeline
+
+
+@register_db_manager("memory")
+class MemoryDBManager(DBManager):
+    _collections: dict = {}
+    _lock: Lock = Lock()
+
+    def __init__(self, *args, **kwargs):
+        """A DBManager that keeps every collection in the memory of the current process.
+        All instances share the same collections, so it can stand in for a real db in benchmarks and local runs that
+        have no network access.
+        """
+
+        super().__init__(*args, **kwargs)
+
+    def connect(self):
+        pass
+
+    def disconnect(self):
+        pass
+
+    @classmethod
+    def clear(cls):
+        """Drops every collection.
+        """
+
+        with cls._lock:
+            cls._collections.clear()
+
+    def insert(self, collection_name: str, data: list | object, ordered: bool = True):
+        """Inserts given data, records without an `_id` are given one.
+
+        Returns:
+            An object with the `inserted_ids` of a list or the `inserted_id` of a single record.
+        """
+
+        records = data if isinstance(data, list) else [data]
+
+        for record in records:
+            if "_id" not in record:
+                record["_id"] = self.generate_id()
+
+        with self._lock:
+            self._collections.setdefault(collection_name, []).extend(dict(record) for record in records)
+
+        if isinstance(data, list):
+            return SimpleNamespace(inserted_ids=[record["_id"] for record in records])
+
+        return SimpleNamespace(inserted_id=data["_id"])
+
+    def find(self, collection_name: str, query: object = None, projection: dict | None = None,
+             sort: list | None = None, limit: int = 0, skip: int = 0, batch_size: int = 0) -> Iterator[dict]:
+        """Iterates over the records matching a query, every record is copied as it is reached.
+        The `batch_size` is accepted for compatibility with the other managers and is ignored.
+        """
+
+        with self._lock:
+            records = list(self._collections.get(collection_name, []))
+
+        results = (record for record in records if matches(record, query))
+
+        if sort:
+            results = list(results)
+
+            for field, direction in reversed(sort):
+                results.sort(key=sort_key(field), reverse=direction < 0)
+
+        results = islice(results, skip, skip + limit if limit else None)
+
+        return (project(record, projection) for record in results)
+
+    def update(self, collection_name: str, query: object, update_type: str, new_data: object,
+               upsert: bool = False) -> int:
+        """Updates the records matching the query, only "$set", "$unset" and "$inc" are supported.
+        """
+
+        if update_type not in ("$set", "$unset", "$inc"):
+            raise ValueError(f"Unsupported update type: {update_type}")
+
+        updated = 0
+
+        with self._lock:
+            records = self._collections.setdefault(collection_name, [])
+
+            for record in records:
+                if matches(record, query):
+                    if update_type == "$set":
+                        record.update(new_data)
+                    elif update_type == "$inc":
+                        for field, amount in new_data.items():
+                            record[field] = record.get(field, 0) + amount
+                    else:
+                        for field in new_data:
+                            record.pop(field, None)
+
+                    updated += 1
+
+            if not updated and upsert:
+                fields = {key: value for key, value in query.items() if not isinstance(value, dict)}
+                record = {**fields, **(new_data if update_type != "$unset" else {})}
+                record.setdefault("_id", self.generate_id())
+                records.append(record)
+                updated = 1
+
+        return updated
+
+    def claim(self, collection_name: str, record_id: str, query: dict, new_data: dict) -> bool:
+        with self._lock:
+            records = self._collections.setdefault(collection_name, [])
+            record = next((record for record in records if record["_id"] == record_id), None)
+
+            if record is None:
+                fields = {key: value for key, value in query.items() if not isinstance(value, dict)}
+                records.append({**fields, **new_data, "_id": record_id})
+            elif matches(record, query):
+                record.update(new_data)
+            else:
+                return False
+
+        return True
+
+    def replace(self, collection_name: str, query: dict, data: list) -> int:
+        for record in data:
+            record.setdefault("_id", self.generate_id())
+
+        with self._lock:
+            records = self._collections.get(collection_name, [])
+            kept = [record for record in records if not matches(record, query)]
+            self._collections[collection_name] = kept + [dict(record) for record in data]
+
+        return len(records) - len(kept)
+
+    def upsert(self, collection_name: str, data: list):
+        with self._lock:
+            records = self._collections.setdefault(collection_name, [])
+            positions = {record["_id"]: i for i, record in enumerate(records)}
+
+            for record in data:
+                if record["_id"] in positions:
+                    records[positions[record["_id"]]] = dict(record)
+                else:
+                    positions[record["_id"]] = len(records)
+                    records.append(dict(record))
+
+        return SimpleNamespace(upserted_ids=[record["_id"] for record in data])
+
+    def aggregate(self, collection_name: str, pipeline: list, batch_size: int = 0) -> Iterator[dict]:
+        """Runs an aggregation pipeline over a collection, only the common stages and operators are supported.
+        """
+
+        with self._lock:
+            records = [dict(record) for record in self._collections.get(collection_name, [])]
+
+        return iter(run_pipeline(records, pipeline))
+
+    def delete(self, collection_name: str, query: object) -> int:
+        with self._lock:
+            records = self._collections.get(collection_name, [])
+            kept = [record for record in records if not matches(record, query)]
+            self._collections[collection_name] = kept
+
+        return len(records) - len(kept)
@@ -0,0 +1,236 @@
+from functools import cmp_to_key
+
+COMPARISON_OPERATORS = {"$eq": lambda value, target: value == target,
+                        "$ne": lambda value, target: value != target,
+                        "$gt": lambda value, target: value is not None and value > target,
+                        "$gte": lambda value, target: value is not None and value >= target,
+                        "$lt": lambda value, target: value is not None and value < target,
+                        "$lte": lambda value, target: value is not None and value <= target,
+                        "$in": lambda value, target: value in target,
+                        "$nin": lambda value, target: value not in target,
+                        "$exists": lambda value, target: (value is not None) == target}
+
+
+def matches(record: dict, query: dict | None) -> bool:
+    """Checks a record against a simple mongo style query, e.g. {"country": "Chad", "size": {"$gte": 1}}.
+    """
+
+    for field, condition in (query or {}).items():
+        value = record.get(field)
+
+        if isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition):
+            if not all(COMPARISON_OPERATORS[operator](value, target) for operator, target in condition.items()):
+                return False
+        elif value != condition:
+            return False
+
+    return True
+
+
+def project(record: dict, projection: dict | None) -> dict:
+    """Applies a mongo style projection to a copy of a record, e.g. {"document id": 1} keeps the `_id` and the
+    document id while {"body": 0} keeps everything but the body.
+    """
+
+    if not projection:
+        return dict(record)
+
+    if any(value for field, value in projection.items() if field != "_id"):
+        fields = [field for field, value in projection.items() if value]
+
+        if projection.get("_id", 1):
+            fields.append("_id")
+
+        return {field: record[field] for field in fields if field in record}
+
+    return {field: value for field, value in record.items() if projection.get(field, 1)}
+
+
+def sort_key(field: str):
+    """Returns a sort key that orders records by a field, records missing it come first as in mongo.
+    """
+
+    def key(record: dict):
+        value = record.get(field)
+
+        return value is not None, value
+
+    return key
+
+
+def resolve(record: dict, path: str):
+    """Reads a (dotted) field of a record, e.g. "_id.country".
+    """
+
+    value = record
+
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+
+        value = value.get(part)
+
+    return value
+
+
+def evaluate(expression, record: dict):
+    """Evaluates a mongo aggregation expression against a record.
+    Supports field paths ("$country"), literals, objects of expressions and the $concat, $substrCP, $size, $ifNull,
+    $cond, $eq, $gt, $gte, $lt, $lte and $toString operators.
+    """
+
+    if isinstance(expression, str) and expression.startswith("$"):
+        return resolve(record, expression[1:])
+
+    if isinstance(expression, list):
+        return [evaluate(item, record) for item in expression]
+
+    if not isinstance(expression, dict):
+        return expression
+
+    if len(expression) != 1 or not next(iter(expression)).startswith("$"):
+        return {field: evaluate(value, record) for field, value in expression.items()}
+
+    operator, arguments = next(iter(expression.items()))
+    arguments = evaluate(arguments, record)
+
+    if operator == "$concat":
+        return None if any(argument is None for argument in arguments) else "".join(arguments)
+
+    if operator == "$substrCP":
+        string, start, length = arguments
+
+        return (string or "")[start:start + length]
+
+    if operator == "$size":
+        return len(arguments)
+
+    if operator == "$ifNull":
+        return next((argument for argument in arguments if argument is not None), None)
+
+    if operator == "$cond":
+        condition, then, otherwise = arguments
+
+        return then if condition not in (None, False, 0) else otherwise
+
+    if operator == "$toString":
+        return None if arguments is None else str(arguments)
+
+    if operator in ("$eq", "$gt", "$gte", "$lt", "$lte"):
+        return matches({"value": arguments[0]}, {"value": {operator: arguments[1]}})
+
+    raise ValueError(f"Unsupported expression operator: {operator}")
+
+
+def group(records, specification: dict) -> list:
+    """Runs a $group stage with the $sum, $addToSet, $push, $first, $min and $max accumulators.
+    """
+
+    groups = {}
+
+    for record in records:
+        key = evaluate(specification["_id"], record)
+        hashable_key = repr(key)
+
+        if hashable_key not in groups:
+            groups[hashable_key] = {"_id": key}
+
+        result = groups[hashable_key]
+
+        for field, accumulator in specification.items():
+            if field == "_id":
+                continue
+
+            operator, expression = next(iter(accumulator.items()))
+            value = evaluate(expression, record)
+
+            if operator == "$sum":
+                result[field] = result.get(field, 0) + (value if isinstance(value, (int, float)) else 0)
+            elif operator == "$addToSet":
+                result.setdefault(field, [])
+
+                if value not in result[field]:
+                    result[field].append(value)
+            elif operator == "$push":
+                result.setdefault(field, []).append(value)
+            elif operator == "$first":
+                result.setdefault(field, value)
+            elif operator in ("$min", "$max"):
+                if value is not None and (field not in result or result[field] is None or
+                                          (value < result[field]) == (operator == "$min")):
+                    result[field] = value
+            else:
+                raise ValueError(f"Unsupported accumulator: {operator}")
+
+    return list(groups.values())
+
+
+def project_stage(records, specification: dict):
+    """Runs a $project stage, fields are either included, excluded or computed from an expression.
+    """
+
+    for record in records:
+        if all(value in (0, 1, True, False) for value in specification.values()):
+            yield project(record, specification)
+            continue
+
+        result = {"_id": record.get("_id")} if specification.get("_id", 1) else {}
+
+        for field, value in specification.items():
+            if value in (1, True):
+                if field in record:
+                    result[field] = record[field]
+            elif value not in (0, False):
+                result[field] = evaluate(value, record)
+
+        yield result
+
+
+def sort_stage(records, specification: dict) -> list:
+    keys = [(sort_key(field), direction) for field, direction in specification.items()]
+
+    def compare(first: dict, second: dict) -> int:
+        for key, direction in keys:
+            first_key, second_key = key(first), key(second)
+
+            if first_key != second_key:
+                return direction if first_key > second_key else -direction
+
+        return 0
+
+    return sorted(records, key=cmp_to_key(compare))
+
+
+def run_pipeline(records, pipeline: list) -> list:
+    """Runs a mongo aggregation pipeline over records in process.
+    Supports the $match, $group, $project, $sort, $skip, $limit and $count stages.
+
+    Args:
+        records: An iterable of the records of a collection.
+        pipeline: The stages of the pipeline.
+
+    Returns:
+        The resulting records.
+    """
+
+    for stage in pipeline:
+        name, specification = next(iter(stage.items()))
+
+        if name == "$match":
+            records = [record for record in records if matches(record, specification)]
+        elif name == "$group":
+            records = group(records, specification)
+        elif name == "$project":
+            records = list(project_stage(records, specification))
+        elif name == "$sort":
+            records = sort_stage(records, specification)
+        elif name == "$skip":
+            records = list(records)[specification:]
+        elif name == "$limit":
+            records = list(records)[:specification]
+        elif name == "$count":
+            records = [{specification: len(list(records))}]
+        else:
+            raise ValueError(f"Unsupported pipeline stage: {name}")
+
+    return list(records)
@@ -1 +1,2 @@
+from .mongo_client_pool import MongoClientPool, mongo_client_pool
 from .mongodb_manager import MongoDBManager
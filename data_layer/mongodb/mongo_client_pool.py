@@ -0,0 +1,74 @@
+import os
+import atexit
+from threading import Lock
+from pymongo.mongo_client import MongoClient
+from consts import (MONGODB_URI, MONGODB_MAX_POOL_SIZE, MONGODB_MIN_POOL_SIZE, MONGODB_MAX_IDLE_TIME_MS,
+                    MONGODB_CONNECT_TIMEOUT_MS, MONGODB_SERVER_SELECTION_TIMEOUT_MS, MONGODB_SOCKET_TIMEOUT_MS)
+
+
+class MongoClientPool:
+    def __init__(self, uri: str = MONGODB_URI,
+                 max_pool_size: int = MONGODB_MAX_POOL_SIZE,
+                 min_pool_size: int = MONGODB_MIN_POOL_SIZE,
+                 max_idle_time_ms: int = MONGODB_MAX_IDLE_TIME_MS,
+                 connect_timeout_ms: int = MONGODB_CONNECT_TIMEOUT_MS,
+                 server_selection_timeout_ms: int = MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+                 socket_timeout_ms: int | None = MONGODB_SOCKET_TIMEOUT_MS):
+        """Owns a single, lazily created MongoClient that is shared by every MongoDBManager in the process.
+        MongoClient is thread safe and keeps its own connection pool, so creating it once saves the TLS handshake and
+        SRV lookup that a new client pays for on every query.
+
+        Args:
+            uri: The connection string of the mongo server.
+            max_pool_size: The maximum amount of open connections the client keeps per server.
+            min_pool_size: The amount of connections the client keeps open even when idle.
+            max_idle_time_ms: How long a connection may stay idle in the pool before it is closed.
+            connect_timeout_ms: How long to wait for a new connection to be established.
+            server_selection_timeout_ms: How long to wait for a suitable server before an operation fails.
+            socket_timeout_ms: How long to wait for a response on an open connection, None waits indefinitely.
+        """
+
+        self.uri: str = uri
+        self.client_options: dict = {"maxPoolSize": max_pool_size,
+                                     "minPoolSize": min_pool_size,
+                                     "maxIdleTimeMS": max_idle_time_ms,
+                                     "connectTimeoutMS": connect_timeout_ms,
+                                     "serverSelectionTimeoutMS": server_selection_timeout_ms,
+                                     "socketTimeoutMS": socket_timeout_ms}
+        self._client: MongoClient | None = None
+        self._pid: int | None = None
+        self._lock: Lock = Lock()
+
+    def configure(self, **client_options):
+        """Overrides client options (e.g. maxPoolSize=10), the next client that is created will use them.
+        """
+
+        with self._lock:
+            self.client_options.update(client_options)
+
+    def get_client(self) -> MongoClient:
+        """Returns the shared client, creating it on first use.
+        A client inherited through fork is not reused since MongoClient is not fork safe, a new one is created instead.
+        """
+
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                self._client = MongoClient(self.uri, **self.client_options)
+                self._pid = os.getpid()
+
+            return self._client
+
+    def close(self):
+        """Closes the shared client and all of its pooled connections.
+        """
+
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+
+            self._client = None
+            self._pid = None
+
+
+mongo_client_pool = MongoClientPool()
+atexit.register(mongo_client_pool.close)
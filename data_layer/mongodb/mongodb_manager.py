@@ -1,8 +1,20 @@
+from types import SimpleNamespace
+from functools import wraps
+from bson import ObjectId
+from pymongo import ASCENDING, ReplaceOne
 from pymongo.cursor import Cursor
-from consts import MONGODB_URI, DB_NAME
-from data_layer import DBManager, register_db_manager
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from consts import DB_NAME, FIND_BATCH_SIZE
+from data_layer import DBManager, Index, register_db_manager
 from pymongo.database import Database
 from pymongo.mongo_client import MongoClient
+from instrumentation import get_logger
+from data_layer.mongodb.mongo_client_pool import MongoClientPool, mongo_client_pool
+
+logger = get_logger("data_layer.mongodb")
+
+INDEXABLE_TYPES = ["string", "number", "date", "objectId", "bool"]
+ILLEGAL_OPERATION = 20
 
 
 @register_db_manager("mongo")
@@ -12,99 +24,227 @@ class MongoDBManager(DBManager):
         In order to connect to the db the environment parameters: MONGODB_PASSWORD, MONGODB_USER, MONGODB_HOST and
         MONGODB_CLUSTER should be defined to your existing database details.
         DB_NAME should be changed if the default db is not wanted.
+        Every manager borrows the same process-wide pooled client, so creating many managers does not open new
+        connections.
 
         Args:
             db_name: The name of the working database, e.g. 'db0'
+            client_pool: The MongoClientPool to borrow the client from, defaults to the process-wide pool.
+            indexes: Lists of Index by collection name, they are created by `ensure_indexes`.
         """
 
         super().__init__(*args, **kwargs)
 
+        self.client_pool: MongoClientPool = kwargs.get("client_pool", mongo_client_pool)
         self.client: MongoClient | None = None
-        self.db_name: str = DB_NAME
+        self.db_name: str = kwargs.get("db_name", DB_NAME)
         self.db: Database | None = None
 
     def connect(self):
         try:
-            self.client = MongoClient(MONGODB_URI)
+            self.client = self.client_pool.get_client()
             self.db = self.client[self.db_name]
         except Exception as e:
-            print(f"An error occurred when attempting to connect to db: {e}")
+            logger.error("An error occurred when attempting to connect to db: %s", e)
 
     def disconnect(self):
-        self.client.close()
+        """Releases this manager's reference to the shared client.
+        The pooled connections stay open for the other managers and are closed by the pool on exit.
+        """
+
+        self.client = None
+        self.db = None
 
     def _query_execution(func):
-        """A decorator that's responsible for keeping connections to the database at a minimum.
+        """A decorator that's responsible for making sure the manager is connected before running a query.
         """
 
+        @wraps(func)
         def wrapper(self, *args, **kwargs):
-            self.connect()
+            if self.db is None:
+                self.connect()
+
             try:
                 result = func(self, *args, **kwargs)
             except Exception as e:
-                print(e)
+                logger.error("Query %s failed: %s", func.__name__, e)
                 result = None
-            finally:
-                self.disconnect()
 
             return result
 
         return wrapper
 
+    def generate_id(self) -> ObjectId:
+        return ObjectId()
+
     @_query_execution
-    def insert(self, collection_name: str, data: list | object) -> bool:
+    def insert(self, collection_name: str, data: list | object, ordered: bool = True) -> bool:
         """Inserts given data into the connected DB instance.
 
         Args:
             collection_name: The name of the MongoDB collection to be inserted into.
             data: The data that is to be inserted, can be either a list of dictionaries or a single one.
+            ordered: Whether a list is inserted in order, stopping at the first error. An unordered insert lets the
+                server apply the writes in parallel and continue past failures.
 
         Returns:
-            True if the insertion process was a success, False otherwise.
+            The insertion result if the insertion process was a success, False otherwise. The result of an unordered
+            insert that partly failed, e.g. because of duplicate keys, only has the `inserted_ids` of the records that
+            were inserted.
         """
 
         collection = self.db[collection_name]
 
         try:
             if isinstance(data, list):
-                response = collection.insert_many(data)
+                response = collection.insert_many(data, ordered=ordered)
             else:
                 response = collection.insert_one(data)
+        except BulkWriteError as e:
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            logger.error("%d of %d records were not inserted into %s, first error: %s", len(failed), len(data),
+                         collection_name, e.details["writeErrors"][0]["errmsg"] if failed else e)
+
+            if ordered or len(failed) == len(data):
+                response = False
+            else:
+                response = SimpleNamespace(inserted_ids=[record["_id"] for i, record in enumerate(data)
+                                                         if i not in failed])
         except Exception as e:
-            print(e)
+            logger.error("An error has occurred when attempting to insert into %s: %s", collection_name, e)
             response = False
 
         return response
 
     @_query_execution
-    def find(self, collection_name: str, query: object = None) -> Cursor | None:
+    def find(self, collection_name: str, query: object = None, projection: dict | None = None,
+             sort: list | None = None, limit: int = 0, skip: int = 0,
+             batch_size: int = FIND_BATCH_SIZE) -> Cursor | None:
         """Executes mongo find function, used in order to iterate over existing documents in the databse.
+        The returned cursor is lazy, the server streams the results in batches of `batch_size` documents as they are
+        iterated, so scanning a whole collection keeps a bounded number of documents in memory.
 
         Args:
             collection_name: The name of the MongoDB collection to be searched upon.
             query: The query that is to be executed, e.g. {"$gte": {"x": 1}}
             (will return all the documents where the field "x" is greater than or equal to 1).
+            projection: The fields to return, e.g. {"document id": 1}, or to leave out, e.g. {"body": 0}.
+            sort: A list of (field, direction) pairs to sort by, direction is 1 for ascending or -1 for descending.
+            limit: The maximum number of documents to return, 0 for no limit.
+            skip: The number of documents to skip before returning results.
+            batch_size: The number of documents the server returns in every batch.
 
         Returns:
             A Cursor object to iterate over the results or None if nothing was returned.
+            The cursor stays usable after the call since the pooled client is not closed.
 
         """
 
         collection = self.db[collection_name]
 
         try:
-            if query is not None:
-                result = collection.find(query)
-            else:
-                result = collection.find()
+            result = collection.find(query or {}, projection, sort=sort, limit=limit, skip=skip,
+                                     batch_size=batch_size)
         except Exception as e:
-            print(f"An error has occurred when attempting find query: {query}.\nError: {e}")
+            logger.error("An error has occurred when attempting find query: %s. Error: %s", query, e)
             result = None
 
         return result
 
     @_query_execution
-    def update(self, collection_name: str, query: object, update_type: str, new_data: object) -> int:
+    def replace(self, collection_name: str, query: dict, data: list) -> int | None:
+        """Replaces the documents matching a query with new documents in a single transaction.
+        Transactions need a replica set, on a standalone server the documents are replaced with an ordered delete and
+        insert instead, which readers may briefly see in between.
+
+        Args:
+            collection_name: The name of the MongoDB collection.
+            query: The query of the documents that are to be replaced, e.g. {"document_id": {"$in": ["1", "2"]}}.
+            data: The new documents.
+
+        Returns:
+            How many documents were replaced, or None if the replacement failed.
+        """
+
+        collection = self.db[collection_name]
+
+        def replace_documents(session=None) -> int:
+            deleted = collection.delete_many(query, session=session).deleted_count
+
+            if data:
+                collection.insert_many(data, session=session)
+
+            return deleted
+
+        try:
+            with self.client.start_session() as session:
+                return session.with_transaction(replace_documents)
+        except OperationFailure as e:
+            if e.code != ILLEGAL_OPERATION:
+                raise
+
+            logger.warning("Transactions are not supported by the server, replacing %s without one", collection_name)
+
+            return replace_documents()
+
+    @_query_execution
+    def upsert(self, collection_name: str, data: list):
+        """Inserts documents or replaces the stored documents with the same `_id` with an unordered bulk write.
+
+        Returns:
+            An object with the `upserted_ids` of the documents that were written, the others were rejected by the
+            server, e.g. by a unique index. None if the write failed as a whole, e.g. because the server is unreachable.
+        """
+
+        requests = [ReplaceOne({"_id": record["_id"]}, record, upsert=True) for record in data]
+
+        try:
+            self.db[collection_name].bulk_write(requests, ordered=False)
+            failed = set()
+        except BulkWriteError as e:
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            logger.error("%d of %d documents were not upserted into %s, first error: %s", len(failed), len(data),
+                         collection_name, e.details["writeErrors"][0]["errmsg"] if failed else e)
+
+        return SimpleNamespace(upserted_ids=[record["_id"] for i, record in enumerate(data) if i not in failed])
+
+    @_query_execution
+    def claim(self, collection_name: str, record_id, query: dict, new_data: dict) -> bool:
+        """Sets fields of the document with the given `_id` if it matches the query with a single update, or inserts
+        it. If the document exists but does not match, the insert is rejected by the `_id` index.
+        """
+
+        try:
+            self.db[collection_name].update_one({"_id": record_id, **query}, {"$set": new_data}, upsert=True)
+        except DuplicateKeyError:
+            return False
+
+        return True
+
+    @_query_execution
+    def aggregate(self, collection_name: str, pipeline: list, batch_size: int = FIND_BATCH_SIZE) -> Cursor | None:
+        """Runs an aggregation pipeline on the server, stages that outgrow the server's memory limit spill to disk.
+
+        Args:
+            collection_name: The name of the MongoDB collection the pipeline runs on.
+            pipeline: The stages of the pipeline, e.g. [{"$group": {"_id": "$country", "count": {"$sum": 1}}}].
+            batch_size: The number of documents the server returns in every batch.
+
+        Returns:
+            A cursor over the results or None if the pipeline failed.
+        """
+
+        try:
+            result = self.db[collection_name].aggregate(pipeline, allowDiskUse=True, batchSize=batch_size)
+        except Exception as e:
+            logger.error("An error has occurred when attempting aggregation: %s. Error: %s", pipeline, e)
+            result = None
+
+        return result
+
+    @_query_execution
+    def update(self, collection_name: str, query: object, update_type: str, new_data: object,
+               upsert: bool = False) -> int:
         """Updates given query results with the new data.
 
         Args:
@@ -112,19 +252,20 @@ class MongoDBManager(DBManager):
             query: The query that is to be executed, e.g. {"$gte": {"x": 1}}.
             update_type: The update function from mongo that is to be used, e.g. "$set".
             new_data: The new data that is to be updated, must be an object that is suitable for mongo.
+            upsert: Whether to insert a new document built from the query and new data if nothing matched the query.
 
         Returns:
-            The number of updated documents.
+            The number of updated documents, an upserted document counts as one.
         """
 
         collection = self.db[collection_name]
 
         try:
-            result = collection.update_many(query, {update_type: new_data})
+            result = collection.update_many(query, {update_type: new_data}, upsert=upsert)
 
-            result = result.modified_count
+            result = result.modified_count + (1 if result.upserted_id is not None else 0)
         except Exception as e:
-            print(f"An error has occurred when attempting update query: {query}.\nError: {e}")
+            logger.error("An error has occurred when attempting update query: %s. Error: %s", query, e)
             result = 0
 
         return result
@@ -147,7 +288,39 @@ class MongoDBManager(DBManager):
             result = collection.delete_many(query)
             result = result.deleted_count
         except Exception as e:
-            print(f"An error has occurred when attempting delete query: {query}.\nError: {e}")
+            logger.error("An error has occurred when attempting delete query: %s. Error: %s", query, e)
             result = 0
 
         return result
+
+    @_query_execution
+    def create_index(self, collection_name: str, index: Index) -> bool:
+        """Creates an index if it does not exist yet, a unique index only covers the documents whose fields hold a
+        value, so documents that are missing them do not collide.
+        """
+
+        options = {}
+
+        if index.unique:
+            options["partialFilterExpression"] = {field: {"$type": INDEXABLE_TYPES} for field in index.fields}
+
+        self.db[collection_name].create_index([(field, ASCENDING) for field in index.fields], name=index.name,
+                                              unique=index.unique, **options)
+
+        return True
+
+    @_query_execution
+    def drop_index(self, collection_name: str, index: Index) -> bool:
+        if index.name in self.db[collection_name].index_information():
+            self.db[collection_name].drop_index(index.name)
+
+        return True
+
+    @_query_execution
+    def index_usage(self, collection_name: str) -> dict:
+        """Reports how many operations used each index of a collection since the index was created or the server
+        started, as kept by the server's $indexStats.
+        """
+
+        return {stats["name"]: stats["accesses"]["ops"]
+                for stats in self.db[collection_name].aggregate([{"$indexStats": {}}])}
@@ -0,0 +1 @@
+from .sqlite_manager import SQLiteDBManager
@@ -0,0 +1,481 @@
+import re
+import atexit
+import sqlite3
+from functools import wraps
+from collections import Counter
+from threading import Lock, local
+from types import SimpleNamespace
+from typing import Iterator
+from consts import SQLITE_PATH, SQLITE_BUSY_TIMEOUT, FIND_BATCH_SIZE
+from instrumentation import get_logger
+from data_layer import DBManager, Index, register_db_manager
+from data_layer.memory.memory_query import run_pipeline
+from data_layer.sqlite.sqlite_query import (quote_identifier, field_expression, translate_query, select_expression,
+                                            order_clause, translate_group, decode_group, encode_record, decode_record)
+
+logger = get_logger("data_layer.sqlite")
+
+INDEX_PATTERN = re.compile(r"^SEARCH .* USING (?:COVERING )?INDEX (.+?)(?: \(|$)")
+COLLECTION_SCAN = "collection scan"
+# Operations that only read run in a deferred transaction, which does not take the write lock.
+READ_OPERATIONS = ("_open_cursor", "aggregate")
+
+
+@register_db_manager("sqlite")
+class SQLiteDBManager(DBManager):
+    _connections: list = []
+    _created_tables: set = set()
+    _query_plans: dict = {}
+    _index_usage: dict = {}
+    _connections_lock: Lock = Lock()
+    _local = local()
+
+    def __init__(self, *args, **kwargs):
+        """The SQLiteDBManager keeps every collection in a table of an embedded SQLite database, a record is stored as
+        json next to its `_id`. The simple mongo style queries passed to find, update and delete are translated into
+        sql on the records' json fields.
+        The database runs in WAL mode so readers do not block the writer, every thread uses its own connection, every
+        call runs in a single transaction and the statements are parameterized so SQLite reuses their prepared form.
+
+        Args:
+            db_path: The path of the database file, defaults to the SQLITE_PATH environment variable.
+            indexes: Lists of Index by collection name, the indexes are created along with the collection's table.
+
+        Raises:
+            ValueError: If db_path is ":memory:", every connection would open an empty database of its own.
+        """
+
+        super().__init__(*args, **kwargs)
+
+        self.db_path: str = kwargs.get("db_path", SQLITE_PATH)
+
+        if self.db_path == ":memory:":
+            raise ValueError("SQLiteDBManager needs a database file, every thread and reader opens a connection of "
+                             "its own and would not see an in-memory database, use the memory db type instead")
+
+    def connect(self):
+        connections = getattr(self._local, "connections", None)
+
+        if connections is None:
+            connections = self._local.connections = {}
+
+        if self.db_path not in connections:
+            connection = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None,
+                                         check_same_thread=False, cached_statements=256)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connections[self.db_path] = connection
+
+            with self._connections_lock:
+                self._connections.append(connection)
+
+    @property
+    def connection(self) -> sqlite3.Connection | None:
+        """The connection of the current thread, so a manager that is shared by several threads, e.g. by a
+        WriteBatcher's flusher and the threads that fill it, never runs statements on another thread's transaction.
+        """
+
+        return getattr(self._local, "connections", {}).get(self.db_path)
+
+    def disconnect(self):
+        """Does nothing, the connection of the current thread stays open for the other managers of the thread and is
+        closed on exit.
+        """
+
+    @classmethod
+    def close_all(cls):
+        with cls._connections_lock:
+            for connection in cls._connections:
+                connection.close()
+
+            cls._connections.clear()
+            cls._created_tables.clear()
+            cls._query_plans.clear()
+
+        cls._local = local()
+
+    def _query_execution(func):
+        """A decorator that's responsible for connecting before a query and running it in a single transaction.
+        """
+
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            self.connect()
+            self._local.new_tables = []
+
+            try:
+                self.connection.execute("BEGIN IMMEDIATE" if func.__name__ not in READ_OPERATIONS else "BEGIN")
+                result = func(self, *args, **kwargs)
+                self.connection.execute("COMMIT")
+
+                with self._connections_lock:
+                    self._created_tables.update(self._local.new_tables)
+            except Exception as e:
+                if self.connection.in_transaction:
+                    self.connection.execute("ROLLBACK")
+
+                logger.error("Query %s failed: %s", func.__name__, e)
+                result = None
+
+            return result
+
+        return wrapper
+
+    def _table(self, collection_name: str) -> str:
+        """Returns the quoted table of a collection, creating it along with its indexes on first use.
+        A created table is only remembered once the transaction that created it was committed, a rolled back one
+        is created again by the next call.
+        """
+
+        table = quote_identifier(collection_name)
+
+        if (self.db_path, collection_name) not in self._created_tables:
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS {table} (_id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+
+            for index in self.indexes.get(collection_name, []):
+                try:
+                    self._create_index(table, collection_name, index)
+                except sqlite3.IntegrityError as e:
+                    logger.error("Could not create %s on %s: %s", index, collection_name, e)
+
+            self._local.new_tables.append((self.db_path, collection_name))
+
+        return table
+
+    @_query_execution
+    def _create_table(self, collection_name: str) -> bool:
+        self._table(collection_name)
+
+        return True
+
+    def _create_index(self, table: str, collection_name: str, index: Index):
+        columns = ", ".join(field_expression(field) for field in index.fields)
+        self.connection.execute(f"CREATE {'UNIQUE ' if index.unique else ''}INDEX IF NOT EXISTS "
+                                f"{quote_identifier(f'{collection_name}_{index.name}')} ON {table} ({columns})")
+        self._query_plans.clear()
+
+    @_query_execution
+    def create_index(self, collection_name: str, index: Index) -> bool:
+        self._create_index(self._table(collection_name), collection_name, index)
+
+        return True
+
+    @_query_execution
+    def drop_index(self, collection_name: str, index: Index) -> bool:
+        self._table(collection_name)
+        self.connection.execute(f"DROP INDEX IF EXISTS {quote_identifier(f'{collection_name}_{index.name}')}")
+        self._query_plans.clear()
+
+        return True
+
+    def index_usage(self, collection_name: str) -> dict:
+        """Reports how many queries of this process used each index of a collection.
+        SQLite does not keep index statistics, so the plan of every distinct query is looked up once with
+        EXPLAIN QUERY PLAN and every execution of the query is counted under the index it uses.
+        """
+
+        with self._connections_lock:
+            return dict(self._index_usage.get((self.db_path, collection_name), {}))
+
+    def _track_index_usage(self, table: str, collection_name: str, where: str, parameters: list):
+        key = (self.db_path, collection_name, where)
+        index = self._query_plans.get(key)
+
+        if index is None:
+            plan = self.connection.execute(f"EXPLAIN QUERY PLAN SELECT _id FROM {table}{where}", parameters)
+            matches = (INDEX_PATTERN.search(detail) for *_, detail in plan)
+            index = next((match.group(1) for match in matches if match), COLLECTION_SCAN)
+            self._query_plans[key] = index
+
+        with self._connections_lock:
+            self._index_usage.setdefault((self.db_path, collection_name), Counter())[index] += 1
+
+    @_query_execution
+    def insert(self, collection_name: str, data: list | object, ordered: bool = True):
+        """Inserts given data into the database, a list is inserted in a single transaction.
+
+        Args:
+            collection_name: The name of the collection to be inserted into.
+            data: The data that is to be inserted, can be either a list of dictionaries or a single one.
+            ordered: Whether a list is inserted in order, failing as a whole at the first error. An unordered insert
+                skips the records that fail, e.g. because of a duplicate `_id`.
+
+        Returns:
+            An object with the `inserted_ids` of a list or the `inserted_id` of a single record.
+        """
+
+        table = self._table(collection_name)
+        records = data if isinstance(data, list) else [data]
+
+        for record in records:
+            if "_id" not in record:
+                record["_id"] = self.generate_id()
+
+        statement = f"INSERT INTO {table} (_id, data) VALUES (?, ?)"
+        rows = [(str(record["_id"]), encode_record(record)) for record in records]
+
+        if ordered:
+            self.connection.executemany(statement, rows)
+            inserted_ids = [record["_id"] for record in records]
+        else:
+            inserted_ids = []
+
+            for record, row in zip(records, rows):
+                try:
+                    self.connection.execute(statement, row)
+                    inserted_ids.append(record["_id"])
+                except sqlite3.IntegrityError as e:
+                    logger.warning("Skipped %s: %s", record["_id"], e)
+
+        if isinstance(data, list):
+            return SimpleNamespace(inserted_ids=inserted_ids)
+
+        return SimpleNamespace(inserted_id=data["_id"])
+
+    def find(self, collection_name: str, query: object = None, projection: dict | None = None,
+             sort: list | None = None, limit: int = 0, skip: int = 0,
+             batch_size: int = FIND_BATCH_SIZE) -> Iterator[dict] | None:
+        """Executes a find query, used in order to iterate over existing records in the database.
+        The results are streamed in batches of `batch_size` rows from a read connection of their own, which keeps a
+        consistent snapshot of the database while it is iterated without blocking the writers, and is closed once
+        the results are exhausted or discarded. A collection without a table yet has it created and committed first,
+        so the read connection can see it.
+
+        Args:
+            collection_name: The name of the collection to be searched upon.
+            query: The mongo style query that is to be executed, e.g. {"country": "Chad"}.
+            projection: The top level fields to return, e.g. {"document id": 1}, or to leave out, e.g. {"body": 0}.
+            sort: A list of (field, direction) pairs to sort by, direction is 1 for ascending or -1 for descending.
+            limit: The maximum number of records to return, 0 for no limit.
+            skip: The number of records to skip before returning results.
+            batch_size: The number of rows fetched from the database at a time.
+
+        Returns:
+            A lazy iterator over the matching records or None if the query failed.
+        """
+
+        if (self.db_path, collection_name) not in self._created_tables and not self._create_table(collection_name):
+            return None
+
+        cursor = self._open_cursor(collection_name, query, projection, sort, limit, skip)
+
+        if cursor is None:
+            return None
+
+        return self._stream(cursor, batch_size, include_id=(projection or {}).get("_id", 1))
+
+    @_query_execution
+    def _open_cursor(self, collection_name: str, query: object, projection: dict | None, sort: list | None,
+                     limit: int, skip: int) -> sqlite3.Cursor:
+        table = self._table(collection_name)
+        where, parameters = translate_query(query)
+        self._track_index_usage(table, collection_name, where, parameters)
+        statement = f"SELECT _id, {select_expression(projection)} FROM {table}{where}{order_clause(sort)}"
+
+        if limit or skip:
+            statement += " LIMIT ? OFFSET ?"
+            parameters += [limit or -1, skip]
+
+        reader = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None,
+                                 check_same_thread=False)
+        reader.execute("PRAGMA query_only=1")
+
+        try:
+            return reader.execute(statement, parameters)
+        except Exception:
+            reader.close()
+            raise
+
+    def _stream(self, cursor: sqlite3.Cursor, batch_size: int, include_id: bool) -> Iterator[dict]:
+        try:
+            while rows := cursor.fetchmany(batch_size or FIND_BATCH_SIZE):
+                for record_id, data in rows:
+                    record = decode_record(record_id, data)
+
+                    if not include_id:
+                        del record["_id"]
+
+                    yield record
+        finally:
+            cursor.close()
+            cursor.connection.close()
+
+    @_query_execution
+    def aggregate(self, collection_name: str, pipeline: list, batch_size: int = FIND_BATCH_SIZE) -> Iterator[dict]:
+        """Runs a mongo style aggregation pipeline over a collection. A leading $match runs as the where clause and a
+        $group that follows it as a group by, so only the groups are read from the database, the remaining stages
+        run in process over them, see `run_pipeline`.
+
+        Args:
+            collection_name: The name of the collection the pipeline runs on.
+            pipeline: The stages of the pipeline, e.g. [{"$group": {"_id": "$country", "count": {"$sum": 1}}}].
+            batch_size: Accepted for compatibility with the other managers, the results are read at once.
+
+        Returns:
+            An iterator over the results or None if the pipeline failed, e.g. because it uses an unsupported operator.
+        """
+
+        table = self._table(collection_name)
+        stages = list(pipeline)
+        where, where_parameters = translate_query(stages.pop(0)["$match"] if stages and "$match" in stages[0]
+                                                  else None)
+        self._track_index_usage(table, collection_name, where, where_parameters)
+
+        if stages and "$group" in stages[0]:
+            parameters = []
+            select, group_by, fields = translate_group(stages.pop(0)["$group"], parameters)
+            rows = self.connection.execute(f"SELECT {select} FROM {table}{where}{group_by}",
+                                           parameters + where_parameters)
+            records = [decode_group(row, fields) for row in rows]
+        else:
+            records = [decode_record(*row)
+                       for row in self.connection.execute(f"SELECT _id, data FROM {table}{where}", where_parameters)]
+
+        return iter(run_pipeline(records, stages))
+
+    @_query_execution
+    def update(self, collection_name: str, query: object, update_type: str, new_data: object,
+               upsert: bool = False) -> int:
+        """Updates given query results with the new data, only "$set", "$unset" and "$inc" are supported.
+
+        Args:
+            collection_name: The name of the collection that you wish to update.
+            query: The mongo style query that is to be executed, e.g. {"document id": "Table1"}.
+            update_type: Either "$set", "$unset" or "$inc".
+            new_data: The fields to set, the fields to unset or the amounts to increment fields by.
+            upsert: Whether to insert a new record built from the query and new data if nothing matched the query.
+
+        Returns:
+            The number of updated records, an upserted record counts as one.
+        """
+
+        if update_type not in ("$set", "$unset", "$inc"):
+            raise ValueError(f"Unsupported update type: {update_type}")
+
+        table = self._table(collection_name)
+        where, parameters = translate_query(query)
+        self._track_index_usage(table, collection_name, where, parameters)
+        updated_rows = []
+
+        for record_id, data in self.connection.execute(f"SELECT _id, data FROM {table}{where}", parameters):
+            record = decode_record(record_id, data)
+
+            if update_type == "$set":
+                record.update(new_data)
+            elif update_type == "$inc":
+                for field, amount in new_data.items():
+                    record[field] = record.get(field, 0) + amount
+            else:
+                for field in new_data:
+                    record.pop(field, None)
+
+            updated_rows.append((encode_record(record), record_id))
+
+        self.connection.executemany(f"UPDATE {table} SET data = ? WHERE _id = ?", updated_rows)
+
+        if not updated_rows and upsert:
+            fields = {key: value for key, value in query.items() if not isinstance(value, dict)}
+            record = {**fields, **(new_data if update_type != "$unset" else {})}
+            record_id = str(record.pop("_id", self.generate_id()))
+            self.connection.execute(f"INSERT INTO {table} (_id, data) VALUES (?, ?)",
+                                    (record_id, encode_record(record)))
+
+            return 1
+
+        return len(updated_rows)
+
+    @_query_execution
+    def delete(self, collection_name: str, query: object) -> int:
+        """Deletes the results of a given query from the database.
+
+        Args:
+            collection_name: The name of the collection that you wish to delete from.
+            query: The mongo style query that is to be executed, e.g. {"document_id": "1"}.
+
+        Returns:
+            How many records were deleted.
+        """
+
+        table = self._table(collection_name)
+        where, parameters = translate_query(query)
+        self._track_index_usage(table, collection_name, where, parameters)
+
+        return self.connection.execute(f"DELETE FROM {table}{where}", parameters).rowcount
+
+    @_query_execution
+    def replace(self, collection_name: str, query: dict, data: list) -> int:
+        """Replaces the records matching a query with new records in a single transaction.
+
+        Args:
+            collection_name: The name of the collection.
+            query: The mongo style query of the records that are to be replaced.
+            data: The new records, records without an `_id` are given one.
+
+        Returns:
+            How many records were replaced, or None if the replacement failed and was rolled back.
+        """
+
+        table = self._table(collection_name)
+        where, parameters = translate_query(query)
+        self._track_index_usage(table, collection_name, where, parameters)
+        deleted = self.connection.execute(f"DELETE FROM {table}{where}", parameters).rowcount
+
+        for record in data:
+            record.setdefault("_id", self.generate_id())
+
+        self.connection.executemany(f"INSERT INTO {table} (_id, data) VALUES (?, ?)",
+                                    [(str(record["_id"]), encode_record(record)) for record in data])
+
+        return deleted
+
+    @_query_execution
+    def claim(self, collection_name: str, record_id: str, query: dict, new_data: dict) -> bool:
+        """Sets fields of the record with the given `_id` if it matches the query, or inserts it, in a single
+        immediate transaction, so claims of other connections and processes wait for it.
+        """
+
+        table = self._table(collection_name)
+        where, parameters = translate_query({"_id": str(record_id), **query})
+        row = self.connection.execute(f"SELECT _id, data FROM {table}{where}", parameters).fetchone()
+
+        if row is not None:
+            record = decode_record(*row)
+            record.update(new_data)
+            self.connection.execute(f"UPDATE {table} SET data = ? WHERE _id = ?", (encode_record(record), row[0]))
+
+            return True
+
+        if self.connection.execute(f"SELECT 1 FROM {table} WHERE _id = ?", (str(record_id),)).fetchone():
+            return False
+
+        fields = {key: value for key, value in query.items() if not isinstance(value, dict)}
+        self.connection.execute(f"INSERT INTO {table} (_id, data) VALUES (?, ?)",
+                                (str(record_id), encode_record({**fields, **new_data})))
+
+        return True
+
+    @_query_execution
+    def upsert(self, collection_name: str, data: list):
+        """Inserts records or replaces the stored records with the same `_id` in a single transaction.
+
+        Returns:
+            An object with the `upserted_ids` of the records that were written, the others were rejected by a unique
+            index. None if the write failed as a whole, e.g. because the database is locked.
+        """
+
+        table = self._table(collection_name)
+        upserted_ids = []
+
+        for record in data:
+            try:
+                self.connection.execute(f"INSERT INTO {table} (_id, data) VALUES (?, ?) "
+                                        f"ON CONFLICT(_id) DO UPDATE SET data = excluded.data",
+                                        (str(record["_id"]), encode_record(record)))
+                upserted_ids.append(record["_id"])
+            except sqlite3.IntegrityError as e:
+                logger.warning("Skipped %s: %s", record["_id"], e)
+
+        return SimpleNamespace(upserted_ids=upserted_ids)
+
+
+atexit.register(SQLiteDBManager.close_all)
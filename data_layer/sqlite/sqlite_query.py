@@ -0,0 +1,263 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple, List
+
+SQL_OPERATORS = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+GROUP_ACCUMULATORS = {"$sum": "sum({})", "$min": "min({})", "$max": "max({})", "$push": "json_group_array({})",
+                      "$addToSet": "json_group_array(DISTINCT {})"}
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def field_expression(field: str) -> str:
+    """Translates a (dotted) field name into the sql expression that reads it from a record's json, e.g.
+    "document id" into json_extract(data, '$."document id"').
+    Dates are stored as {"$date": iso format}, their iso format is read with the field "creation.$date".
+    """
+
+    if field == "_id":
+        return "_id"
+
+    return f"json_extract(data, {field_path(field)})"
+
+
+def field_path(field: str) -> str:
+    """Translates a (dotted) field name into a quoted json path literal, e.g. "document id" into '$."document id"'.
+    """
+
+    path = "$" + "".join('."' + part.replace('"', '\\"').replace("'", "''") + '"' for part in field.split("."))
+
+    return f"'{path}'"
+
+
+def select_expression(projection: dict | None) -> str:
+    """Translates a mongo style projection into the sql expression that selects the projected json of a record.
+    Excluded fields, e.g. {"body": 0}, are removed with json_remove, included top level fields, e.g.
+    {"document id": 1}, are gathered with json_object and the fields a record is missing are patched away.
+    The `_id` is a column of its own and is not part of the expression.
+    """
+
+    fields = {field: value for field, value in (projection or {}).items() if field != "_id"}
+
+    if not fields:
+        return "data" if not projection or not projection["_id"] else "'{}'"
+
+    if any(fields.values()):
+        pairs = ", ".join(f"{to_sql_literal(field)}, data -> {field_path(field)}" for field, value in fields.items()
+                          if value)
+
+        return f"json_patch('{{}}', json_object({pairs}))"
+
+    return f"json_remove(data, {', '.join(field_path(field) for field in fields)})"
+
+
+def order_clause(sort: list | None) -> str:
+    """Translates a list of (field, direction) pairs into an sql order by clause, e.g. [("country", -1)].
+    """
+
+    if not sort:
+        return ""
+
+    return " ORDER BY " + ", ".join(f"{field_expression(field)} {'DESC' if direction < 0 else 'ASC'}"
+                                    for field, direction in sort)
+
+
+def to_sql_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def translate_query(query: dict | None) -> Tuple[str, List]:
+    """Translates a simple mongo style query into a sql where clause and its parameters.
+    Supports equality and the $eq, $ne, $gt, $gte, $lt, $lte, $in, $nin and $exists operators on (dotted) fields.
+
+    Args:
+        query: The query, e.g. {"country": "Chad", "Current Length": {"$gt": 100}}.
+
+    Returns:
+        A tuple of the (where clause, parameters), the clause is empty if the query is.
+    """
+
+    conditions = []
+    parameters = []
+
+    for field, condition in (query or {}).items():
+        if not (isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition)):
+            condition = {"$eq": condition}
+
+        for operator, target in condition.items():
+            expression = field_expression(f"{field}.$date" if isinstance(target, datetime) else field)
+
+            if operator in ("$eq", "$ne") and target is None:
+                conditions.append(f"{expression} IS {'NOT ' if operator == '$ne' else ''}NULL")
+            elif operator == "$ne":
+                # like mongo, a record that is missing the field, or has it as null, does not equal the target
+                conditions.append(f"({expression} IS NULL OR {expression} != ?)")
+                parameters.append(to_sql_value(target))
+            elif operator in SQL_OPERATORS:
+                conditions.append(f"{expression} {SQL_OPERATORS[operator]} ?")
+                parameters.append(to_sql_value(target))
+            elif operator in ("$in", "$nin"):
+                values = [value for value in target if value is not None]
+                placeholders = ", ".join("?" for _ in values)
+                condition_sql = f"{expression} {'NOT ' if operator == '$nin' else ''}IN ({placeholders})"
+
+                # a missing or null field is in the targets only if None is one of them, sql's IN never matches it
+                if (None in target) != (operator == "$nin"):
+                    condition_sql = f"({expression} IS NULL OR {condition_sql})"
+
+                conditions.append(condition_sql)
+                parameters.extend(to_sql_value(value) for value in values)
+            elif operator == "$exists":
+                # json_type tells a field that is null apart from a missing one, json_extract gives NULL for both
+                type_expression = "_id" if field == "_id" else f"json_type(data, {field_path(field)})"
+                conditions.append(f"{type_expression} IS {'NOT ' if target else ''}NULL")
+            else:
+                raise ValueError(f"Unsupported query operator: {operator}")
+
+    return (f" WHERE {' AND '.join(conditions)}" if conditions else ""), parameters
+
+
+def translate_expression(expression, parameters: list) -> str:
+    """Translates a mongo aggregation expression into sql on the records' json fields, e.g. "$country" into
+    json_extract(data, '$."country"'). Supports field paths, literals and the $concat, $substrCP, $ifNull and $cond
+    operators.
+
+    Args:
+        expression: The expression, e.g. {"$substrCP": ["$creation date", 6, 4]}.
+        parameters: The parameters of the expression's literals are appended to it, in the order they appear in.
+
+    Returns:
+        The sql expression.
+    """
+
+    if isinstance(expression, str) and expression.startswith("$"):
+        return field_expression(expression[1:])
+
+    if isinstance(expression, dict) and len(expression) == 1 and next(iter(expression)).startswith("$"):
+        operator, arguments = next(iter(expression.items()))
+        arguments = [translate_expression(argument, parameters) for argument in arguments]
+
+        if operator == "$concat":
+            return f"({' || '.join(arguments)})"
+        elif operator == "$substrCP":
+            return f"substr({arguments[0]}, {arguments[1]} + 1, {arguments[2]})"
+        elif operator == "$ifNull":
+            return f"coalesce({', '.join(arguments)})"
+        elif operator == "$cond":
+            return f"(CASE WHEN coalesce({arguments[0]} NOT IN (0), 0) THEN {arguments[1]} ELSE {arguments[2]} END)"
+
+        raise ValueError(f"Unsupported expression operator: {operator}")
+
+    if isinstance(expression, (dict, list)):
+        raise ValueError(f"Unsupported expression: {expression}")
+
+    parameters.append(to_sql_value(expression))
+
+    return "?"
+
+
+def translate_group(specification: dict, parameters: list) -> Tuple[str, str, List]:
+    """Translates a $group stage into the columns of an sql select and its group by clause.
+    The `_id` is either a single expression or a dict of them, the accumulators are $sum, $min, $max, $push and
+    $addToSet.
+
+    Args:
+        specification: The specification of the stage, e.g. {"_id": "$country", "count": {"$sum": 1}}.
+        parameters: The parameters of the columns are appended to it.
+
+    Returns:
+        A tuple of the (select columns, group by clause, fields), the fields are the (name, kind) of every selected
+        column: "key" for a field of a dict `_id`, "id" for a single `_id`, "json" for an accumulated array and
+        "value" for any other accumulator.
+    """
+
+    columns = []
+    fields = []
+    key = specification["_id"]
+    key_fields = isinstance(key, dict) and not any(name.startswith("$") for name in key)
+
+    for name, expression in key.items() if key_fields else [("_id", key)]:
+        columns.append(translate_expression(expression, parameters))
+        fields.append((name, "key" if key_fields else "id"))
+
+    key_count = len(columns)
+
+    for name, accumulator in specification.items():
+        if name == "_id":
+            continue
+
+        operator, expression = next(iter(accumulator.items()))
+        argument = translate_expression(expression, parameters)
+
+        if operator in GROUP_ACCUMULATORS:
+            columns.append(GROUP_ACCUMULATORS[operator].format(argument))
+            fields.append((name, "json" if operator in ("$push", "$addToSet") else "value"))
+        else:
+            raise ValueError(f"Unsupported accumulator: {operator}")
+
+    select = ", ".join(f"{column} AS {quote_identifier(f'c{i}')}" for i, column in enumerate(columns))
+    group_by = ", ".join(quote_identifier(f"c{i}") for i in range(key_count))
+
+    return select, f" GROUP BY {group_by}" if group_by else "", fields
+
+
+def decode_group(row: tuple, fields: list) -> dict:
+    """Builds the result of a $group stage out of a row selected with the columns of `translate_group`.
+    """
+
+    record = {}
+
+    for value, (name, kind) in zip(row, fields):
+        if kind == "key":
+            record.setdefault("_id", {})[name] = value
+        elif kind == "json":
+            record[name] = json.loads(value)
+        else:
+            record[name] = value
+
+    return record
+
+
+def to_sql_value(value):
+    if isinstance(value, bool):
+        return int(value)
+
+    if isinstance(value, datetime):
+        return value.isoformat()
+
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+
+    return value
+
+
+def encode_record(record: dict) -> str:
+    def default(value):
+        if isinstance(value, datetime):
+            return {"$date": value.isoformat()}
+
+        if isinstance(value, bytes):
+            return {"$binary": base64.b64encode(value).decode("ascii")}
+
+        return str(value)
+
+    return json.dumps({key: value for key, value in record.items() if key != "_id"}, default=default)
+
+
+def decode_record(record_id: str, data: str) -> dict:
+    def object_hook(value: dict):
+        if len(value) == 1 and "$date" in value:
+            return datetime.fromisoformat(value["$date"])
+
+        if len(value) == 1 and "$binary" in value:
+            return base64.b64decode(value["$binary"])
+
+        return value
+
+    record = json.loads(data, object_hook=object_hook)
+    record["_id"] = record_id
+
+    return record
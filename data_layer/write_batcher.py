@@ -0,0 +1,133 @@
+from threading import Lock, Event, Thread
+from typing import Callable, Any
+from consts import WRITE_BATCH_SIZE, WRITE_FLUSH_INTERVAL
+from data_layer.db_manager import DBManager
+from instrumentation import metrics
+
+buffered_records = metrics.gauge("write_batcher_buffered_records", "Records that wait in a WriteBatcher.")
+flushed_records = metrics.counter("write_batcher_flushed_records_total", "Records written by a WriteBatcher.")
+
+
+class WriteBatcher:
+    def __init__(self, db_manager: DBManager,
+                 batch_size: int = WRITE_BATCH_SIZE,
+                 flush_interval: float = WRITE_FLUSH_INTERVAL,
+                 on_flush: Callable[[str, list, bool], Any] | None = None):
+        """Buffers records per collection and writes them with a single unordered bulk insert.
+        A collection is flushed as soon as it holds batch_size records, and a background thread flushes whatever is
+        buffered every flush_interval seconds.
+
+        Args:
+            db_manager: The DBManager that executes the bulk inserts.
+            batch_size: How many records of a single collection are buffered before they are written.
+            flush_interval: The maximum amount of seconds a record is buffered before it is written.
+            on_flush: An optional callback, called with (collection_name, records, success) after every bulk insert,
+                once for the records that were inserted and once for the records that failed, e.g. as duplicates.
+        """
+
+        self.db_manager: DBManager = db_manager
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.on_flush = on_flush
+        self.inserted: dict = {}
+        self.failed: dict = {}
+        self._buffers: dict = {}
+        self._lock: Lock = Lock()
+        self._closed: Event = Event()
+        self._flusher: Thread = Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+
+    def add(self, collection_name: str, record: dict):
+        """Buffers a record for insertion. An `_id` is assigned to the record if it has none, so other records can
+        reference it before it is written.
+
+        Args:
+            collection_name: The name of the collection the record is to be inserted into.
+            record: The record that is to be inserted.
+
+        Returns:
+            The `_id` of the record.
+        """
+
+        if self._closed.is_set():
+            raise RuntimeError(f"Cannot add records to a closed {self.__class__.__name__}")
+
+        if "_id" not in record:
+            record["_id"] = self.db_manager.generate_id()
+
+        with self._lock:
+            buffer = self._buffers.setdefault(collection_name, [])
+            buffer.append(record)
+            batch = self._buffers.pop(collection_name) if len(buffer) >= self.batch_size else None
+
+        buffered_records.inc(collection=collection_name)
+
+        if batch:
+            self._write(collection_name, batch)
+
+        return record["_id"]
+
+    def flush(self, collection_name: str | None = None):
+        """Writes the buffered records of a collection, or of every collection if none is given.
+        """
+
+        with self._lock:
+            if collection_name is None:
+                batches, self._buffers = self._buffers, {}
+            else:
+                batches = {collection_name: self._buffers.pop(collection_name, [])}
+
+        for name, batch in batches.items():
+            if batch:
+                self._write(name, batch)
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Writes everything that is buffered, like `flush`, so a WriteBatcher can stand in for a WriteSpool. Its
+        writes are done once they return.
+
+        Returns:
+            True.
+        """
+
+        self.flush()
+
+        return True
+
+    def close(self):
+        """Stops the background flusher and writes everything that is still buffered.
+        """
+
+        self._closed.set()
+        self._flusher.join()
+        self.flush()
+
+    def _write(self, collection_name: str, batch: list):
+        buffered_records.dec(len(batch), collection=collection_name)
+        insert_results = self.db_manager.insert(collection_name=collection_name, data=batch, ordered=False)
+        inserted_ids = set(map(str, getattr(insert_results, "inserted_ids", None) or [])) if insert_results else set()
+        inserted = [record for record in batch if str(record["_id"]) in inserted_ids]
+        failed = [record for record in batch if str(record["_id"]) not in inserted_ids]
+
+        for records, success, counts in ((inserted, True, self.inserted), (failed, False, self.failed)):
+            if not records:
+                continue
+
+            flushed_records.inc(len(records), collection=collection_name, success=success)
+
+            with self._lock:
+                counts[collection_name] = counts.get(collection_name, 0) + len(records)
+
+            if self.on_flush:
+                self.on_flush(collection_name, records, success)
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+        return False
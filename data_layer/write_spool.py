@@ -0,0 +1,398 @@
+import os
+import json
+import fcntl
+import pickle
+import random
+import struct
+import zlib
+from glob import glob
+from threading import Lock, Event, Thread, Condition
+from time import monotonic
+from typing import Callable, Any
+from consts import (WRITE_BATCH_SIZE, WRITE_FLUSH_INTERVAL, SPOOL_SEGMENT_SIZE, SPOOL_RETRY_INITIAL_DELAY,
+                    SPOOL_RETRY_MAX_DELAY)
+from data_layer.db_manager import DBManager
+from instrumentation import metrics, get_logger
+
+logger = get_logger("data_layer.spool")
+spooled_records = metrics.gauge("write_spool_pending_records", "Records in a WriteSpool that wait to be drained.")
+drained_records = metrics.counter("write_spool_drained_records_total", "Records drained from a WriteSpool.")
+drain_retries = metrics.counter("write_spool_retries_total", "Batches a WriteSpool retried after the db failed.")
+
+FRAME_HEADER = struct.Struct("<II")
+SEGMENT_PATTERN = "segment-*.log"
+
+
+def segment_sequence(path: str) -> int:
+    return int(os.path.basename(path)[len("segment-"):-len(".log")])
+
+
+class WriteSpool:
+    def __init__(self, directory: str,
+                 db_manager: DBManager,
+                 batch_size: int = WRITE_BATCH_SIZE,
+                 flush_interval: float = WRITE_FLUSH_INTERVAL,
+                 on_flush: Callable[[str, list, bool], Any] | None = None,
+                 segment_size: int = SPOOL_SEGMENT_SIZE,
+                 retry_initial_delay: float = SPOOL_RETRY_INITIAL_DELAY,
+                 retry_max_delay: float = SPOOL_RETRY_MAX_DELAY):
+        """A durable write-behind buffer that can stand in for a WriteBatcher.
+        Records are appended to segment files in a local directory at disk speed, and a background drainer sends them
+        to the db in batches of idempotent upserts, retrying with an exponential backoff for as long as the db fails,
+        so a slow or unavailable db never blocks the writers and nothing that was spooled is lost.
+        The drainer checkpoints its position after every batch and deletes segments once they are drained. A spool
+        that is opened on a directory left behind by a crashed process resumes draining from its checkpoint, records
+        that were drained but not yet checkpointed are simply upserted again.
+
+        Args:
+            directory: The directory of the segment files, only a single spool may use it at a time.
+            db_manager: The DBManager the records are drained into, it must implement `upsert`.
+            batch_size: The maximal number of records of a collection in a single upsert.
+            flush_interval: How often in seconds an idle drainer syncs the spooled records to disk and checks for new ones.
+            on_flush: An optional callback, called with (collection_name, records, success) after every drained batch,
+                once for the records that were written and once for the records the db rejected.
+            segment_size: The size in bytes after which a new segment file is started.
+            retry_initial_delay: The delay in seconds before the first retry of a failed batch.
+            retry_max_delay: The maximal delay in seconds between retries.
+        """
+
+        self.directory: str = directory
+        self.db_manager: DBManager = db_manager
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.on_flush = on_flush
+        self.segment_size: int = segment_size
+        self.retry_initial_delay: float = retry_initial_delay
+        self.retry_max_delay: float = retry_max_delay
+        self.inserted: dict = {}
+        self.failed: dict = {}
+        self._pending: dict = {}
+        self._spooled: int = 0
+        self._drained: int = 0
+        self._lock: Lock = Lock()
+        self._drained_condition: Condition = Condition(self._lock)
+        self._appended: Event = Event()
+        self._closed: Event = Event()
+        self._abandoned: Event = Event()
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(os.path.join(directory, "spool.lock"), "w")
+
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+
+            raise RuntimeError(f"The spool directory {directory} is used by another process")
+
+        segments = sorted(glob(os.path.join(directory, SEGMENT_PATTERN)), key=segment_sequence)
+        self._sequence: int = segment_sequence(segments[-1]) + 1 if segments else 0
+        self._segment = open(self._segment_path(self._sequence), "ab")
+
+        if segments:
+            resumed = self._count_spooled(segments)
+            logger.info("Resuming %d spooled records in %s", resumed, directory)
+
+        self._drainer: Thread = Thread(target=self._drain, daemon=True)
+        self._drainer.start()
+
+    def _count_spooled(self, segments: list) -> int:
+        """Counts the records a previous spool left in the directory that were not drained yet.
+        """
+
+        checkpoint_sequence, checkpoint_offset = self._read_checkpoint()
+        resumed = 0
+
+        for path in segments:
+            if segment_sequence(path) < checkpoint_sequence:
+                continue
+
+            with open(path, "rb") as segment:
+                segment.seek(checkpoint_offset if segment_sequence(path) == checkpoint_sequence else 0)
+
+                while records := self._next_frames(segment, self.batch_size)[0]:
+                    for collection_name, _ in records:
+                        spooled_records.inc(collection=collection_name)
+                        self._pending[collection_name] = self._pending.get(collection_name, 0) + 1
+
+                    self._spooled += len(records)
+                    resumed += len(records)
+
+        return resumed
+
+    def _segment_path(self, sequence: int) -> str:
+        return os.path.join(self.directory, f"segment-{sequence:012d}.log")
+
+    def add(self, collection_name: str, record: dict):
+        """Appends a record to the spool. An `_id` is assigned to the record if it has none, so other records can
+        reference it before it is written, and so draining it again after a crash replaces it instead of duplicating
+        it.
+
+        Returns:
+            The `_id` of the record.
+        """
+
+        if "_id" not in record:
+            record["_id"] = self.db_manager.generate_id()
+
+        payload = pickle.dumps((collection_name, record), protocol=pickle.HIGHEST_PROTOCOL)
+        frame = FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+        with self._lock:
+            self._segment.write(frame)
+            self._segment.flush()
+
+            if self._segment.tell() >= self.segment_size:
+                self._rotate()
+
+            self._pending[collection_name] = self._pending.get(collection_name, 0) + 1
+            self._spooled += 1
+
+        spooled_records.inc(collection=collection_name)
+        self._appended.set()
+
+        return record["_id"]
+
+    @property
+    def pending(self) -> dict:
+        """The number of records of every collection that were spooled but not drained yet, e.g. those that stay
+        spooled once the spool was closed.
+        """
+
+        with self._lock:
+            return {collection_name: count for collection_name, count in self._pending.items() if count}
+
+    def _rotate(self):
+        os.fsync(self._segment.fileno())
+        self._segment.close()
+        self._sequence += 1
+        self._segment = open(self._segment_path(self._sequence), "ab")
+
+    def flush(self, collection_name: str | None = None):
+        """Syncs the spooled records to disk and wakes the drainer, it does not wait for them to be drained.
+        """
+
+        self._sync()
+        self._appended.set()
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Waits until every record that was spooled so far was drained, written or rejected by the db, and its
+        on_flush callback returned.
+
+        Args:
+            timeout: The maximal number of seconds to wait, as long as the db is unavailable if not given.
+
+        Returns:
+            Whether every record was drained.
+        """
+
+        self.flush()
+        deadline = monotonic() + timeout if timeout is not None else None
+
+        with self._drained_condition:
+            spooled = self._spooled
+
+            while self._drained < spooled:
+                remaining = deadline - monotonic() if deadline is not None else self.flush_interval
+
+                if remaining <= 0 or not self._drainer.is_alive():
+                    return False
+
+                self._drained_condition.wait(min(remaining, self.flush_interval))
+
+        return True
+
+    def _sync(self):
+        with self._lock:
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+
+    def close(self, timeout: float | None = None):
+        """Waits for every spooled record to be drained and stops the drainer.
+
+        Args:
+            timeout: The maximal number of seconds to wait, records that were not drained by then stay in the spool
+                directory and are drained by the next spool that is opened on it.
+        """
+
+        self.flush()
+        self._closed.set()
+        self._appended.set()
+        self._drainer.join(timeout)
+
+        if self._drainer.is_alive():
+            self._abandoned.set()
+            self._drainer.join()
+            logger.warning("Not every spooled record was drained, the rest stays in %s", self.directory)
+
+        with self._lock:
+            self._segment.close()
+
+        fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+        self._lock_file.close()
+
+    def _read_checkpoint(self) -> tuple:
+        try:
+            with open(os.path.join(self.directory, "checkpoint.json")) as f:
+                checkpoint = json.load(f)
+
+            return checkpoint["segment"], checkpoint["offset"]
+        except FileNotFoundError:
+            return -1, 0
+
+    def _write_checkpoint(self, sequence: int, offset: int):
+        path = os.path.join(self.directory, "checkpoint.json")
+
+        with open(path + ".tmp", "w") as f:
+            json.dump({"segment": sequence, "offset": offset}, f)
+
+        os.replace(path + ".tmp", path)
+
+    def _next_frames(self, segment, limit: int) -> tuple:
+        """Reads up to limit complete frames from the position of segment, stopping at a torn or unwritten frame.
+
+        Returns:
+            A tuple of the (records as (collection name, record) pairs, whether a corrupt frame was found).
+        """
+
+        records = []
+
+        while len(records) < limit:
+            position = segment.tell()
+            header = segment.read(FRAME_HEADER.size)
+
+            if len(header) < FRAME_HEADER.size:
+                segment.seek(position)
+
+                return records, False
+
+            length, checksum = FRAME_HEADER.unpack(header)
+            payload = segment.read(length)
+
+            if len(payload) < length:
+                segment.seek(position)
+
+                return records, False
+
+            if zlib.crc32(payload) != checksum:
+                segment.seek(position)
+
+                return records, True
+
+            records.append(pickle.loads(payload))
+
+        return records, False
+
+    def _drain(self):
+        checkpoint_sequence, checkpoint_offset = self._read_checkpoint()
+
+        while True:
+            segments = sorted(glob(os.path.join(self.directory, SEGMENT_PATTERN)), key=segment_sequence)
+            segments = [path for path in segments if segment_sequence(path) >= checkpoint_sequence]
+
+            if not segments:
+                os.remove(os.path.join(self.directory, "checkpoint.json"))
+
+                return
+
+            path = segments[0]
+            sequence = segment_sequence(path)
+
+            with open(path, "rb") as segment:
+                segment.seek(checkpoint_offset if sequence == checkpoint_sequence else 0)
+
+                while True:
+                    with self._lock:
+                        sealed = sequence < self._sequence
+
+                    records, corrupt = self._next_frames(segment, self.batch_size)
+
+                    if records:
+                        if not self._write(records):
+                            return
+
+                        self._write_checkpoint(sequence, segment.tell())
+                        continue
+
+                    if sealed or corrupt:
+                        offset = segment.tell()
+
+                        if corrupt or segment.read(1):
+                            logger.error("Skipping the torn end of %s from offset %d", path, offset)
+
+                        break
+
+                    if self._closed.is_set():
+                        break
+
+                    if not self._appended.wait(self.flush_interval):
+                        self._sync()
+
+                    self._appended.clear()
+
+            os.remove(path)
+            checkpoint_sequence, checkpoint_offset = sequence + 1, 0
+            self._write_checkpoint(checkpoint_sequence, checkpoint_offset)
+
+    def _write(self, records: list) -> bool:
+        """Upserts a batch of spooled records by collection, retrying every collection until the db accepts it.
+
+        Returns:
+            False if the spool was abandoned before the db accepted the batch, True otherwise.
+        """
+
+        batches = {}
+
+        for collection_name, record in records:
+            batches.setdefault(collection_name, []).append(record)
+
+        for collection_name, batch in batches.items():
+            delay = self.retry_initial_delay
+
+            while (results := self.db_manager.upsert(collection_name=collection_name, data=batch)) is None:
+                drain_retries.inc(collection=collection_name)
+                logger.warning("Failed to drain %d records into %s, retrying in %.1fs", len(batch), collection_name,
+                               delay)
+
+                if self._abandoned.wait(delay * random.uniform(0.5, 1)):
+                    return False
+
+                delay = min(delay * 2, self.retry_max_delay)
+
+            upserted_ids = set(map(str, results.upserted_ids))
+            written = [record for record in batch if str(record["_id"]) in upserted_ids]
+            rejected = [record for record in batch if str(record["_id"]) not in upserted_ids]
+
+            spooled_records.dec(len(batch), collection=collection_name)
+
+            with self._lock:
+                self._pending[collection_name] -= len(batch)
+
+            for records_, success, counts in ((written, True, self.inserted), (rejected, False, self.failed)):
+                if not records_:
+                    continue
+
+                drained_records.inc(len(records_), collection=collection_name, success=success)
+
+                with self._lock:
+                    counts[collection_name] = counts.get(collection_name, 0) + len(records_)
+
+                if self.on_flush:
+                    try:
+                        self.on_flush(collection_name, records_, success)
+                    except Exception as e:
+                        logger.error("The on_flush callback failed for %s: %s", collection_name, e)
+
+            with self._drained_condition:
+                self._drained += len(batch)
+                self._drained_condition.notify_all()
+
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+        return False
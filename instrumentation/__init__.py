@@ -0,0 +1,12 @@
+from importlib import import_module
+from .metrics import MetricsRegistry, Counter, Gauge, Histogram, metrics
+from .log import get_logger, configure_logging, RateLimitFilter
+
+LAZY_ATTRIBUTES = {"StageProfiler": "instrumentation.profiler"}
+
+
+def __getattr__(name: str):
+    if name in LAZY_ATTRIBUTES:
+        return getattr(import_module(LAZY_ATTRIBUTES[name]), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,78 @@
+import os
+import logging
+from threading import Lock
+from time import monotonic
+
+LOGGER_NAMESPACE = "beaconcure"
+
+
+class RateLimitFilter(logging.Filter):
+    def __init__(self, max_records: int = 10, interval: float = 1.0):
+        """Lets at most max_records records with the same logger and message template through every interval seconds,
+        and reports how many were suppressed once the interval is over.
+
+        Args:
+            max_records: How many records of a single template are let through per interval.
+            interval: The length of an interval in seconds.
+        """
+
+        super().__init__()
+        self.max_records: int = max_records
+        self.interval: float = interval
+        self._windows: dict = {}
+        self._lock: Lock = Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.msg)
+        now = monotonic()
+
+        with self._lock:
+            window_start, count, suppressed = self._windows.get(key, (now, 0, 0))
+
+            if now - window_start >= self.interval:
+                if suppressed:
+                    record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+
+                window_start, count, suppressed = now, 0, 0
+
+            if count < self.max_records:
+                self._windows[key] = (window_start, count + 1, suppressed)
+
+                return True
+
+            self._windows[key] = (window_start, count, suppressed + 1)
+
+            return False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Returns the logger of a module under the application's namespace, e.g. get_logger("parsers").
+    Messages are formatted lazily with %-style arguments, so a disabled level costs a single level check.
+    """
+
+    return logging.getLogger(f"{LOGGER_NAMESPACE}.{name}")
+
+
+def configure_logging(level: str | int = os.getenv("LOG_LEVEL", "INFO"),
+                      max_records: int = int(os.getenv("LOG_RATE_LIMIT", 10)),
+                      interval: float = 1.0):
+    """Sends the application's logs to stderr as structured key=value lines.
+
+    Args:
+        level: The minimal level that is logged, e.g. "DEBUG".
+        max_records: How many records of a single message template are logged per interval.
+        interval: The length of a rate limiting interval in seconds.
+    """
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("time=%(asctime)s level=%(levelname)s logger=%(name)s "
+                                           "thread=%(threadName)s message=\"%(message)s\""))
+    handler.addFilter(RateLimitFilter(max_records=max_records, interval=interval))
+
+    logger = logging.getLogger(LOGGER_NAMESPACE)
+    logger.handlers = [handler]
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+logging.getLogger(LOGGER_NAMESPACE).addHandler(logging.NullHandler())
@@ -0,0 +1,237 @@
+import os
+import json
+from bisect import bisect_left
+from threading import Lock
+from time import perf_counter
+from functools import wraps
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key: tuple, extra: dict | None = None) -> str:
+    labels = dict(key, **(extra or {}))
+
+    if not labels:
+        return ""
+
+    return "{" + ",".join(f'{name}="{str(value)}"' for name, value in labels.items()) + "}"
+
+
+class Metric:
+    type_name = ""
+
+    def __init__(self, registry, name: str, description: str = ""):
+        self.registry = registry
+        self.name: str = name
+        self.description: str = description
+        self._values: dict = {}
+        self._lock: Lock = Lock()
+
+    def samples(self) -> list:
+        with self._lock:
+            return [(dict(key), value) for key, value in self._values.items()]
+
+    def prometheus_lines(self) -> list:
+        with self._lock:
+            return [f"{self.name}{_format_labels(key)} {value}" for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if not self.registry.enabled:
+            return
+
+        key = _label_key(labels)
+
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        if not self.registry.enabled:
+            return
+
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        if not self.registry.enabled:
+            return
+
+        key = _label_key(labels)
+
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, registry, name: str, description: str = "", buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(registry, name, description)
+        self.buckets: tuple = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        if not self.registry.enabled:
+            return
+
+        key = _label_key(labels)
+        bucket = bisect_left(self.buckets, value)
+
+        with self._lock:
+            counts = self._values.get(key)
+
+            if counts is None:
+                counts = self._values[key] = {"buckets": [0] * (len(self.buckets) + 1), "count": 0, "sum": 0.0}
+
+            counts["buckets"][bucket] += 1
+            counts["count"] += 1
+            counts["sum"] += value
+
+    def time(self, **labels):
+        """Times a block or a function into the histogram, e.g. `with histogram.time(stage="read"):`.
+        """
+
+        return Timer(self, labels)
+
+    def samples(self) -> list:
+        with self._lock:
+            return [(dict(key), {"count": counts["count"],
+                                 "sum": counts["sum"],
+                                 "buckets": dict(zip([*map(str, self.buckets), "+Inf"], counts["buckets"]))})
+                    for key, counts in self._values.items()]
+
+    def prometheus_lines(self) -> list:
+        lines = []
+
+        with self._lock:
+            for key, counts in self._values.items():
+                cumulative = 0
+
+                for upper_bound, count in zip([*map(str, self.buckets), "+Inf"], counts["buckets"]):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(key, {'le': upper_bound})} {cumulative}")
+
+                lines.append(f"{self.name}_sum{_format_labels(key)} {counts['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {counts['count']}")
+
+        return lines
+
+
+class Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram: Histogram = histogram
+        self.labels: dict = labels
+        self.start: float = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.histogram.observe(perf_counter() - self.start, **self.labels)
+
+        return False
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with Timer(self.histogram, self.labels):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+class MetricsRegistry:
+    def __init__(self, prefix: str = "beaconcure_", enabled: bool = True):
+        """Holds every metric of the process and exports them as a Prometheus text file or a json snapshot.
+        A disabled registry turns every update into a single attribute check.
+
+        Args:
+            prefix: Prepended to the name of every metric.
+            enabled: Whether the metrics are updated.
+        """
+
+        self.prefix: str = prefix
+        self.enabled: bool = enabled
+        self._metrics: dict = {}
+        self._lock: Lock = Lock()
+
+    def _get_or_create(self, metric_class, name: str, description: str, **kwargs):
+        name = f"{self.prefix}{name}"
+
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = metric_class(self, name, description, **kwargs)
+
+            return self._metrics[name]
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(self, name: str, description: str = "", buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, description, buckets=buckets)
+
+    def reset(self):
+        with self._lock:
+            for metric in self._metrics.values():
+                with metric._lock:
+                    metric._values.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        return {metric.name: {"type": metric.type_name,
+                              "description": metric.description,
+                              "samples": [{"labels": labels, "value": value} for labels, value in metric.samples()]}
+                for metric in metrics}
+
+    def to_prometheus(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.prometheus_lines())
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Writes the metrics into a file, in the Prometheus text format if it ends with .prom and as json otherwise.
+        The file is replaced atomically so a scraper never reads a partial file.
+        """
+
+        temp_path = f"{path}.tmp"
+
+        with open(temp_path, 'w') as f:
+            if path.endswith(".prom"):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.snapshot(), f, indent=4)
+
+        os.replace(temp_path, path)
+
+
+metrics = MetricsRegistry(enabled=os.getenv("METRICS_ENABLED", "1") not in ("0", "false", "False"))
@@ -0,0 +1,369 @@
+import os
+import json
+import heapq
+import pstats
+import cProfile
+import tracemalloc
+from itertools import count
+from contextlib import contextmanager
+from threading import Lock, local, get_ident
+from time import perf_counter
+from consts import PROFILE_TOP_N, PROFILE_SAMPLE_EVERY, PROFILE_TRACE_MEMORY
+
+PROFILE_TOP_FUNCTIONS = 25
+# Paths of a stage whose time is below this share of the stage are left out of the collapsed stacks.
+MIN_STACK_SHARE = 0.0005
+MAX_STACK_DEPTH = 64
+
+
+class _StatsSnapshot:
+    """Lets pstats load the raw stats of another process, which only come as a dict.
+    """
+
+    def __init__(self, stats: dict):
+        self.stats: dict = stats
+
+    def create_stats(self):
+        pass
+
+
+def function_name(function: tuple) -> str:
+    file_name, line, name = function
+
+    return name if file_name == "~" else f"{os.path.basename(file_name)}:{line}({name})"
+
+
+PROFILER_FILE = function_name.__code__.co_filename
+CONTEXTLIB_FILE = contextmanager.__code__.co_filename
+PROFILE_DISABLE = ("~", 0, "<method 'disable' of '_lsprof.Profiler' objects>")
+GENERATOR_NEXT = ("~", 0, "<built-in method builtins.next>")
+
+
+def strip_profiler_frames(stats: dict):
+    """Removes the frames of the profiler itself from raw cProfile stats: a stage is profiled from within its context
+    manager, so the end of every stage records the `__exit__` and `next` that resume it, the `stage` generator and the
+    call that disables the profile.
+    """
+
+    def called_by_profiler(function):
+        callers = stats[function][-1]
+        return all(caller in own_frames or caller not in stats for caller in callers)
+
+    own_frames = {function for function in stats if function[0] == PROFILER_FILE or function == PROFILE_DISABLE}
+    trampolines = [function for function in stats if function[0] == CONTEXTLIB_FILE or function == GENERATOR_NEXT]
+    while frames := [function for function in trampolines
+                     if function not in own_frames and called_by_profiler(function)]:
+        own_frames.update(frames)
+
+    for function in own_frames:
+        del stats[function]
+
+    for *_, callers in stats.values():
+        for function in own_frames.intersection(callers):
+            del callers[function]
+
+
+class StageProfiler:
+    def __init__(self, top_n: int = PROFILE_TOP_N,
+                 sample_every: int = PROFILE_SAMPLE_EVERY,
+                 trace_memory: bool = PROFILE_TRACE_MEMORY):
+        """Profiles every stage of a run with cProfile and keeps the slowest and the most memory hungry input files,
+        so pathological documents and hot spots can be found in production without attaching external tools.
+        A stage is profiled on the thread it runs on, and every sample_every-th run of a stage is profiled to bound
+        the overhead. All of them are timed. The memory of a file is the tracemalloc peak while it is processed on its
+        thread, other threads allocating at the same time are counted along with it.
+
+        Args:
+            top_n: How many of the slowest and of the most memory hungry files are kept.
+            sample_every: Every how many runs of a stage one is profiled, 1 profiles all of them.
+            trace_memory: Whether tracemalloc traces allocations, it slows down the run considerably.
+        """
+
+        self.top_n: int = top_n
+        self.sample_every: int = max(1, sample_every)
+        self.trace_memory: bool = trace_memory
+        self._runs: dict = {}
+        self.reset()
+
+    def reset(self):
+        """Forgets everything that was measured, e.g. once a worker process sent its `snapshot`.
+        """
+
+        self._profiles: dict = {}
+        self._stats: dict = {}
+        self._stage_seconds: dict = {}
+        self._stage_calls: dict = {}
+        self._slowest: list = []
+        self._hungriest: list = []
+        self._files: int = 0
+        self._order = count()
+        self._lock: Lock = Lock()
+        self._local = local()
+
+    def __getstate__(self) -> dict:
+        return {"top_n": self.top_n, "sample_every": self.sample_every, "trace_memory": self.trace_memory}
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._runs = {}
+        self.reset()
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self):
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, stage: str):
+        """Times a stage, e.g. `with profiler.stage("parse"):`, and profiles it if it is sampled.
+        """
+
+        with self._lock:
+            self._stage_calls[stage] = self._stage_calls.get(stage, 0) + 1
+            runs = self._runs[stage] = self._runs.get(stage, 0) + 1
+            profile = self._profiles.setdefault((stage, get_ident()), cProfile.Profile()) \
+                if (runs - 1) % self.sample_every == 0 else None
+
+        start = perf_counter()
+
+        if profile:
+            profile.enable()
+
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+
+            seconds = perf_counter() - start
+
+            with self._lock:
+                self._stage_seconds[stage] = self._stage_seconds.get(stage, 0.0) + seconds
+
+            entry = getattr(self._local, "entry", None)
+
+            if entry is not None:
+                entry["stages"][stage] = entry["stages"].get(stage, 0.0) + seconds
+
+    def file_entry(self, file_name: str, offset: int | None = None) -> dict:
+        """Starts the measurements of a file whose stages may run on several threads, each part is measured with
+        `measure` and the entry is counted with `add_file` once the file is done.
+        """
+
+        entry = {"file": file_name, "stages": {}, "seconds": 0.0}
+
+        if offset is not None:
+            entry["offset"] = offset
+
+        return entry
+
+    @contextmanager
+    def measure(self, entry: dict):
+        """Adds the time and memory of the stages that run within the block on the current thread to a file entry.
+        """
+
+        tracing = tracemalloc.is_tracing()
+
+        if tracing:
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+
+        self._local.entry = entry
+        start = perf_counter()
+
+        try:
+            yield entry
+        finally:
+            entry["seconds"] += perf_counter() - start
+            self._local.entry = None
+
+            if tracing:
+                peak_memory = tracemalloc.get_traced_memory()[1] - start_memory
+                entry["peak memory"] = max(entry.get("peak memory", 0), peak_memory)
+
+    def add_file(self, entry: dict):
+        """Counts a measured file into the slowest and the most memory hungry ones.
+        """
+
+        with self._lock:
+            self._files += 1
+            order = next(self._order)
+            self._push(self._slowest, (entry["seconds"], order, entry))
+
+            if "peak memory" in entry:
+                self._push(self._hungriest, (entry["peak memory"], order, entry))
+
+    def _push(self, heap: list, item: tuple):
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, item)
+        elif item[0] > heap[0][0]:
+            heapq.heapreplace(heap, item)
+
+    def stats(self, stage: str) -> pstats.Stats | None:
+        """The merged cProfile stats of a stage over every thread, and over the worker processes that were merged.
+        """
+
+        with self._lock:
+            profiles = [profile for (profile_stage, _), profile in self._profiles.items() if profile_stage == stage]
+            snapshots = self._stats.get(stage, [])
+
+        sources = [*profiles, *map(_StatsSnapshot, snapshots)]
+
+        if not sources:
+            return None
+
+        stats = pstats.Stats(sources[0])
+
+        for source in sources[1:]:
+            stats.add(source)
+
+        strip_profiler_frames(stats.stats)
+
+        return stats
+
+    @property
+    def stages(self) -> list:
+        with self._lock:
+            return list(self._stage_calls)
+
+    def snapshot(self) -> dict:
+        """Everything that was measured as plain data, e.g. to send it from a worker process to be `merge`d.
+        """
+
+        stages = {}
+
+        for stage in self.stages:
+            stats = self.stats(stage)
+            stages[stage] = stats.stats if stats else None
+
+        with self._lock:
+            return {"stats": stages,
+                    "stage seconds": dict(self._stage_seconds),
+                    "stage calls": dict(self._stage_calls),
+                    "files": [entry for _, _, entry in self._slowest + self._hungriest],
+                    "file count": self._files}
+
+    def merge(self, snapshot: dict):
+        """Adds what another profiler measured, e.g. the `snapshot` of a worker process.
+        """
+
+        with self._lock:
+            for stage, stats in snapshot["stats"].items():
+                if stats:
+                    self._stats.setdefault(stage, []).append(stats)
+
+            for stage, seconds in snapshot["stage seconds"].items():
+                self._stage_seconds[stage] = self._stage_seconds.get(stage, 0.0) + seconds
+
+            for stage, calls in snapshot["stage calls"].items():
+                self._stage_calls[stage] = self._stage_calls.get(stage, 0) + calls
+
+            self._files += snapshot["file count"]
+            seen = set()
+
+            for entry in snapshot["files"]:
+                if id(entry) not in seen:
+                    seen.add(id(entry))
+                    order = next(self._order)
+                    self._push(self._slowest, (entry["seconds"], order, entry))
+
+                    if "peak memory" in entry:
+                        self._push(self._hungriest, (entry["peak memory"], order, entry))
+
+    def collapsed_stacks(self) -> list:
+        """Builds flame graph stacks out of the caller graph of every stage, e.g. for flamegraph.pl or speedscope.
+        cProfile only records which function called which, so the time of a function that is called from several
+        places is split over them in proportion to their calls.
+
+        Returns:
+            A "stage;caller;...;function microseconds" line for every path.
+        """
+
+        lines = []
+
+        for stage in self.stages:
+            stats = self.stats(stage)
+
+            if stats is None:
+                continue
+
+            callees = {}
+
+            for function, (_, _, _, _, callers) in stats.stats.items():
+                for caller in callers:
+                    callees.setdefault(caller, []).append(function)
+
+            total = sum(self_time for _, _, self_time, _, _ in stats.stats.values())
+            roots = [function for function, (*_, callers) in stats.stats.items()
+                     if not any(caller in stats.stats for caller in callers)]
+
+            for root in roots:
+                self._expand(stats.stats, callees, root, [stage], 1.0, total * MIN_STACK_SHARE, lines)
+
+        return lines
+
+    def _expand(self, stats: dict, callees: dict, function: tuple, stack: list, share: float, min_time: float,
+                lines: list):
+        _, _, self_time, cumulative_time, _ = stats[function]
+        stack = stack + [function_name(function)]
+
+        if self_time * share >= min_time:
+            lines.append(f"{';'.join(stack)} {round(self_time * share * 1_000_000)}")
+
+        if len(stack) > MAX_STACK_DEPTH:
+            return
+
+        for callee in callees.get(function, []):
+            edge_time = stats[callee][4][function][3]
+            callee_time = stats[callee][3]
+
+            if callee_time and edge_time * share >= min_time and function_name(callee) not in stack:
+                self._expand(stats, callees, callee, stack, share * edge_time / callee_time, min_time, lines)
+
+    def report(self) -> dict:
+        """The time of every stage with its hottest functions, and the slowest and most memory hungry files.
+        """
+
+        stages = {}
+
+        for stage in self.stages:
+            stats = self.stats(stage)
+            functions = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True) if stats else []
+
+            with self._lock:
+                stages[stage] = {"seconds": self._stage_seconds.get(stage, 0.0),
+                                 "calls": self._stage_calls.get(stage, 0),
+                                 "top functions": [{"function": function_name(function),
+                                                    "calls": calls,
+                                                    "self seconds": self_time,
+                                                    "cumulative seconds": cumulative_time}
+                                                   for function, (_, calls, self_time, cumulative_time, _)
+                                                   in functions[:PROFILE_TOP_FUNCTIONS]]}
+
+        with self._lock:
+            return {"files": self._files,
+                    "sample every": self.sample_every,
+                    "stages": stages,
+                    "slowest files": [entry for *_, entry in sorted(self._slowest, reverse=True)],
+                    "most memory files": [entry for *_, entry in sorted(self._hungriest, reverse=True)]}
+
+    def write(self, path: str) -> tuple:
+        """Writes the report as json into path and the collapsed stacks next to it, with a .collapsed extension.
+
+        Returns:
+            The paths of the (json report, collapsed stacks).
+        """
+
+        stacks_path = f"{os.path.splitext(path)[0]}.collapsed"
+
+        with open(path, 'w') as f:
+            json.dump({**self.report(), "collapsed stacks": stacks_path}, f, indent=4)
+
+        with open(stacks_path, 'w') as f:
+            f.write("\n".join(self.collapsed_stacks()) + "\n")
+
+        return path, stacks_path
+
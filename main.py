@@ -1,15 +1,129 @@
-from parsers import parser_wrapper
+from time import perf_counter
+
+started = perf_counter()
+
+import os
+import sys
+import argparse
+from consts import MAX_WORKERS, STREAM_BLOCK_SIZE
+from data_layer import manager_factory
+from parsers import parser_wrapper, JsonLinesSink
+from instrumentation import configure_logging, metrics
+
+imported = perf_counter()
+
+
+def parse_arguments(argv: list | None = None) -> argparse.Namespace:
+    argument_parser = argparse.ArgumentParser(prog="python main.py",
+                                              description="Parses the table documents of a directory, validates them "
+                                                          "and stores the results.")
+    argument_parser.add_argument("source", nargs="?", default=".Beaconcure/documents",
+                                 help="The directory of the documents.")
+    argument_parser.add_argument("--parser", default="html", choices=parser_wrapper.parser_types,
+                                 help="The registered parser type.")
+    argument_parser.add_argument("--db", default="mongo", choices=manager_factory.db_types,
+                                 help="The registered db manager type.")
+    argument_parser.add_argument("--id-tag", default="table")
+    argument_parser.add_argument("--title-tag", default="caption")
+    argument_parser.add_argument("--head-tag", default="thead")
+    argument_parser.add_argument("--body-tag", default="tbody")
+    argument_parser.add_argument("--footer-tag", default="tfoot")
+    argument_parser.add_argument("--country-date-regex", default=r"Creation: (\d{1,2}[A-Za-z]{3}\d{4}) ([A-Za-z]+)",
+                                 help="The regex of the creation date and country in the footer, an empty one does "
+                                      "not extract them.")
+    argument_parser.add_argument("--date-format", default="%d%b%Y")
+    argument_parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="The amount of parsing workers.")
+    argument_parser.add_argument("--execution-mode", default="threads", choices=("threads", "processes"))
+    argument_parser.add_argument("--incremental", action="store_true",
+                                 help="Skip unchanged files and replace the documents of changed ones.")
+    argument_parser.add_argument("--stream", action="store_true",
+                                 help="Make every id tag element of a file a document of its own and scan the files in "
+                                      "blocks, for exports that hold many tables in one large file.")
+    argument_parser.add_argument("--stream-block-size", type=int, default=STREAM_BLOCK_SIZE,
+                                 help="How many bytes of a file are scanned at a time with --stream.")
+    argument_parser.add_argument("--deduplicate", default=None, choices=("skip", "alias"),
+                                 help="Skip tables that were already ingested, or record them as aliases.")
+    argument_parser.add_argument("--record-format", default="html", choices=("html", "compact"),
+                                 help="Store the header and body as html, or as arrays of typed cells.")
+    argument_parser.add_argument("--keep-html", action="store_true",
+                                 help="Keep the original html of compact records as a compressed blob.")
+    argument_parser.add_argument("--distributed", default=None, metavar="RUN_ID",
+                                 help="Share the files with the other nodes that run with the same RUN_ID against the "
+                                      "same db, every node ingests the batches of files it claims a lease on.")
+    argument_parser.add_argument("--watch", action="store_true",
+                                 help="Keep ingesting the files that are dropped into the source directory in micro "
+                                      "batches, until SIGINT or SIGTERM is received.")
+    argument_parser.add_argument("--poll", action="store_true",
+                                 help="Watch the source directory by polling instead of inotify, e.g. on network "
+                                      "mounts.")
+    argument_parser.add_argument("--output", default=None,
+                                 help="Write the records into this json lines file instead of the db.")
+    argument_parser.add_argument("--profile", default=None, metavar="REPORT",
+                                 help="Profile every stage and write a json report into this file, along with "
+                                      "collapsed stacks for a flame graph next to it.")
+    argument_parser.add_argument("--dry-run", action="store_true",
+                                 help="Load the selected parser and db manager without parsing anything.")
+    argument_parser.add_argument("--metrics", default=os.getenv("METRICS_PATH"),
+                                 help="A file to write the collected metrics into.")
+
+    arguments = argument_parser.parse_args(argv)
+
+    if arguments.watch and arguments.output:
+        argument_parser.error("--watch writes into the db and cannot be combined with --output")
+
+    return arguments
+
+
+def main(argv: list | None = None):
+    arguments = parse_arguments(argv)
+    configure_logging()
+
+    html_parser = parser_wrapper.get_parser(parser_type=arguments.parser,
+                                            id_tag=arguments.id_tag,
+                                            title_tag=arguments.title_tag,
+                                            head_tag=arguments.head_tag,
+                                            body_tag=arguments.body_tag,
+                                            footer_tag=arguments.footer_tag,
+                                            extract_country_and_date_from_footer=bool(arguments.country_date_regex),
+                                            country_date_regex=arguments.country_date_regex or None,
+                                            date_format=arguments.date_format,
+                                            max_workers=arguments.workers,
+                                            execution_mode=arguments.execution_mode,
+                                            incremental=arguments.incremental,
+                                            stream=arguments.stream,
+                                            stream_block_size=arguments.stream_block_size,
+                                            deduplicate=arguments.deduplicate,
+                                            record_format=arguments.record_format,
+                                            keep_html=arguments.keep_html,
+                                            distributed_run=arguments.distributed,
+                                            profile=bool(arguments.profile),
+                                            db_type=arguments.db)
+
+    if not arguments.output:
+        manager_factory.get_manager_class(arguments.db)
+
+    loaded = perf_counter()
+    print(f"Started in {(loaded - started) * 1000:.0f}ms: {(imported - started) * 1000:.0f}ms importing the "
+          f"application and {(loaded - imported) * 1000:.0f}ms loading the {arguments.parser} parser"
+          f"{'' if arguments.output else f' and the {arguments.db} db manager'}", file=sys.stderr)
+
+    if arguments.dry_run:
+        return
+
+    if arguments.watch:
+        print(html_parser.watch(arguments.source, use_inotify=not arguments.poll))
+    elif arguments.output:
+        print(f"Wrote {html_parser.ingest(arguments.source, JsonLinesSink(arguments.output))} records into "
+              f"{arguments.output}")
+    else:
+        print(html_parser.parse(arguments.source))
+
+    if arguments.profile:
+        print(f"Wrote the profile into {' and '.join(html_parser.profiler.write(arguments.profile))}", file=sys.stderr)
+
+    if arguments.metrics:
+        metrics.write(arguments.metrics)
+
 
 if __name__ == '__main__':
-    html_parser = parser_wrapper.get_parser(parser_type="html",
-                                            id_tag="table",
-                                            title_tag="caption",
-                                            head_tag="thead",
-                                            body_tag="tbody",
-                                            footer_tag="tfoot",
-                                            extract_country_and_date_from_footer=True,
-                                            country_date_regex=r"Creation: (\d{1,2}[A-Za-z]{3}\d{4}) ([A-Za-z]+)",
-                                            date_format="%d%b%Y"
-                                            )
-
-    html_parser.parse(".Beaconcure/documents")
+    main()
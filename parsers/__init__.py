@@ -1,5 +1,7 @@
+from importlib import import_module
 from .parser import Parser
 from .parser_wrapper import ParserWrapper
+from .sinks import Sink, DBSink, JsonLinesSink
 
 parser_wrapper = ParserWrapper()
 
@@ -13,4 +15,17 @@ def register_parser(parser_type: str):
     return decorator
 
 
-from .parser_implementations import HTMLParser
+parser_wrapper.register_module("html", "parsers.parser_implementations.html_parser")
+parser_wrapper.register_module("html-fast", "parsers.parser_implementations.html_fast_parser")
+
+LAZY_ATTRIBUTES = {"HTMLParser": "parsers.parser_implementations",
+                   "HTMLFastParser": "parsers.parser_implementations",
+                   "RevalidationJob": "parsers.revalidation_job",
+                   "LeaseCoordinator": "parsers.lease_coordinator"}
+
+
+def __getattr__(name: str):
+    if name in LAZY_ATTRIBUTES:
+        return getattr(import_module(LAZY_ATTRIBUTES[name]), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,79 @@
+from threading import BoundedSemaphore, Lock
+from concurrent.futures import Executor, Future, wait
+from instrumentation import metrics
+
+queued_tasks = metrics.gauge("executor_queued_tasks", "Tasks that were submitted and wait for a free worker.")
+running_tasks = metrics.gauge("executor_running_tasks", "Tasks that are currently running on a worker.")
+
+
+class BoundedExecutor:
+    def __init__(self, executor: Executor, max_workers: int, queue_size: int):
+        """Wraps an executor so that at most max_workers + queue_size tasks are pending at any time.
+        Once the limit is reached submit blocks until a running task finishes, applying backpressure to the producer
+        instead of letting the executor's internal queue grow without bound.
+
+        Args:
+            executor: The executor that runs the submitted tasks, e.g. a ThreadPoolExecutor.
+            max_workers: The amount of workers of the wrapped executor.
+            queue_size: How many tasks may wait for a free worker before submit blocks.
+        """
+
+        self.executor: Executor = executor
+        self._slots: BoundedSemaphore = BoundedSemaphore(max_workers + queue_size)
+        self._futures: set = set()
+        self._lock: Lock = Lock()
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        self._slots.acquire()
+        queued_tasks.inc()
+
+        try:
+            future = self.executor.submit(self._run, fn, *args, **kwargs)
+        except Exception:
+            queued_tasks.dec()
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._futures.add(future)
+
+        future.add_done_callback(self._release)
+
+        return future
+
+    @staticmethod
+    def _run(fn, *args, **kwargs):
+        queued_tasks.dec()
+        running_tasks.inc()
+
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            running_tasks.dec()
+
+    def _release(self, future: Future):
+        with self._lock:
+            self._futures.discard(future)
+
+        self._slots.release()
+
+    def join(self):
+        """Blocks until every submitted task has finished.
+        """
+
+        with self._lock:
+            futures = list(self._futures)
+
+        wait(futures)
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.join()
+        self.shutdown()
+
+        return False
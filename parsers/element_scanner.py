@@ -0,0 +1,72 @@
+import re
+from typing import Iterator
+from consts import STREAM_BLOCK_SIZE
+from instrumentation import get_logger
+
+logger = get_logger("parsers.scanner")
+
+
+def element_pattern(tag: str) -> re.Pattern:
+    return re.compile(rb"<(/?)" + re.escape(tag.encode()) + rb"(?=[\s/>])[^>]*>", re.IGNORECASE)
+
+
+def scan_elements(file_name: str, tag: str, block_size: int = STREAM_BLOCK_SIZE) -> Iterator[tuple]:
+    """Finds every top level element of a tag in a file without loading it, by reading it in fixed-size blocks and
+    matching only the start and end tags of that tag. Elements of the tag that are nested in another one belong to it.
+    Only the part of a block that may still hold the beginning of a tag is carried into the next one, so the memory
+    used is bounded by block_size no matter how large the file is.
+
+    Args:
+        file_name: A path to a html file.
+        tag: The tag of the elements, e.g. 'table'.
+        block_size: How many bytes are read at a time.
+
+    Yields:
+        A tuple of the (start, end) byte offsets of every element as soon as its end tag was read. An element that is
+        still open at the end of the file ends with it.
+    """
+
+    pattern = element_pattern(tag)
+    buffer = b""
+    buffer_offset = 0
+    depth = 0
+    start = 0
+
+    with open(file_name, 'rb') as f:
+        while block := f.read(block_size):
+            buffer += block
+            position = 0
+
+            for match in pattern.finditer(buffer):
+                position = match.end()
+
+                if not match.group(1):
+                    if not depth:
+                        start = buffer_offset + match.start()
+
+                    depth += 1
+                elif depth:
+                    depth -= 1
+
+                    if not depth:
+                        yield start, buffer_offset + match.end()
+
+            carry = buffer.find(b"<", max(position, buffer.rfind(b">") + 1))
+            carry = len(buffer) if carry == -1 else carry
+            buffer_offset += carry
+            buffer = buffer[carry:]
+
+    if depth:
+        logger.warning("The last %s of %s is not closed", tag, file_name)
+
+        yield start, buffer_offset + len(buffer)
+
+
+def read_span(file_name: str, start: int, end: int) -> str:
+    """Reads the content between two byte offsets of a file.
+    """
+
+    with open(file_name, 'rb') as f:
+        f.seek(start)
+
+        return f.read(end - start).decode()
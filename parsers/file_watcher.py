@@ -0,0 +1,181 @@
+import os
+import select
+import struct
+import ctypes
+import ctypes.util
+from time import time, sleep
+from fnmatch import fnmatch
+from abc import ABC, abstractmethod
+from consts import WATCH_SETTLE_TIME
+from instrumentation import get_logger
+
+logger = get_logger("parsers.watcher")
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class FileWatcher(ABC):
+    def __init__(self, dir_path: str, pattern: str = "*.html"):
+        """Reports the files of a directory that were completely written, either created, replaced or modified.
+
+        Args:
+            dir_path: The directory that is watched, its subdirectories are not.
+            pattern: The pattern of the names of the watched files, e.g. "*.html". Hidden files are ignored, so a
+                writer can drop a file safely by writing it under a hidden or different name and renaming it.
+        """
+
+        self.dir_path: str = dir_path
+        self.pattern: str = pattern
+
+    def matches(self, file_name: str) -> bool:
+        return not file_name.startswith(".") and fnmatch(file_name, self.pattern)
+
+    def scan(self) -> list:
+        """Returns the paths of every watched file that is in the directory.
+        """
+
+        with os.scandir(self.dir_path) as entries:
+            return [entry.path for entry in entries if entry.is_file() and self.matches(entry.name)]
+
+    @abstractmethod
+    def poll(self, timeout: float) -> list:
+        """Waits up to timeout seconds for files to be completely written.
+
+        Returns:
+            The paths of the files that were completely written since the last poll.
+        """
+
+        raise NotImplementedError(f"Function `poll` is not implemented for: {self.__class__.__name__}")
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+        return False
+
+
+class InotifyWatcher(FileWatcher):
+    def __init__(self, dir_path: str, pattern: str = "*.html"):
+        """A FileWatcher that is notified by the Linux kernel through inotify, a file is reported as soon as the writer
+        closes it or it is renamed into the directory, so files are never picked up half written.
+
+        Raises:
+            OSError: If inotify is not available.
+        """
+
+        super().__init__(dir_path, pattern)
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd: int = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        if libc.inotify_add_watch(self.fd, os.fsencode(dir_path), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+
+            raise OSError(errno, f"inotify_add_watch failed for {dir_path}")
+
+    def poll(self, timeout: float) -> list:
+        if not select.select([self.fd], [], [], max(timeout, 0))[0]:
+            return []
+
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        file_names = []
+        offset = 0
+
+        while offset < len(buffer):
+            _, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            name = os.fsdecode(buffer[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0"))
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                logger.warning("Missed inotify events of %s, rescanning it", self.dir_path)
+
+                return self.scan()
+
+            if name and self.matches(name):
+                file_names.append(os.path.join(self.dir_path, name))
+
+        return list(dict.fromkeys(file_names))
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher(FileWatcher):
+    def __init__(self, dir_path: str, pattern: str = "*.html", settle_time: float = WATCH_SETTLE_TIME):
+        """A FileWatcher that scans the directory, for systems and file systems without inotify, e.g. network mounts.
+        A file is only reported once its size and modification time stayed the same for settle_time seconds, so files
+        that are still being written are not picked up.
+
+        Args:
+            settle_time: How many seconds a file must stay unchanged before it is considered completely written.
+        """
+
+        super().__init__(dir_path, pattern)
+        self.settle_time: float = settle_time
+        self._reported: dict = {}
+
+        for file_name in self.scan():
+            self._reported[file_name] = self._signature(file_name)
+
+    @staticmethod
+    def _signature(file_name: str) -> tuple | None:
+        try:
+            stat = os.stat(file_name)
+        except FileNotFoundError:
+            return None
+
+        return stat.st_size, stat.st_mtime_ns
+
+    def poll(self, timeout: float) -> list:
+        deadline = time() + max(timeout, 0)
+
+        while True:
+            file_names = []
+            now = time()
+
+            for file_name in self.scan():
+                signature = self._signature(file_name)
+
+                if signature is not None and signature != self._reported.get(file_name) and \
+                        now - signature[1] / 1e9 >= self.settle_time:
+                    self._reported[file_name] = signature
+                    file_names.append(file_name)
+
+            if file_names or now >= deadline:
+                return file_names
+
+            sleep(min(self.settle_time / 2, max(deadline - now, 0)))
+
+
+def create_watcher(dir_path: str, pattern: str = "*.html", use_inotify: bool = True,
+                   settle_time: float = WATCH_SETTLE_TIME) -> FileWatcher:
+    """Creates an InotifyWatcher, or a PollingWatcher if inotify is not used or not available.
+    """
+
+    if use_inotify:
+        try:
+            return InotifyWatcher(dir_path, pattern)
+        except (OSError, AttributeError) as e:
+            logger.info("inotify is not available (%s), polling %s instead", e, dir_path)
+
+    return PollingWatcher(dir_path, pattern, settle_time=settle_time)
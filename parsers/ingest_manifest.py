@@ -0,0 +1,187 @@
+import os
+import json
+import hashlib
+from threading import Lock
+from data_layer import DBManager
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_file(path: str) -> str:
+    file_hash = hashlib.blake2b(digest_size=16)
+
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            file_hash.update(block)
+
+    return file_hash.hexdigest()
+
+
+class IngestManifest:
+    def __init__(self):
+        """Remembers the size, modification time and content hash of every ingested file, so a rerun can tell which
+        files have not changed since they were ingested.
+        The entries are kept in memory, subclasses decide where they are loaded from and saved to.
+        A file may hold several documents, e.g. every table of a streamed file, its entry is then only committed once
+        every one of them was written, see `hold`, `release` and `seal`. If any of them failed the file is recorded
+        without its modification time and hash, so the next run ingests it again and replaces the documents that were
+        already written instead of rejecting them as duplicates.
+        """
+
+        self.entries: dict = {}
+        self._dirty: set = set()
+        self._pending: dict = {}
+        self._lock: Lock = Lock()
+
+    def changed_entry(self, path: str) -> dict | None:
+        """Checks whether a file changed since it was last ingested.
+        The content is only hashed if the size or modification time differ from the recorded ones, a file whose
+        content is unchanged only gets its recorded modification time refreshed.
+
+        Args:
+            path: The path of the file.
+
+        Returns:
+            None if the file is unchanged, otherwise the entry to `commit` once it is ingested. The entry's "replaces"
+            is True if a previous version of the file was already ingested.
+        """
+
+        stat = os.stat(path)
+
+        with self._lock:
+            previous = self.entries.get(path)
+
+        if previous and previous["size"] == stat.st_size and previous["mtime"] == stat.st_mtime_ns:
+            return None
+
+        entry = {"path": path, "size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": hash_file(path)}
+
+        if previous and previous["hash"] == entry["hash"]:
+            self.commit(entry)
+
+            return None
+
+        entry["replaces"] = previous is not None
+
+        return entry
+
+    def commit(self, entry: dict):
+        entry = {key: entry[key] for key in ("path", "size", "mtime", "hash")}
+
+        with self._lock:
+            self.entries[entry["path"]] = entry
+            self._dirty.add(entry["path"])
+
+    def hold(self, entry: dict):
+        """Registers a document of the entry's file that is yet to be written.
+        """
+
+        with self._lock:
+            pending = self._pending.setdefault(entry["path"], {"documents": 0, "sealed": False, "failed": False})
+            pending["documents"] += 1
+
+    def release(self, entry: dict, success: bool = True):
+        """Registers that a held document of the entry's file was written, or that it failed if not success.
+        The entry is committed once the file is sealed and none of its held documents is pending.
+        """
+
+        with self._lock:
+            pending = self._pending[entry["path"]]
+            pending["documents"] -= 1
+            pending["failed"] |= not success
+            settled = self._settle(entry["path"])
+
+        if settled is not None:
+            self.commit(entry if settled else {**entry, "mtime": None, "hash": None})
+
+    def seal(self, entry: dict, success: bool = True):
+        """Registers that every document of the entry's file was held, or that the file could not be read completely
+        if not success.
+        """
+
+        with self._lock:
+            pending = self._pending.setdefault(entry["path"], {"documents": 0, "sealed": False, "failed": False})
+            pending["sealed"] = True
+            pending["failed"] |= not success
+            settled = self._settle(entry["path"])
+
+        if settled is not None:
+            self.commit(entry if settled else {**entry, "mtime": None, "hash": None})
+
+    def _settle(self, path: str) -> bool | None:
+        """Forgets a sealed file once none of its documents is pending.
+
+        Returns:
+            None if the file is still pending, otherwise whether every one of its documents was written.
+        """
+
+        pending = self._pending[path]
+
+        if not pending["sealed"] or pending["documents"]:
+            return None
+
+        del self._pending[path]
+
+        return not pending["failed"]
+
+    def save(self):
+        pass
+
+
+class FileIngestManifest(IngestManifest):
+    def __init__(self, manifest_path: str):
+        """An IngestManifest that is kept in a local json file.
+
+        Args:
+            manifest_path: The path of the json file, it is created on the first save if it does not exist.
+        """
+
+        super().__init__()
+        self.manifest_path: str = manifest_path
+
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                self.entries = json.load(f)
+
+    def save(self):
+        temp_path = f"{self.manifest_path}.tmp"
+
+        with self._lock:
+            with open(temp_path, 'w') as f:
+                json.dump(self.entries, f)
+
+            os.replace(temp_path, self.manifest_path)
+            self._dirty.clear()
+
+
+class DBIngestManifest(IngestManifest):
+    def __init__(self, db_manager: DBManager, collection_name: str = "ingest manifest"):
+        """An IngestManifest that is kept in a db collection, one record per file keyed by its "path".
+
+        Args:
+            db_manager: The DBManager of the db the manifest is kept in.
+            collection_name: The name of the manifest collection.
+        """
+
+        super().__init__()
+        self.db_manager: DBManager = db_manager
+        self.collection_name: str = collection_name
+
+        for record in self.db_manager.find(collection_name=collection_name) or []:
+            record.pop("_id", None)
+            self.entries[record["path"]] = record
+
+    def save(self):
+        """Upserts the entries that changed since the last save.
+        """
+
+        with self._lock:
+            dirty = [self.entries[path] for path in self._dirty]
+            self._dirty.clear()
+
+        for entry in dirty:
+            self.db_manager.update(collection_name=self.collection_name,
+                                   query={"path": entry["path"]},
+                                   update_type="$set",
+                                   new_data=entry,
+                                   upsert=True)
@@ -0,0 +1,219 @@
+import os
+import json
+import socket
+import hashlib
+from uuid import uuid4
+from time import time
+from threading import Event, Lock, Thread
+from typing import Iterator
+from consts import LEASE_BATCH_SIZE, LEASE_SECONDS, LEASE_HEARTBEAT_INTERVAL, LEASE_POLL_INTERVAL
+from data_layer import manager_factory
+from instrumentation import metrics, get_logger
+
+logger = get_logger("parsers.leases")
+lease_claims = metrics.counter("lease_claims_total", "Attempts to claim a batch of files, by result.")
+held_leases = metrics.gauge("leases_held", "Batches of files this node holds a lease on.")
+
+
+class LeaseCoordinator:
+    def __init__(self, db_type: str,
+                 run_id: str,
+                 node_id: str | None = None,
+                 collection_name: str = "ingest leases",
+                 node_collection: str = "ingest nodes",
+                 lease_seconds: float = LEASE_SECONDS,
+                 heartbeat_interval: float = LEASE_HEARTBEAT_INTERVAL,
+                 poll_interval: float = LEASE_POLL_INTERVAL):
+        """Spreads the files of a run over several nodes that share a db. The files are split into batches, and a node
+        only ingests a batch after it claimed the batch's lease document with an atomic `DBManager.claim`. Leases are
+        renewed by a heartbeat while the node works, a lease that was not renewed for lease_seconds, e.g. because its
+        node crashed, is taken over by another node. A node keeps going until every batch of the run is done.
+        Every node of a run must list the same files, the lease of a batch is keyed by the names of its files.
+
+        Args:
+            db_type: The registered db manager type, every thread uses a manager of its own.
+            run_id: Identifies the run, nodes with the same run_id share its batches. A new run_id ingests everything
+                again.
+            node_id: Identifies this node, defaults to its host name and process id.
+            collection_name: The collection of the lease documents.
+            node_collection: The collection the nodes register in.
+            lease_seconds: How long a lease is held without a heartbeat. Node clocks are compared, so they must be
+                synchronized to well within this.
+            heartbeat_interval: How many seconds pass between heartbeats.
+            poll_interval: How many seconds to wait before checking again for expired leases once every batch was
+                claimed but not every one is done.
+        """
+
+        self.db_type: str = db_type
+        self.run_id: str = run_id
+        self.node_id: str = node_id or f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:6]}"
+        self.collection_name: str = collection_name
+        self.node_collection: str = node_collection
+        self.lease_seconds: float = lease_seconds
+        self.heartbeat_interval: float = heartbeat_interval
+        self.poll_interval: float = poll_interval
+        self._held: set = set()
+        self._lock: Lock = Lock()
+        self._stopped: Event = Event()
+        self._heartbeat: Thread | None = None
+
+    def lease_id(self, files: list) -> str:
+        names = json.dumps([os.path.basename(file_name) for file_name in files])
+
+        return f"{self.run_id}:{hashlib.blake2b(names.encode(), digest_size=16).hexdigest()}"
+
+    def register(self):
+        """Registers the node and starts its heartbeat.
+        """
+
+        self._beat(manager_factory.get_manager(self.db_type))
+        self._heartbeat = Thread(target=self._run_heartbeat, name="lease-heartbeat", daemon=True)
+        self._heartbeat.start()
+        logger.info("Node %s joined run %s", self.node_id, self.run_id)
+
+    def leases(self, files: list, batch_size: int = LEASE_BATCH_SIZE) -> Iterator[tuple]:
+        """Claims the batches of files one at a time, the caller ingests a batch and marks it `complete` before the
+        next one is claimed. Once every batch was claimed, the ones that are not done are checked every
+        poll_interval seconds and taken over once their lease expires.
+
+        Args:
+            files: The paths of every file of the run.
+            batch_size: How many files are in a batch.
+
+        Yields:
+            A tuple of the (lease id, files) of every batch this node claimed.
+        """
+
+        files = sorted(files)
+        batches = {}
+
+        for start in range(0, len(files), batch_size):
+            batch = files[start:start + batch_size]
+            batches[self.lease_id(batch)] = batch
+
+        db_manager = manager_factory.get_manager(self.db_type)
+        remaining = list(batches)
+        # Nodes start at different batches, so they rarely race for the same lease.
+        offset = int(hashlib.blake2b(self.node_id.encode(), digest_size=4).hexdigest(), 16) % max(len(remaining), 1)
+        remaining = remaining[offset:] + remaining[:offset]
+
+        while remaining and not self._stopped.is_set():
+            for lease_id in remaining:
+                if self.claim(db_manager, lease_id, batches[lease_id]):
+                    yield lease_id, batches[lease_id]
+
+            done = {record["_id"] for record in db_manager.find(collection_name=self.collection_name,
+                                                                query={"run": self.run_id, "state": "done"},
+                                                                projection={"_id": 1}) or []}
+            remaining = [lease_id for lease_id in remaining if lease_id not in done]
+
+            if remaining:
+                logger.debug("%d batches of run %s are leased by other nodes", len(remaining), self.run_id)
+                self._stopped.wait(self.poll_interval)
+
+    def claim(self, db_manager, lease_id: str, files: list) -> bool:
+        """Claims the lease of a batch if nobody holds it, or if its holder did not renew it in time.
+
+        Returns:
+            Whether this node holds the lease now.
+        """
+
+        now = time()
+        claimed = db_manager.claim(self.collection_name, lease_id,
+                                   query={"state": "leased", "expires": {"$lt": now}},
+                                   new_data={"run": self.run_id, "files": [os.path.basename(file_name)
+                                                                           for file_name in files],
+                                             "owner": self.node_id, "expires": now + self.lease_seconds,
+                                             "claimed": now})
+        lease_claims.inc(result="claimed" if claimed else "taken")
+
+        if claimed:
+            with self._lock:
+                self._held.add(lease_id)
+                held_leases.set(len(self._held))
+
+            logger.debug("Node %s claimed %s", self.node_id, lease_id)
+
+        return bool(claimed)
+
+    def complete(self, lease_id: str):
+        """Marks a batch as done once its files were ingested, so no other node takes it over.
+        """
+
+        self._release(lease_id)
+
+        if not manager_factory.get_manager(self.db_type).claim(self.collection_name, lease_id,
+                                                               query={"owner": self.node_id},
+                                                               new_data={"state": "done", "completed": time()}):
+            logger.warning("Node %s lost the lease of %s before completing it, it may have been ingested twice",
+                           self.node_id, lease_id)
+
+    def close(self):
+        """Stops the heartbeat, gives up the leases that are still held so other nodes take them over right away, and
+        deregisters the node.
+        """
+
+        self._stopped.set()
+
+        if self._heartbeat:
+            self._heartbeat.join()
+
+        db_manager = manager_factory.get_manager(self.db_type)
+
+        with self._lock:
+            held, self._held = self._held, set()
+            held_leases.set(0)
+
+        for lease_id in held:
+            db_manager.claim(self.collection_name, lease_id, query={"owner": self.node_id, "state": "leased"},
+                             new_data={"expires": 0})
+
+        db_manager.update(collection_name=self.node_collection, query={"_id": self.node_id}, update_type="$set",
+                          new_data={"state": "stopped", "heartbeat": time()})
+        logger.info("Node %s left run %s", self.node_id, self.run_id)
+
+    def progress(self) -> dict:
+        """Counts the leases of the run by their state, e.g. {"leased": 2, "done": 40}.
+        """
+
+        counts = {}
+
+        for record in manager_factory.get_manager(self.db_type).find(collection_name=self.collection_name,
+                                                                     query={"run": self.run_id},
+                                                                     projection={"state": 1}) or []:
+            counts[record["state"]] = counts.get(record["state"], 0) + 1
+
+        return counts
+
+    def _release(self, lease_id: str):
+        with self._lock:
+            self._held.discard(lease_id)
+            held_leases.set(len(self._held))
+
+    def _run_heartbeat(self):
+        db_manager = manager_factory.get_manager(self.db_type)
+
+        while not self._stopped.wait(self.heartbeat_interval):
+            try:
+                self._beat(db_manager)
+            except Exception as e:
+                logger.error("Node %s failed to send a heartbeat: %s", self.node_id, e)
+
+    def _beat(self, db_manager):
+        """Renews the leases this node holds and its registration.
+        """
+
+        now = time()
+
+        with self._lock:
+            held = list(self._held)
+
+        for lease_id in held:
+            if not db_manager.claim(self.collection_name, lease_id, query={"owner": self.node_id, "state": "leased"},
+                                    new_data={"expires": now + self.lease_seconds}) and lease_id in self._held:
+                logger.warning("Node %s lost the lease of %s", self.node_id, lease_id)
+                self._release(lease_id)
+
+        db_manager.update(collection_name=self.node_collection, query={"_id": self.node_id}, update_type="$set",
+                          new_data={"run": self.run_id, "host": socket.gethostname(), "pid": os.getpid(),
+                                    "state": "active", "heartbeat": now}, upsert=True)
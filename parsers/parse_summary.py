@@ -0,0 +1,39 @@
+from threading import Lock
+from instrumentation import metrics
+
+documents_total = metrics.counter("parser_documents_total", "The ParseSummary counts of every parse run, by field.")
+
+
+class ParseSummary:
+    def __init__(self):
+        """A thread safe tally of what happened during a single parse run.
+        """
+
+        self.parsed: int = 0
+        self.inserted: int = 0
+        self.updated: int = 0
+        self.skipped: int = 0
+        self.duplicates: int = 0
+        self.failed: int = 0
+        self.discrepancies: int = 0
+        self.spooled: int = 0
+        self._lock: Lock = Lock()
+
+    def increment(self, field: str, amount: int = 1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+        documents_total.inc(amount, result=field)
+
+    def to_dict(self) -> dict:
+        return {"parsed": self.parsed,
+                "inserted": self.inserted,
+                "updated": self.updated,
+                "skipped": self.skipped,
+                "duplicates": self.duplicates,
+                "failed": self.failed,
+                "discrepancies": self.discrepancies,
+                "spooled": self.spooled}
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({', '.join(f'{k}={v}' for k, v in self.to_dict().items())})"
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from typing import Iterator
+from parsers.sinks.sink import Sink
 
 
 class Parser(ABC):
@@ -7,4 +9,34 @@ class Parser(ABC):
 
     @abstractmethod
     def parse(self, dir_path: str):
+        """Parses every document found in dir_path and stores the results.
+        Implementations should only return once all of their work has finished.
+        """
+
         raise NotImplementedError(f"Function `parse` is not implemented for: {self.__class__.__name__}")
+
+    def iter_records(self, source: str) -> Iterator[dict]:
+        """Lazily yields a record for every document found in source, nothing is parsed before it is asked for.
+        """
+
+        raise NotImplementedError(f"Function `iter_records` is not implemented for: {self.__class__.__name__}")
+
+    def ingest(self, source: str, sink: Sink) -> int:
+        """Streams every record of source into a sink and closes it.
+
+        Args:
+            source: The source to read the documents from, e.g. a directory.
+            sink: The Sink the records are written into.
+
+        Returns:
+            The amount of records that were written.
+        """
+
+        written = 0
+
+        with sink:
+            for record in self.iter_records(source):
+                sink.write(record)
+                written += 1
+
+        return written
@@ -1 +1,11 @@
-from .html_parser import HTMLParser
+from importlib import import_module
+
+LAZY_ATTRIBUTES = {"HTMLParser": "parsers.parser_implementations.html_parser",
+                   "HTMLFastParser": "parsers.parser_implementations.html_fast_parser"}
+
+
+def __getattr__(name: str):
+    if name in LAZY_ATTRIBUTES:
+        return getattr(import_module(LAZY_ATTRIBUTES[name]), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,28 @@
+from parsers import register_parser
+from parsers.parser_implementations.html_parser import HTMLParser
+from parsers.parser_implementations.table_tokenizer import TableTokenizer
+
+
+@register_parser("html-fast")
+class HTMLFastParser(HTMLParser):
+    """An HTMLParser for simple table documents that collects everything it needs in a single pass of an event driven
+    tokenizer instead of building a BeautifulSoup tree and searching it once per field.
+    It produces the same page data as HTMLParser.
+    """
+
+    def load_document(self, content: str) -> TableTokenizer:
+        """Tokenizes the content of a html file, collecting only the configured tags.
+
+        Args:
+            content: The content of a .html file.
+
+        Returns:
+            The TableTokenizer, which answers `find` for the collected tags like a parsed document does.
+        """
+
+        tokenizer = TableTokenizer(content_tags=(self.title_tag, self.head_tag, self.body_tag, self.footer_tag),
+                                   attribute_tags=(self.id_tag,))
+        tokenizer.feed(content)
+        tokenizer.close()
+
+        return tokenizer
@@ -1,15 +1,39 @@
 import os
 import re
-from glob import glob
-from typing import Any
-from threading import Thread
+import signal
+from contextlib import contextmanager, nullcontext
+from glob import glob, iglob
+from itertools import islice
+from time import monotonic
+from threading import Event, current_thread, main_thread
+from typing import Any, Iterator
 from datetime import datetime
-from data_layer import manager_factory
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from data_layer import manager_factory, WriteBatcher, WriteSpool, DiscrepancyAnalytics
+from instrumentation import metrics, get_logger
 from bs4.element import Tag
-from bs4 import BeautifulSoup, element
+from bs4 import BeautifulSoup
 from parsers import Parser, register_parser
-from consts import YEAR, MONTH, DAY, HEADER_MAX_LENGTH, MAX_ROW_SUM
-from validator import DocumentValidator, DateValidator, HeaderLengthValidator, TotalSumValidator, ValidationStatus
+from parsers.parse_summary import ParseSummary
+from parsers.bounded_executor import BoundedExecutor
+from parsers.process_pool import init_worker, process_files, process_spans
+from parsers.element_scanner import scan_elements, read_span
+from parsers.table_deduplicator import TableDeduplicator, table_fingerprint
+from parsers.record_format import (RECORD_FORMATS, HTML_FIELDS, COMPACT_FIELDS, compact_page, expand_page, is_compact,
+                                   creation_date_text, document_view_from_compact)
+from parsers.file_watcher import create_watcher
+from parsers.lease_coordinator import LeaseCoordinator
+from parsers.ingest_manifest import IngestManifest, FileIngestManifest, DBIngestManifest
+from consts import (YEAR, MONTH, DAY, HEADER_MAX_LENGTH, MAX_ROW_SUM, MAX_WORKERS, QUEUE_SIZE, CHUNK_SIZE,
+                    WRITE_BATCH_SIZE, WRITE_FLUSH_INTERVAL, WATCH_POLL_INTERVAL, WATCH_SETTLE_TIME, WATCH_BATCH_WINDOW,
+                    WATCH_MAX_BATCH_SIZE, STREAM_BLOCK_SIZE, DEDUP_EXPECTED_TABLES, LEASE_BATCH_SIZE,
+                    SPOOL_CLOSE_TIMEOUT, SPOOL_DRAIN_TIMEOUT)
+from validator import (DocumentValidator, CompositeValidator, DateValidator, HeaderLengthValidator, TotalSumValidator,
+                       ValidationPolicy, ValidatorStrategy, DocumentView, DocumentIndex)
+
+logger = get_logger("parsers.html")
+stage_seconds = metrics.histogram("parser_stage_seconds", "Latency of every stage of parsing a single document.")
+in_flight_chunks = metrics.gauge("process_pool_in_flight_chunks", "Chunks of files sent to worker processes.")
 
 
 @register_parser("html")
@@ -24,8 +48,34 @@ class HTMLParser(Parser):
                  extract_country_and_date_from_footer: bool = False,
                  country_date_regex: str | None = None,
                  date_format: str | None = None,
+                 max_workers: int = MAX_WORKERS,
+                 queue_size: int = QUEUE_SIZE,
+                 execution_mode: str = "threads",
+                 chunk_size: int = CHUNK_SIZE,
+                 batch_writes: bool = True,
+                 batch_size: int = WRITE_BATCH_SIZE,
+                 flush_interval: float = WRITE_FLUSH_INTERVAL,
+                 incremental: bool = False,
+                 manifest: IngestManifest | str | None = None,
+                 db_type: str = "mongo",
+                 defer_indexes: bool = False,
+                 materialize_summary: bool = False,
+                 spool_dir: str | None = None,
+                 stream: bool = False,
+                 stream_block_size: int = STREAM_BLOCK_SIZE,
+                 deduplicate: str | None = None,
+                 expected_tables: int = DEDUP_EXPECTED_TABLES,
+                 record_format: str = "html",
+                 keep_html: bool = False,
+                 distributed_run: str | None = None,
+                 lease_batch_size: int = LEASE_BATCH_SIZE,
+                 profile: bool = False,
                  **kwargs):
         super().__init__(*args, **kwargs)
+
+        if record_format not in RECORD_FORMATS:
+            raise ValueError(f"Unknown record format: {record_format}")
+
         self.id_tag = id_tag
         self.title_tag = title_tag
         self.head_tag = head_tag
@@ -34,9 +84,50 @@ class HTMLParser(Parser):
         self.extract_country_and_date_from_footer = extract_country_and_date_from_footer
         self.country_date_regex = country_date_regex
         self.date_format = date_format
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.execution_mode = execution_mode
+        self.chunk_size = chunk_size
+        self.batch_writes = batch_writes
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.incremental = incremental
+        self.manifest = manifest
+        self.db_type = db_type
+        self.defer_indexes = defer_indexes
+        self.spool_dir = spool_dir
+        self.stream = stream
+        self.stream_block_size = stream_block_size
+        self.deduplicate = deduplicate
+        self.expected_tables = expected_tables
+        self.record_format = record_format
+        self.keep_html = keep_html
+        self.distributed_run = distributed_run
+        self.lease_batch_size = lease_batch_size
+        self.profiler = None
+
+        if profile:
+            from instrumentation import StageProfiler
+
+            self.profiler = StageProfiler()
+
+        self.deduplicator = None
         self.html_document = None
+        self.document_view = None
         self.data_collection = "html data"
         self.discrepancy_collection = "html discrepancies"
+        self.manifest_collection = "ingest manifest"
+        self.summary_collection = "discrepancy summary"
+        self.validator_config_collection = "validator configs"
+        self.alias_collection = "table aliases"
+        self.analytics = DiscrepancyAnalytics(manager_factory.get_manager(db_type),
+                                              discrepancy_collection=self.discrepancy_collection,
+                                              summary_collection=self.summary_collection) \
+            if materialize_summary else None
+        self._uncommitted_entries = {}
+        self._unwritten_discrepancies = {}
+        self._failed_page_ids = []
+        self._process_pool = None
 
         year = kwargs.get("year", YEAR)
         month = kwargs.get("month", MONTH)
@@ -48,76 +139,1024 @@ class HTMLParser(Parser):
         self.date_validator = DateValidator(max_date=datetime(year, month, day), footer_tag=footer_tag)
         self.total_sum_validator = TotalSumValidator(max_sum=kwargs.get("max_row_sum", MAX_ROW_SUM),
                                                      row_container=body_tag)
+        self.validation_engine = CompositeValidator([self.header_validator,
+                                                     self.date_validator,
+                                                     self.total_sum_validator],
+                                                    policy=kwargs.get("validation_policy",
+                                                                      ValidationPolicy.COLLECT_ALL))
+
+    def register_validator(self, validator: ValidatorStrategy) -> ValidatorStrategy:
+        """Adds a validator that runs on every parsed document along with the default ones.
+        """
 
-    def parse(self, dir_path: str):
+        return self.validation_engine.register(validator)
+
+    def parse(self, dir_path: str) -> ParseSummary:
         """Parses all the files given from within a given folder of html files and sends the parsed results to MongoDB.
+        Depending on self.execution_mode:
+            "threads": Files are parsed on the calling thread while the DB work runs on a pool of self.max_workers
+                threads. At most self.queue_size parsed documents wait for a free worker, after that parsing blocks
+                until one is done.
+            "processes": Chunks of self.chunk_size file paths are sent to a pool of self.max_workers processes that
+                parse and validate them, the calling thread is the single writer of their results.
+        If self.stream is set every element of self.id_tag in a file becomes a document of its own, e.g. every table of
+        an export that holds thousands of them. The files are scanned in blocks of self.stream_block_size bytes and every
+        element is parsed as soon as its end tag was read, so memory stays bounded no matter how large a file is, and
+        in "processes" mode the elements of a single file are spread over the workers in chunks of self.chunk_size.
+        If self.batch_writes is set the documents and their discrepancies are written in bulk through a WriteBatcher,
+        or through a durable WriteSpool in self.spool_dir if it is set, so a slow or failing db does not slow parsing.
+        If self.incremental is set files that did not change since they were last ingested are skipped, and changed
+        files replace the page data and discrepancies that were stored for their document id.
+        The indexes of the data and discrepancy collections are ensured before parsing, or if self.defer_indexes is
+        set their secondary indexes are dropped and only built once everything was written, which is faster for large
+        initial loads. Page data whose document id is already stored is rejected by its unique index.
+        If self.analytics is set the materialized discrepancy summary is kept up to date with every written or deleted
+        discrepancy.
+        If self.deduplicate is set a table whose normalized content was already ingested, under any file name, is
+        neither validated nor written again: with "skip" it is only counted, with "alias" its file and document id are
+        also recorded in the alias collection along with the `_id` of the original ("alias_of").
+        If self.record_format is "compact" the page data is stored with its header cells and body rows as arrays,
+        numeric cells typed as numbers and the creation date as a date, instead of as html, see `compact_page`. The
+        original html is only kept, compressed, if self.keep_html is set. `read_page` rebuilds the html format.
+        If self.distributed_run is set several nodes (machines or processes) that share the db and the directory can
+        run the same parse: the files are split into batches of self.lease_batch_size that a node only ingests once it
+        claimed their lease, see LeaseCoordinator. Every node returns once every batch of the run was ingested by any
+        of them, its summary only counts the batches it ingested itself.
+        If self.profiler is set every stage is profiled and the slowest and most memory hungry files are kept, see
+        StageProfiler, its report is written with `self.profiler.write(path)` once the run is done.
 
         Args:
             dir_path: A path to a directory containing .html files.
 
+        Returns:
+            A ParseSummary of how many files were parsed, inserted, updated, skipped, failed and how many
+            discrepancies were found. It is returned only after all the DB work has finished.
         """
 
+        summary = ParseSummary()
+        db_manager = manager_factory.get_manager(self.db_type)
+
+        if self.profiler:
+            self.profiler.start()
+
+        collections = self.prepare_collections(db_manager)
+        batcher = self.create_batcher(summary) if self.batch_writes else None
         files = glob(os.path.join(dir_path, "*.html"))
 
+        if self.distributed_run:
+            self.parse_leased_files(files, summary, batcher, db_manager)
+        else:
+            self.parse_files(files, summary, batcher)
+
+        if batcher:
+            self.close_batcher(batcher, summary)
+            self.delete_orphaned_discrepancies(db_manager)
+
+        if self.defer_indexes:
+            for collection_name, index_name in db_manager.ensure_indexes(collections):
+                logger.error("Failed to build %s on %s", index_name, collection_name)
+
+        if self.incremental:
+            self.manifest.save()
+
+        if self.profiler:
+            self.profiler.stop()
+
+        return summary
+
+    def watch(self, dir_path: str,
+              stop_event: Event | None = None,
+              use_inotify: bool = True,
+              poll_interval: float = WATCH_POLL_INTERVAL,
+              settle_time: float = WATCH_SETTLE_TIME,
+              batch_window: float = WATCH_BATCH_WINDOW,
+              max_batch_size: int = WATCH_MAX_BATCH_SIZE) -> ParseSummary:
+        """Ingests the files that are already in a directory and then every file that is dropped into it or modified,
+        until stop_event is set or, when called from the main thread, SIGINT or SIGTERM is received.
+        Files are picked up through inotify, or by polling where it is not available, only once they were completely
+        written. They are ingested in micro batches: once a file arrives the watcher waits up to batch_window seconds
+        for more, then the batch is parsed, validated and written and the writes are flushed right away.
+        On shutdown the batch in progress and the files that were already completely written are drained before
+        returning. Set self.incremental so modified files replace their stored documents instead of being rejected
+        as duplicates.
+
+        Args:
+            dir_path: A path to a directory that .html files are dropped into.
+            stop_event: An Event that stops the watch once it is set.
+            use_inotify: Whether to use inotify, polling is used if not or if it is not available.
+            poll_interval: How many seconds to wait for new files before checking for shutdown.
+            settle_time: How many seconds a polled file must stay unchanged before it is considered completely written.
+            batch_window: How many seconds to wait for more files once a file arrived.
+            max_batch_size: The maximum number of files in a micro batch.
+
+        Returns:
+            A ParseSummary of everything that was ingested while watching.
+        """
+
+        stop_event = stop_event or Event()
+        summary = ParseSummary()
+        db_manager = manager_factory.get_manager(self.db_type)
+        self.prepare_collections(db_manager, build_deferred=False)
+        batcher = self.create_batcher(summary) if self.batch_writes else None
+        watcher = create_watcher(dir_path, use_inotify=use_inotify, settle_time=settle_time)
+        restore_handlers = self._stop_on_signals(stop_event)
+        pending = watcher.scan()
+        logger.info("Watching %s with %s", dir_path, watcher.__class__.__name__)
+
+        try:
+            with self.process_pool():
+                while not stop_event.is_set():
+                    if not pending:
+                        pending = watcher.poll(poll_interval)
+
+                        if not pending:
+                            continue
+
+                        deadline = monotonic() + batch_window
+
+                        while len(pending) < max_batch_size and monotonic() < deadline:
+                            pending += watcher.poll(deadline - monotonic())
+
+                    batch, pending = list(dict.fromkeys(pending[:max_batch_size])), pending[max_batch_size:]
+                    self.ingest_batch(batch, summary, batcher, db_manager)
+
+                pending += watcher.poll(0)
+
+                while pending:
+                    batch, pending = list(dict.fromkeys(pending[:max_batch_size])), pending[max_batch_size:]
+                    self.ingest_batch(batch, summary, batcher, db_manager)
+        finally:
+            restore_handlers()
+            watcher.close()
+
+            if batcher:
+                self.close_batcher(batcher, summary)
+                self.delete_orphaned_discrepancies(db_manager)
+
+        logger.info("Stopped watching %s", dir_path)
+
+        return summary
+
+    def parse_leased_files(self, files: list, summary: ParseSummary, batcher: WriteBatcher | None, db_manager):
+        """Ingests the batches of files this node claims a lease on, until every batch of self.distributed_run is done.
+        A batch is only marked done once its writes reached the db. If a WriteSpool does not drain within
+        SPOOL_DRAIN_TIMEOUT seconds the node stops claiming batches and gives up its leases, so other nodes take them
+        over, while its spooled writes are drained when the run ends or by the next run.
+        """
+
+        coordinator = LeaseCoordinator(self.db_type, self.distributed_run)
+        coordinator.register()
+
+        try:
+            for lease_id, batch in coordinator.leases(files, batch_size=self.lease_batch_size):
+                if not self.ingest_batch(batch, summary, batcher, db_manager):
+                    logger.warning("The writes of %s were not drained in time, leaving run %s", lease_id,
+                                   self.distributed_run)
+                    break
+
+                coordinator.complete(lease_id)
+        finally:
+            coordinator.close()
+
+    def ingest_batch(self, files: list, summary: ParseSummary, batcher: WriteBatcher | WriteSpool | None,
+                     db_manager) -> bool:
+        """Parses, validates and writes a micro batch of files and waits up to SPOOL_DRAIN_TIMEOUT seconds for the
+        writes to reach the db. The discrepancies of page data the db rejected are only deleted once they did,
+        otherwise a later batch or the end of the run deletes them.
+
+        Returns:
+            Whether the writes of the batch reached the db.
+        """
+
+        self.parse_files(files, summary, batcher)
+        drained = True
+
+        if batcher:
+            drained = batcher.drain(timeout=SPOOL_DRAIN_TIMEOUT)
+
+            if drained:
+                self.delete_orphaned_discrepancies(db_manager)
+
+        if self.incremental:
+            self.manifest.save()
+
+        logger.debug("Ingested a batch of %d files", len(files))
+
+        return drained
+
+    @staticmethod
+    def _stop_on_signals(stop_event: Event):
+        """Sets stop_event on SIGINT and SIGTERM if called from the main thread.
+
+        Returns:
+            A function that restores the previous signal handlers.
+        """
+
+        if current_thread() is not main_thread():
+            return lambda: None
+
+        previous_handlers = {signum: signal.signal(signum, lambda *_: stop_event.set())
+                             for signum in (signal.SIGINT, signal.SIGTERM)}
+
+        def restore():
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+        return restore
+
+    def prepare_collections(self, db_manager, build_deferred: bool = True) -> list:
+        """Ensures the indexes of the collections that are written to, or drops their secondary ones if
+        self.defer_indexes is set and build_deferred allows it, stores the configuration of the validators and loads
+        the fingerprints of the stored tables if self.deduplicate is set.
+
+        Returns:
+            The names of the collections.
+        """
+
+        collections = [self.data_collection, self.discrepancy_collection, self.validator_config_collection] + \
+            ([self.summary_collection] if self.analytics else []) + \
+            ([self.alias_collection] if self.deduplicate == "alias" else [])
+
+        if self.defer_indexes and build_deferred:
+            db_manager.drop_secondary_indexes(collections)
+        else:
+            db_manager.ensure_indexes(collections)
+
+        self.record_validator_configs(db_manager)
+
+        if self.deduplicate and self.deduplicator is None:
+            self.deduplicator = TableDeduplicator(db_manager, self.data_collection,
+                                                  expected_tables=self.expected_tables)
+
+        return collections
+
+    def parse_files(self, files: list, summary: ParseSummary, batcher: WriteBatcher | None):
+        """Parses, validates and writes files according to self.execution_mode, skipping the ones that did not change
+        if self.incremental is set.
+        """
+
+        manifest_entries = {}
+
+        if self.incremental:
+            files, manifest_entries = self.filter_unchanged(files, summary)
+
+        if self.execution_mode == "threads":
+            self._parse_in_threads(files, summary, batcher, manifest_entries)
+        elif self.execution_mode == "processes":
+            self._parse_in_processes(files, summary, batcher, manifest_entries)
+        else:
+            raise ValueError(f"Unknown execution mode: {self.execution_mode}")
+
+    @contextmanager
+    def process_pool(self):
+        """Keeps a single pool of worker processes for every batch of files that is parsed within the block in
+        processes mode, e.g. the micro batches of `watch`, so the workers are started and sent the parser only once.
+        """
+
+        if self.execution_mode != "processes" or self._process_pool is not None:
+            yield
+            return
+
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=init_worker, initargs=(self,)) as executor:
+            self._process_pool = executor
+
+            try:
+                yield
+            finally:
+                self._process_pool = None
+
+    def delete_orphaned_discrepancies(self, db_manager) -> int:
+        """Deletes the discrepancies that were batched along with page data that failed to be inserted, e.g. because
+        its document id is already stored.
+
+        Returns:
+            How many discrepancies were deleted.
+        """
+
+        if not self._failed_page_ids:
+            return 0
+
+        failed_page_ids, self._failed_page_ids = self._failed_page_ids, []
+
+        return self.delete_discrepancies({"document_id": {"$in": failed_page_ids}}, db_manager)
+
+    def delete_discrepancies(self, query: dict, db_manager) -> int:
+        """Deletes the matching discrepancies and removes them from the materialized summary if it is kept.
+
+        Returns:
+            How many discrepancies were deleted.
+        """
+
+        if self.analytics:
+            deleted_discrepancies = list(db_manager.find(collection_name=self.discrepancy_collection, query=query,
+                                                         projection={"discrepancy_type": 1, "country": 1,
+                                                                     "creation date": 1}) or [])
+            self.analytics.record(deleted_discrepancies, amount=-1)
+
+        return db_manager.delete(collection_name=self.discrepancy_collection, query=query)
+
+    def filter_unchanged(self, files: list, summary: ParseSummary) -> tuple:
+        """Drops the files that did not change since they were last ingested according to the manifest.
+        A manifest given as a path is kept in that local file, otherwise it is kept in the manifest collection.
+
+        Args:
+            files: The paths of the files that are to be ingested.
+            summary: A ParseSummary to count the skipped files into.
+
+        Returns:
+            A tuple of the (changed files, manifest entries of the changed files by their path).
+        """
+
+        if isinstance(self.manifest, str):
+            self.manifest = FileIngestManifest(self.manifest)
+        elif self.manifest is None:
+            self.manifest = DBIngestManifest(manager_factory.get_manager(self.db_type),
+                                             collection_name=self.manifest_collection)
+
+        changed_files = []
+        manifest_entries = {}
+
+        for file_name in files:
+            entry = self.manifest.changed_entry(file_name)
+
+            if entry is None:
+                summary.increment("skipped")
+            else:
+                changed_files.append(file_name)
+                manifest_entries[file_name] = entry
+
+        return changed_files, manifest_entries
+
+    def _parse_in_threads(self, files: list, summary: ParseSummary, batcher: WriteBatcher | None,
+                          manifest_entries: dict):
+        with BoundedExecutor(ThreadPoolExecutor(max_workers=self.max_workers),
+                             max_workers=self.max_workers,
+                             queue_size=self.queue_size) as executor:
+            for file_name, span in self.iter_sources(files, summary, manifest_entries):
+                profile_entry = self.profile_entry(file_name, span)
+
+                try:
+                    with self.profile_measure(profile_entry):
+                        page_data = self.parse_file(file_name, span)
+                except Exception as e:
+                    logger.warning("Failed to parse %s%s: %s", file_name, f" at {span[0]}" if span else "", e)
+                    summary.increment("failed")
+                    self.release_entry(manifest_entries.get(file_name), success=False)
+                    self.profile_done(profile_entry)
+                    continue
+
+                summary.increment("parsed")
+
+                if self.skip_duplicate(file_name, page_data, summary, manifest_entries.get(file_name)):
+                    self.profile_done(profile_entry)
+                    continue
+
+                executor.submit(self.insert_to_mongodb, page_data, self.document_view, summary, batcher,
+                                manifest_entries.get(file_name), profile_entry)
+
+        self.document_view = None
+
+    def _parse_in_processes(self, files: list, summary: ParseSummary, batcher: WriteBatcher | None,
+                            manifest_entries: dict):
+        def write_results(futures: set):
+            for future in futures:
+                for result in future.result():
+                    if "profile" in result:
+                        self.profiler.merge(result["profile"])
+                    elif "error" in result:
+                        logger.warning("Failed to parse %s: %s", result["file"], result["error"])
+                        summary.increment("failed")
+                        self.release_entry(manifest_entries.get(result["file"]), success=False)
+                    else:
+                        summary.increment("parsed")
+                        profile_entry = result.get("profile entry")
+
+                        try:
+                            with self.profile_measure(profile_entry):
+                                if self.skip_duplicate(result["file"], result["page_data"], summary,
+                                                       manifest_entries.get(result["file"])):
+                                    continue
+
+                                with self.profile_stage("write"):
+                                    self.write_page(result["page_data"], result["discrepancies"], summary, batcher,
+                                                    manifest_entries.get(result["file"]))
+                        finally:
+                            self.profile_done(profile_entry)
+
+        pending = set()
+        max_pending = self.max_workers + self.queue_size
+        sources = self.iter_sources(files, summary, manifest_entries)
+
+        with nullcontext(self._process_pool) if self._process_pool else \
+                ProcessPoolExecutor(max_workers=self.max_workers, initializer=init_worker, initargs=(self,)) as executor:
+            while chunk := list(islice(sources, self.chunk_size)):
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    in_flight_chunks.set(len(pending))
+                    write_results(done)
+
+                if self.stream:
+                    pending.add(executor.submit(process_spans, [(file_name, *span) for file_name, span in chunk]))
+                else:
+                    pending.add(executor.submit(process_files, [file_name for file_name, _ in chunk]))
+
+                in_flight_chunks.set(len(pending))
+
+            write_results(wait(pending).done)
+            in_flight_chunks.set(0)
+
+    def skip_duplicate(self, file_name: str,
+                       page_data: dict,
+                       summary: ParseSummary,
+                       manifest_entry: dict | None) -> bool:
+        """Checks whether a parsed table was already ingested if self.deduplicate is set, and records it as an alias
+        of the original if self.deduplicate is "alias" and the original comes from another file, so ingesting the
+        same files again does not alias every table to itself. Aliases are keyed on their file and document id, so
+        recording one again has no further effect. A table that is new is given its `_id` up front, so tables that
+        duplicate it can reference it before it is written. Tables that replace a previously ingested version of
+        their file are never skipped.
+
+        Returns:
+            Whether the table is a duplicate that is not to be written.
+        """
+
+        if not self.deduplicator:
+            return False
+
+        page_data["source file"] = os.path.abspath(file_name)
+
+        if manifest_entry and manifest_entry["replaces"]:
+            return False
+
+        db_manager = manager_factory.get_manager(self.db_type)
+        page_data.setdefault("_id", db_manager.generate_id())
+        original = self.deduplicator.check(page_data["fingerprint"], page_data["_id"], page_data["source file"])
+
+        if original is None:
+            return False
+
+        summary.increment("duplicates")
+        logger.debug("Skipping %s of %s, a duplicate of %s", page_data.get("document id"), file_name, original["_id"])
+
+        if self.deduplicate == "alias" and original["source file"] != page_data["source file"]:
+            if not db_manager.update(collection_name=self.alias_collection,
+                                     query={"file": file_name, "document id": page_data.get("document id")},
+                                     update_type="$set", new_data={"alias_of": str(original["_id"])}, upsert=True):
+                logger.error("Failed to record %s as an alias of %s", file_name, original["_id"])
+
+        self.release_entry(manifest_entry)
+
+        return True
+
+    def release_entry(self, manifest_entry: dict | None, success: bool = True):
+        """Registers that a document of a file that is ingested incrementally was written, or that it failed.
+        The file's manifest entry is committed once every document of the file was written, see `IngestManifest.hold`.
+        """
+
+        if manifest_entry:
+            self.manifest.release(manifest_entry, success)
+
+    def iter_sources(self, files, summary: ParseSummary | None = None,
+                     manifest_entries: dict | None = None) -> Iterator[tuple]:
+        """Lazily lists the documents of files, a whole file is a single document unless self.stream is set, then
+        every element of self.id_tag in it is one.
+
+        Args:
+            files: The paths of the files.
+            summary: A ParseSummary to count the files that could not be scanned into.
+            manifest_entries: The manifest entries of the files by their path if they are ingested incrementally,
+                every listed document is held in the manifest and every file is sealed once all of its documents
+                were listed.
+
+        Yields:
+            A tuple of the (file name, span) of every document, the span is the (start, end) byte offsets of the
+            element or None for a whole file.
+        """
+
         for file_name in files:
-            page_data = {}
+            manifest_entry = (manifest_entries or {}).get(file_name)
+
+            if not self.stream:
+                if manifest_entry:
+                    self.manifest.hold(manifest_entry)
+                    self.manifest.seal(manifest_entry)
+
+                yield file_name, None
+                continue
+
+            try:
+                for span in scan_elements(file_name, self.id_tag, block_size=self.stream_block_size):
+                    if manifest_entry:
+                        self.manifest.hold(manifest_entry)
+
+                    yield file_name, span
+            except OSError as e:
+                logger.warning("Failed to scan %s: %s", file_name, e)
+
+                if summary:
+                    summary.increment("failed")
+
+                if manifest_entry:
+                    self.manifest.seal(manifest_entry, success=False)
+            else:
+                if manifest_entry:
+                    self.manifest.seal(manifest_entry)
 
-            with open(file_name, 'r') as f:
-                self.html_document = BeautifulSoup(f, "html.parser")
+    def iter_records(self, source: str) -> Iterator[dict]:
+        """Lazily parses and validates the documents of source one at a time without touching the db, so only a single
+        document is held in memory and stopping early wastes no work.
 
-            page_data["document id"] = self.extract_field(self.id_tag, get_expression='id')
-            page_data["title"] = self.extract_field(self.title_tag, extract_text=True)
-            page_data["header"] = str(self.extract_field(self.head_tag))
-            page_data["body"] = str(self.extract_field(self.body_tag))
+        Args:
+            source: A path to a .html file or to a directory containing .html files.
+
+        Yields:
+            The result of `process_file` for every document, or a dict with the "file" (and "offset" if self.stream
+            is set) and the "error" if it could not be processed.
+        """
+
+        files = [source] if os.path.isfile(source) else iglob(os.path.join(source, "*.html"))
+
+        for file_name, span in self.iter_sources(files):
+            try:
+                record = self.process_file(file_name, span)
+            except Exception as e:
+                record = {"file": file_name, "error": f"{e.__class__.__name__}: {e}"}
+
+                if span:
+                    record["offset"] = span[0]
+
+            yield record
+
+    def process_file(self, file_name: str, span: tuple | None = None, keep_profile: bool = False) -> dict:
+        """Parses and validates a single file, or a single element of it, without touching the db.
+        The result only holds plain data so it can be sent back from a worker process.
+
+        Args:
+            file_name: A path to a .html file.
+            span: The (start, end) byte offsets of the element in the file, the whole file if not given.
+            keep_profile: Whether the profiler entry of the file is returned instead of counted, so the process that
+                writes the page data adds the write stage to it before counting it with `profile_done`.
+
+        Returns:
+            A dict with the "file", its "page_data" and its "discrepancies", the "offset" of the element if a span
+            was given and the "profile entry" if keep_profile is set and the parser profiles.
+        """
+
+        profile_entry = self.profile_entry(file_name, span)
 
-            footer = self.extract_field(self.footer_tag)
-            page_data["footer"] = str(footer)
+        try:
+            with self.profile_measure(profile_entry):
+                page_data = self.parse_file(file_name, span)
+                discrepancies = self.find_discrepancies(document=self.document_view)
+        except Exception:
+            self.profile_done(profile_entry)
+            raise
+
+        self.document_view = None
+        record = {"file": file_name, "page_data": page_data, "discrepancies": discrepancies}
+
+        if keep_profile and profile_entry is not None:
+            record["profile entry"] = profile_entry
+        else:
+            self.profile_done(profile_entry)
 
-            creation_date, country = self.extract_date_and_country(footer)
-            page_data["creation date"] = creation_date
-            page_data["country"] = country
+        if span:
+            record["offset"] = span[0]
 
-            Thread(target=self.insert_to_mongodb, args=(page_data, self.html_document)).start()
+        return record
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["html_document"] = None
+        state["document_view"] = None
+        state["manifest"] = None
+        state["analytics"] = None
+        state["deduplicator"] = None
+        state["_process_pool"] = None
+
+        return state
+
+    def parse_file(self, file_name: str, span: tuple | None = None) -> dict:
+        """Parses a single html file, or a single element of it, into the page data that is stored in the db.
+        The compact DocumentView the validators work on is kept in self.document_view, the parsed document itself is
+        released as soon as everything was extracted from it.
+
+        Args:
+            file_name: A path to a .html file.
+            span: The (start, end) byte offsets of the element in the file, the whole file is parsed if not given.
+
+        Returns:
+            The page data of the document.
+        """
+
+        with stage_seconds.time(stage="read"), self.profile_stage("read"):
+            content = self.read_file(file_name) if span is None else read_span(file_name, *span)
+
+        with stage_seconds.time(stage="parse"), self.profile_stage("parse"):
+            self.html_document = self.load_document(content)
+
+        with stage_seconds.time(stage="extract"), self.profile_stage("extract"):
+            return self.extract_page()
+
+    def profile_stage(self, stage: str):
+        return self.profiler.stage(stage) if self.profiler else nullcontext()
+
+    def profile_entry(self, file_name: str, span: tuple | None = None) -> dict | None:
+        return self.profiler.file_entry(file_name, offset=span[0] if span else None) if self.profiler else None
+
+    def profile_measure(self, profile_entry: dict | None):
+        return self.profiler.measure(profile_entry) if profile_entry is not None else nullcontext()
+
+    def profile_done(self, profile_entry: dict | None):
+        if profile_entry is not None:
+            self.profiler.add_file(profile_entry)
+
+    def read_file(self, file_name: str) -> str:
+        with open(file_name, 'r') as f:
+            return f.read()
+
+    def extract_page(self) -> dict:
+        """Extracts the page data and the DocumentView of self.html_document and releases it.
+
+        Returns:
+            The page data of the document.
+        """
+
+        page_data = {}
+        page_data["document id"] = self.extract_field(self.id_tag, get_expression='id')
+        page_data["title"] = self.extract_field(self.title_tag, extract_text=True)
+        page_data["header"] = str(self.extract_field(self.head_tag))
+        page_data["body"] = str(self.extract_field(self.body_tag))
+
+        footer = self.extract_field(self.footer_tag)
+        page_data["footer"] = str(footer)
+
+        creation_date, country = self.extract_date_and_country(footer)
+        page_data["creation date"] = creation_date.strftime("%d-%m-%Y") if creation_date else None
+        page_data["country"] = country
+
+        self.document_view = DocumentView.from_document(self.html_document,
+                                                        title_tag=self.title_tag,
+                                                        head_tag=self.head_tag,
+                                                        body_tag=self.body_tag,
+                                                        footer_tag=self.footer_tag,
+                                                        creation_date=creation_date,
+                                                        country=country)
+        self.html_document = None
+
+        if self.deduplicate:
+            page_data["fingerprint"] = table_fingerprint(page_data, self.document_view)
+
+        if self.record_format == "compact":
+            page_data = compact_page(page_data, self.document_view, keep_html=self.keep_html)
+
+        return page_data
+
+    def load_document(self, content: str) -> DocumentIndex:
+        """Parses the content of a html file and indexes its tags in a single walk, so every field is found without
+        searching the whole tree again.
+
+        Args:
+            content: The content of a .html file.
+
+        Returns:
+            A DocumentIndex of the parsed document.
+        """
+
+        return DocumentIndex(BeautifulSoup(content, "html.parser"))
+
+    def create_batcher(self, summary: ParseSummary | None = None) -> WriteBatcher | WriteSpool:
+        """Creates a WriteBatcher, or a WriteSpool if self.spool_dir is set, that counts the written documents into
+        the given summary.
+        """
+
+        summary = summary or ParseSummary()
+
+        def on_flush(collection_name: str, records: list, success: bool):
+            if collection_name == self.data_collection:
+                summary.increment("inserted" if success else "failed", len(records))
+
+                if self.deduplicator:
+                    self.deduplicator.settle([record.get("fingerprint") for record in records])
+
+                written_discrepancies = 0
+
+                for record in records:
+                    manifest_entry = self._uncommitted_entries.pop(str(record["_id"]), None)
+                    written_discrepancies += self._unwritten_discrepancies.pop(str(record["_id"]), 0)
+
+                    if not success:
+                        self._failed_page_ids.append(str(record["_id"]))
+
+                    self.release_entry(manifest_entry, success)
+
+                if success:
+                    summary.increment("discrepancies", written_discrepancies)
+            elif collection_name == self.discrepancy_collection and self.analytics and success:
+                self.analytics.record(records)
+
+            if success:
+                logger.debug("Successfully inserted: %d documents into db under %s", len(records), collection_name)
+            else:
+                logger.error("Failed to insert %d documents into db under %s", len(records), collection_name)
+
+        if self.spool_dir:
+            return WriteSpool(self.spool_dir,
+                              manager_factory.get_manager(self.db_type),
+                              batch_size=self.batch_size,
+                              flush_interval=self.flush_interval,
+                              on_flush=on_flush)
+
+        return WriteBatcher(manager_factory.get_manager(self.db_type),
+                            batch_size=self.batch_size,
+                            flush_interval=self.flush_interval,
+                            on_flush=on_flush)
+
+    def close_batcher(self, batcher: WriteBatcher | WriteSpool, summary: ParseSummary):
+        """Closes a batcher once everything was parsed. A WriteSpool is given SPOOL_CLOSE_TIMEOUT seconds to drain, so
+        an unavailable db does not block the run. The page data that is left spooled is counted as "spooled" in the
+        summary, it is drained by the next spool that is opened on self.spool_dir.
+        """
+
+        if not isinstance(batcher, WriteSpool):
+            batcher.close()
+
+            return
+
+        batcher.close(timeout=SPOOL_CLOSE_TIMEOUT)
+        summary.increment("spooled", batcher.pending.get(self.data_collection, 0))
+
+    def insert_to_mongodb(self, data: dict,
+                          document: DocumentView,
+                          summary: ParseSummary | None = None,
+                          batcher: WriteBatcher | None = None,
+                          manifest_entry: dict | None = None,
+                          profile_entry: dict | None = None) -> ParseSummary:
+        """Validates a document and inserts its page data into the db followed by the discrepancies found in it.
+
+        Args:
+            data: The page data of the document.
+            document: The DocumentView of the document that is to be validated.
+            summary: A ParseSummary to count the results into.
+            batcher: If given the page data and discrepancies are buffered in it instead of being inserted directly.
+            manifest_entry: The manifest entry of the document's file, released once the document is written, see
+                `write_page`.
+            profile_entry: The profiler entry of the document's file, see `profile_entry`. The validation and the
+                write are measured into it, and it is counted with the other files once they are done.
+
+        Returns:
+            The summary.
+        """
+
+        try:
+            with self.profile_measure(profile_entry):
+                discrepancies = self.find_discrepancies(document=document)
+
+                with self.profile_stage("write"):
+                    return self.write_page(data, discrepancies, summary, batcher, manifest_entry)
+        finally:
+            self.profile_done(profile_entry)
+
+    @stage_seconds.time(stage="write")
+    def write_page(self, data: dict,
+                   discrepancies: list,
+                   summary: ParseSummary | None = None,
+                   batcher: WriteBatcher | None = None,
+                   manifest_entry: dict | None = None) -> ParseSummary:
+        """Inserts a document's page data into the db followed by its discrepancies, which are linked to the page data
+        through their "document_id".
+
+        Args:
+            data: The page data of the document.
+            discrepancies: The discrepancy records returned by `find_discrepancies`, they are stored along with the
+                country and creation date of the document so they can be rolled up without a join.
+            summary: A ParseSummary to count the results into, the discrepancies are only counted once their page data
+                was written.
+            batcher: If given the page data and discrepancies are buffered in it instead of being inserted directly.
+                The page data is given its `_id` up front so the discrepancies can still reference it.
+            manifest_entry: The manifest entry of the document's file, released once the document is written so it is
+                committed once every document of the file was. If it replaces a previously ingested file the stored
+                document is replaced instead of inserted.
+
+        Returns:
+            The summary.
+        """
+
+        summary = summary or ParseSummary()
+        mongo_manager = manager_factory.get_manager(self.db_type)
+
+        for discrepancy in discrepancies:
+            discrepancy["country"] = data.get("country")
+            discrepancy["creation date"] = creation_date_text(data.get("creation date"))
+
+        if manifest_entry and manifest_entry["replaces"]:
+            db_id = self.replace_page(data, mongo_manager)
+
+            if db_id is not None:
+                summary.increment("updated")
+                summary.increment("discrepancies", len(discrepancies))
+                self.write_discrepancies(discrepancies, db_id, mongo_manager, batcher)
+                self.release_entry(manifest_entry)
+
+                return summary
+
+        if batcher:
+            db_id = str(data.setdefault("_id", mongo_manager.generate_id()))
+            self._unwritten_discrepancies[db_id] = len(discrepancies)
+
+            if manifest_entry:
+                self._uncommitted_entries[db_id] = manifest_entry
+
+            batcher.add(self.data_collection, data)
+            self.write_discrepancies(discrepancies, db_id, mongo_manager, batcher)
+
+            return summary
 
-    def insert_to_mongodb(self, data: list | object, document: BeautifulSoup):
-        mongo_manager = manager_factory.get_manager("mongo")
         insert_results = mongo_manager.insert(collection_name=self.data_collection, data=data)
 
+        if self.deduplicator:
+            self.deduplicator.settle([data.get("fingerprint")])
+
         if insert_results:
-            inserted_ids = insert_results.inserted_ids if isinstance(data, list) else str(insert_results.inserted_id)
-            len_inserted_ids = len(inserted_ids) if isinstance(data, list) else 1
-            print(f"Successfully inserted: {len_inserted_ids} documents into db under {self.data_collection}")
-            self.find_discrepancies(document=document, db_id=inserted_ids, mongo_manager=mongo_manager)
+            db_id = str(insert_results.inserted_id)
+            logger.debug("Successfully inserted: 1 documents into db under %s", self.data_collection)
+            summary.increment("inserted")
+            summary.increment("discrepancies", len(discrepancies))
+            self.write_discrepancies(discrepancies, db_id, mongo_manager, batcher)
+            self.release_entry(manifest_entry)
         else:
-            print(f"Failed to insert {data} into db")
-
-    def find_discrepancies(self, document: BeautifulSoup, db_id: str, mongo_manager):
-        def find_and_insert_discrepancy_to_db():
-            update_result_dict = lambda results: results[1].update({"discrepancy_type": results[0].value,
-                                                                    "document_id": db_id})
-            validation_results = document_validator.validate(document)
-
-            if not validation_results[0] == ValidationStatus.VALID:
-                print(f"Found discrepancies for {db_id}")
-                update_result_dict(validation_results)
-                insert_results = mongo_manager.insert(collection_name=self.discrepancy_collection,
-                                                      data=validation_results[1])
-                if insert_results:
-                    inserted_id = str(insert_results.inserted_id)
-                    print(f"Successfully inserted: {inserted_id} documents into db under {self.discrepancy_collection}")
-                else:
-                    print(f"Failed to insert {validation_results[1]} into db")
+            logger.error("Failed to insert %s into db", data.get("document id"))
+            summary.increment("failed")
+            self.release_entry(manifest_entry, success=False)
+
+        return summary
+
+    def replace_page(self, data: dict, mongo_manager) -> str | None:
+        """Replaces the stored page data of the document with the same document id and deletes its discrepancies.
+        The fields of the other record format are removed, in case the stored page data was written in it.
+
+        Args:
+            data: The new page data of the document.
+            mongo_manager: The DBManager to use.
+
+        Returns:
+            The db id of the replaced page data, or None if no page data is stored for the document id.
+        """
+
+        stored = next(iter(mongo_manager.find(collection_name=self.data_collection,
+                                              query={"document id": data["document id"]},
+                                              projection={"_id": 1}, limit=1) or []), None)
+
+        if stored is None:
+            return None
+
+        mongo_manager.update(collection_name=self.data_collection,
+                             query={"_id": stored["_id"]},
+                             update_type="$set",
+                             new_data=data)
+        stale_fields = {field: "" for field in HTML_FIELDS + COMPACT_FIELDS if field not in data}
+        mongo_manager.update(collection_name=self.data_collection,
+                             query={"_id": stored["_id"]},
+                             update_type="$unset",
+                             new_data=stale_fields)
+        db_id = str(stored["_id"])
+        deleted = self.delete_discrepancies({"document_id": db_id}, mongo_manager)
+        logger.debug("Replaced %s under %s and deleted its %d discrepancies", db_id, self.data_collection, deleted)
+
+        return db_id
+
+    def write_discrepancies(self, discrepancies: list, db_id: str, mongo_manager,
+                            batcher: WriteBatcher | None = None):
+        """Links the discrepancies of a document to its page data through their "document_id" and writes them.
+        """
+
+        for discrepancy in discrepancies:
+            discrepancy["document_id"] = db_id
+
+        if batcher:
+            for discrepancy in discrepancies:
+                batcher.add(self.discrepancy_collection, discrepancy)
+        elif discrepancies:
+            logger.debug("Found discrepancies for %s", db_id)
+
+            if mongo_manager.insert(collection_name=self.discrepancy_collection, data=discrepancies):
+                logger.debug("Successfully inserted: %d documents into db under %s", len(discrepancies),
+                             self.discrepancy_collection)
+
+                if self.analytics:
+                    self.analytics.record(discrepancies)
             else:
-                print(f"No discrepancies found for {db_id}")
+                logger.error("Failed to insert %d discrepancies of %s into db", len(discrepancies), db_id)
+        else:
+            logger.debug("No discrepancies found for %s", db_id)
+
+    def find_discrepancies(self, document: DocumentView) -> list:
+        """Runs every registered validator over the document in a single pass.
+
+        Args:
+            document: The DocumentView of the document that is to be validated.
+
+        Returns:
+            A list with a discrepancy record for every validator that did not find the document valid.
+        """
+
+        with stage_seconds.time(stage="validate"), self.profile_stage("validate"):
+            return DocumentValidator(self.validation_engine).validate(document)[1]["findings"]
+
+    def document_view_from_record(self, record: dict) -> DocumentView:
+        """Rebuilds the DocumentView of a document from its stored page data, without reading its file again.
+
+        Args:
+            record: The page data of the document as it is stored in the data collection, in either record format.
+
+        Returns:
+            The DocumentView of the document.
+        """
+
+        if is_compact(record):
+            return document_view_from_compact(record)
+
+        fragments = (record.get(field) for field in ("header", "body", "footer"))
+        document = self.load_document("".join(fragment for fragment in fragments
+                                              if fragment and fragment != "None"))
+        creation_date = datetime.strptime(record["creation date"], "%d-%m-%Y") if record.get("creation date") \
+            else None
+        view = DocumentView.from_document(document,
+                                          title_tag=self.title_tag,
+                                          head_tag=self.head_tag,
+                                          body_tag=self.body_tag,
+                                          footer_tag=self.footer_tag,
+                                          creation_date=creation_date,
+                                          country=record.get("country"))
+        view.title = record.get("title")
+
+        return view
 
-        document_validator = DocumentValidator(self.header_validator)
-        find_and_insert_discrepancy_to_db()
+    def read_page(self, record: dict) -> dict:
+        """Reads stored page data in the html record format, whichever format it was stored in, e.g. for consumers
+        that expect the header, body and footer as html and the creation date as "dd-mm-YYYY" text.
+        """
+
+        return expand_page(record, head_tag=self.head_tag, body_tag=self.body_tag, footer_tag=self.footer_tag)
+
+    def revalidate_records(self, records: list, validator_names: list) -> list:
+        """Runs some of the registered validators over the stored page data of a batch of documents, the validators
+        that support it (e.g. the numeric validators) evaluate the whole batch in a single call.
+
+        Args:
+            records: The page data of the documents as it is stored in the data collection.
+            validator_names: The names of the validators that are to be run.
+
+        Returns:
+            A dict of the "document_id" and its "discrepancies", linked to it like the ones `write_page` stores, for
+            every record, or of the "document_id" and the "error" if it could not be validated.
+        """
+
+        engine = CompositeValidator([validator for validator in self.validation_engine.validators
+                                     if validator.name in validator_names],
+                                    policy=self.validation_engine.policy)
+        results = []
+        views = []
+
+        for record in records:
+            try:
+                views.append((record, self.document_view_from_record(record)))
+            except Exception as e:
+                results.append({"document_id": str(record["_id"]), "error": f"{e.__class__.__name__}: {e}"})
+
+        try:
+            validated = engine.validate_batch([view for _, view in views])
+        except Exception as e:
+            return results + [{"document_id": str(record["_id"]), "error": f"{e.__class__.__name__}: {e}"}
+                              for record, _ in views]
+
+        for (record, _), (_, details) in zip(views, validated):
+            discrepancies = details["findings"]
+
+            for discrepancy in discrepancies:
+                discrepancy["document_id"] = str(record["_id"])
+                discrepancy["country"] = record.get("country")
+                discrepancy["creation date"] = creation_date_text(record.get("creation date"))
+
+            results.append({"document_id": str(record["_id"]), "discrepancies": discrepancies})
+
+        return results
+
+    def record_validator_configs(self, db_manager):
+        """Stores the configuration of every registered validator that has none stored yet, so a RevalidationJob
+        can tell which validators changed since their discrepancies were found.
+        """
 
-        document_validator.strategy = self.date_validator
-        find_and_insert_discrepancy_to_db()
+        stored_configs = {record["validator"]: record["config"]
+                          for record in db_manager.find(collection_name=self.validator_config_collection) or []}
 
-        document_validator.strategy = self.total_sum_validator
-        find_and_insert_discrepancy_to_db()
+        for validator in self.validation_engine.validators:
+            if validator.name not in stored_configs:
+                db_manager.insert(collection_name=self.validator_config_collection,
+                                  data={"validator": validator.name, "config": validator.config()})
+            elif stored_configs[validator.name] != validator.config():
+                logger.warning("%s is configured differently than when its stored discrepancies were found, run a "
+                               "RevalidationJob to refresh them", validator.name)
 
     def extract_field(self, tag: str,
                       get_expression: str = None,
@@ -149,7 +1188,7 @@ class HTMLParser(Parser):
 
         return result
 
-    def extract_date_and_country(self, footer: element.Tag) -> tuple:
+    def extract_date_and_country(self, footer: Tag) -> tuple:
         """A function to extract the creation date and country of a html document. Assumes the data is located inside
         the footer element.
         Uses the self.country_date_regex expression in order to extract the date (according to the self.date_format)
@@ -159,7 +1198,7 @@ class HTMLParser(Parser):
             footer: The footer element tag, should contain within it's the text the date and country.
 
         Returns:
-            A tuple consisting of the (country, creation_date)
+            A tuple consisting of the (creation_date, country), the creation date is a datetime.
 
         """
 
@@ -173,11 +1212,11 @@ class HTMLParser(Parser):
             country = match.group(2)
 
             try:
-                creation_date = datetime.strptime(creation_date_str, self.date_format).strftime("%d-%m-%Y")
+                creation_date = datetime.strptime(creation_date_str, self.date_format)
             except ValueError:
                 creation_date = None
         else:
             country = None
             creation_date = None
 
-        return country, creation_date
+        return creation_date, country
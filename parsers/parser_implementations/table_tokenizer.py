@@ -0,0 +1,154 @@
+from html.parser import HTMLParser as TokenizerBase
+from typing import Iterable, List, Dict
+
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+def escape_text(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def serialize_attribute(name: str, value: str | None) -> str:
+    """Serializes an attribute the way BeautifulSoup's minimal formatter does.
+    """
+
+    value = escape_text(value or "")
+
+    if '"' in value:
+        if "'" in value:
+            return f'{name}="{value.replace(chr(34), "&quot;")}"'
+
+        return f"{name}='{value}'"
+
+    return f'{name}="{value}"'
+
+
+class TokenizedElement:
+    __slots__ = ("name", "attrs", "text_parts", "descendants", "raw_parts")
+
+    def __init__(self, name: str, attrs: Dict[str, str | None], capture_raw: bool = False):
+        """A single element seen by the TableTokenizer. It only keeps what the validators ask of a tag: its
+        attributes, its text and its descendants in document order, there is no navigation to parents or siblings.
+        """
+
+        self.name: str = name
+        self.attrs: Dict[str, str | None] = attrs
+        self.text_parts: List[str] = []
+        self.descendants: List[TokenizedElement] = []
+        self.raw_parts: List[str] | None = [] if capture_raw else None
+
+    @property
+    def text(self) -> str:
+        return "".join(self.text_parts)
+
+    def get(self, key: str, default=None):
+        return self.attrs.get(key, default)
+
+    def find(self, name: str):
+        return next((element for element in self.descendants if element.name == name), None)
+
+    def find_all(self, name: str) -> list:
+        return [element for element in self.descendants if element.name == name]
+
+    def __str__(self) -> str:
+        return "".join(self.raw_parts) if self.raw_parts is not None else ""
+
+
+class TableTokenizer(TokenizerBase):
+    def __init__(self, content_tags: Iterable[str], attribute_tags: Iterable[str] = ()):
+        """An event driven tokenizer that collects the first occurrence of the wanted tags in a single pass, without
+        building a tree of the whole document.
+
+        Args:
+            content_tags: Tags whose text, descendants and serialized markup are collected, e.g. 'thead'.
+            attribute_tags: Tags of which only the attributes are collected, e.g. 'table' for its id.
+        """
+
+        super().__init__(convert_charrefs=True)
+        self.content_tags: set = set(content_tags)
+        self.attribute_tags: set = set(attribute_tags)
+        self.elements: Dict[str, TokenizedElement] = {}
+        self._stack: List[tuple] = []
+        self._captures: List[TokenizedElement] = []
+
+    def find(self, name: str) -> TokenizedElement | None:
+        return self.elements.get(name)
+
+    def handle_starttag(self, tag: str, attrs: list):
+        attrs = {name: value if value is not None else "" for name, value in attrs}
+
+        if tag in self.attribute_tags and tag not in self.elements:
+            self.elements[tag] = TokenizedElement(tag, attrs)
+
+        starts_capture = tag in self.content_tags and tag not in self.elements
+        element = None
+
+        if self._captures or starts_capture:
+            element = TokenizedElement(tag, attrs, capture_raw=starts_capture)
+
+            for _, ancestor in self._stack:
+                if ancestor is not None:
+                    ancestor.descendants.append(element)
+
+            if starts_capture:
+                self.elements[tag] = element
+                self._captures.append(element)
+
+            attributes = "".join(f" {serialize_attribute(name, value)}" for name, value in attrs.items())
+            self._write_raw(f"<{tag}{attributes}/>" if tag in VOID_ELEMENTS else f"<{tag}{attributes}>")
+
+        if tag in VOID_ELEMENTS:
+            self._close(element)
+        else:
+            self._stack.append((tag, element))
+
+    def handle_startendtag(self, tag: str, attrs: list):
+        self.handle_starttag(tag, attrs)
+
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str):
+        """Closes the most recent open tag of that name along with every tag that was left open inside it, an end tag
+        that matches no open tag is ignored.
+        """
+
+        if not any(name == tag for name, _ in self._stack):
+            return
+
+        while self._stack:
+            name, element = self._stack.pop()
+
+            if element is not None:
+                self._write_raw(f"</{name}>")
+                self._close(element)
+
+            if name == tag:
+                break
+
+    def handle_data(self, data: str):
+        if not self._captures:
+            return
+
+        for _, element in self._stack:
+            if element is not None:
+                element.text_parts.append(data)
+
+        self._write_raw(escape_text(data))
+
+    def handle_comment(self, data: str):
+        self._write_raw(f"<!--{data}-->")
+
+    def close(self):
+        super().close()
+
+        while self._stack:
+            self.handle_endtag(self._stack[0][0])
+
+    def _close(self, element: TokenizedElement | None):
+        if element is not None and self._captures and self._captures[-1] is element:
+            self._captures.pop()
+
+    def _write_raw(self, raw: str):
+        for capture in self._captures:
+            capture.raw_parts.append(raw)
@@ -1,15 +1,40 @@
+from importlib import import_module
 from parsers import Parser
 
 
 class ParserWrapper:
     def __init__(self):
         self._parsers = {}
+        self._modules = {}
 
     def register_parser(self, parser_type: str, parser_class: Parser):
         self._parsers[parser_type] = parser_class
 
-    def get_parser(self, parser_type: str, *args, **kwargs) -> Parser:
+    def register_module(self, parser_type: str, module_name: str):
+        """Registers the module that implements a parser type by name, the module is only imported once the parser
+        type is first requested, where it registers its class through `register_parser`.
+        """
+
+        self._modules[parser_type] = module_name
+
+    @property
+    def parser_types(self) -> list:
+        return sorted(self._parsers.keys() | self._modules.keys())
+
+    def get_parser_class(self, parser_type: str) -> type:
+        """Returns the class registered for parser_type, importing its module first if it was registered by name.
+
+        Raises:
+            ValueError: If nothing is registered for parser_type.
+        """
+
+        if parser_type not in self._parsers and parser_type in self._modules:
+            import_module(self._modules[parser_type])
+
         if parser_type in self._parsers:
-            return self._parsers[parser_type](*args, **kwargs)
+            return self._parsers[parser_type]
 
-        raise ValueError(f"Unknown db type: {parser_type}")
+        raise ValueError(f"Unknown parser type: {parser_type}")
+
+    def get_parser(self, parser_type: str, *args, **kwargs) -> Parser:
+        return self.get_parser_class(parser_type)(*args, **kwargs)
@@ -0,0 +1,89 @@
+from parsers.parser import Parser
+
+_worker_parser: Parser | None = None
+
+
+def init_worker(parser: Parser):
+    """Initializer of a worker process, keeps the parser so it is only pickled once per process instead of per task.
+    """
+
+    global _worker_parser
+    _worker_parser = parser
+
+    if getattr(parser, "profiler", None):
+        parser.profiler.start()
+
+
+def profile_snapshot(results: list) -> list:
+    """Appends what the worker's profiler measured since the last chunk to the results of a chunk, as a dict with the
+    "profile" snapshot, if the parser profiles.
+    """
+
+    profiler = getattr(_worker_parser, "profiler", None)
+
+    if profiler:
+        results.append({"profile": profiler.snapshot()})
+        profiler.reset()
+
+    return results
+
+
+def process_files(file_names: list) -> list:
+    """Runs the worker's parser over a chunk of files.
+
+    Args:
+        file_names: The paths of the files that are to be processed.
+
+    Returns:
+        A list with the picklable result of `process_file` for every file, or a dict with the file and the error
+        if it could not be processed, followed by a dict with the "profile" if the parser profiles.
+    """
+
+    results = []
+
+    for file_name in file_names:
+        try:
+            results.append(_worker_parser.process_file(file_name, keep_profile=True))
+        except Exception as e:
+            results.append({"file": file_name, "error": f"{e.__class__.__name__}: {e}"})
+
+    return profile_snapshot(results)
+
+
+def process_spans(spans: list) -> list:
+    """Runs the worker's parser over a chunk of elements that were found in files by `scan_elements`, each element is
+    read from its file by the worker itself so only its offsets are sent to the process.
+
+    Args:
+        spans: A (file name, start, end) tuple for every element.
+
+    Returns:
+        A list with the picklable result of `process_file` for every element, or a dict with the file, the offset of
+        the element and the error if it could not be processed, followed by a dict with the "profile" if the parser
+        profiles.
+    """
+
+    results = []
+
+    for file_name, start, end in spans:
+        try:
+            results.append(_worker_parser.process_file(file_name, span=(start, end), keep_profile=True))
+        except Exception as e:
+            results.append({"file": file_name, "offset": start, "error": f"{e.__class__.__name__}: {e}"})
+
+    return profile_snapshot(results)
+
+
+def revalidate_records(records: list, validator_names: list) -> list:
+    """Runs some of the validators of the worker's parser over the stored page data of a chunk of documents.
+
+    Args:
+        records: The page data of the documents as it is stored in the data collection.
+        validator_names: The names of the validators that are to be run.
+
+    Returns:
+        A list with a dict of the "document_id" and its "discrepancies" for every record, or of the "document_id" and
+        the "error" if it could not be validated.
+    """
+
+    return _worker_parser.revalidate_records(records, validator_names)
@@ -0,0 +1,134 @@
+import json
+import math
+import zlib
+from html import escape
+from datetime import datetime
+from validator import DocumentView
+
+RECORD_FORMATS = ("html", "compact")
+HTML_FIELDS = ("header", "body", "footer")
+COMPACT_FIELDS = ("format", "header cells", "header text", "rows", "footer text", "html")
+
+
+def compact_cell(text: str) -> str | int | float:
+    """Types the text of a cell as a number if it is written exactly the way python writes that number, so
+    `cell_text` always gives the original text back, e.g. "1060" into 1060 but "007" and "1e3" stay text.
+    """
+
+    try:
+        value = int(text)
+    except ValueError:
+        try:
+            value = float(text)
+        except ValueError:
+            return text
+
+        if not math.isfinite(value):
+            return text
+
+    return value if str(value) == text else text
+
+
+def cell_text(value: str | int | float) -> str:
+    return value if isinstance(value, str) else str(value)
+
+
+def creation_date_text(creation_date: datetime | str | None) -> str | None:
+    """The creation date as the "dd-mm-YYYY" text that discrepancies are stored with, whatever the record format.
+    """
+
+    return creation_date.strftime("%d-%m-%Y") if isinstance(creation_date, datetime) else creation_date
+
+
+def compact_page(page_data: dict, document: DocumentView, keep_html: bool = False) -> dict:
+    """Converts the page data of a document into the compact record format: the header cells and body rows are
+    stored as plain arrays, with the numeric cells typed as numbers, and the creation date as a date, instead of
+    re-serialized html fragments.
+
+    Args:
+        page_data: The page data `HTMLParser.extract_page` builds, with the header, body and footer as html.
+        document: The DocumentView of the document.
+        keep_html: Whether the original header, body and footer html is kept as a zlib compressed blob.
+
+    Returns:
+        The compact page data.
+    """
+
+    compact = {"format": "compact"}
+
+    for field, value in page_data.items():
+        if field not in HTML_FIELDS:
+            compact[field] = value
+
+    compact["header cells"] = document.header_cells
+    compact["header text"] = document.header_text
+    compact["rows"] = [[compact_cell(cell) for cell in row] for row in document.rows] \
+        if document.rows is not None else None
+    compact["footer text"] = document.footer_text
+    compact["creation date"] = document.creation_date
+
+    if keep_html:
+        compact["html"] = zlib.compress(json.dumps([page_data.get(field) for field in HTML_FIELDS]).encode())
+
+    return compact
+
+
+def is_compact(record: dict) -> bool:
+    return record.get("format") == "compact"
+
+
+def expand_page(record: dict, head_tag: str = "thead", body_tag: str = "tbody", footer_tag: str = "tfoot") -> dict:
+    """Rebuilds the html record format from a compact record, for consumers that read the header, body and footer as
+    html and the creation date as "dd-mm-YYYY" text. The original html is restored if it was kept, otherwise plain html
+    with the same cells and text is built. Records that are not compact are returned as they are.
+
+    Args:
+        record: The page data as it is stored in the data collection.
+        head_tag: The tag of the header.
+        body_tag: The tag that contains the rows.
+        footer_tag: The tag of the footer.
+
+    Returns:
+        The page data in the html record format.
+    """
+
+    if not is_compact(record):
+        return record
+
+    page_data = {field: value for field, value in record.items() if field not in COMPACT_FIELDS}
+    page_data["creation date"] = creation_date_text(record.get("creation date"))
+
+    if record.get("html"):
+        page_data.update(zip(HTML_FIELDS, json.loads(zlib.decompress(record["html"]))))
+
+        return page_data
+
+    header_cells = record.get("header cells")
+    rows = record.get("rows")
+    footer_text = record.get("footer text")
+
+    page_data["header"] = f"<{head_tag}><tr>{''.join(f'<th>{escape(cell)}</th>' for cell in header_cells)}</tr>" \
+                          f"</{head_tag}>" if header_cells is not None else "None"
+    page_data["body"] = f"<{body_tag}>" + "".join(
+        f"<tr>{''.join(f'<td>{escape(cell_text(cell))}</td>' for cell in row)}</tr>" for row in rows) + \
+        f"</{body_tag}>" if rows is not None else "None"
+    page_data["footer"] = f"<{footer_tag}>{escape(footer_text)}</{footer_tag}>" if footer_text is not None else "None"
+
+    return page_data
+
+
+def document_view_from_compact(record: dict) -> DocumentView:
+    """Rebuilds the DocumentView of a document from its compact record without parsing any html.
+    """
+
+    rows = record.get("rows")
+    creation_date = record.get("creation date")
+
+    return DocumentView(title=record.get("title"),
+                        header_text=record.get("header text"),
+                        header_cells=record.get("header cells"),
+                        rows=[[cell_text(cell) for cell in row] for row in rows] if rows is not None else None,
+                        footer_text=record.get("footer text"),
+                        creation_date=datetime.fromisoformat(creation_date) if isinstance(creation_date, str)
+                        else creation_date,
+                        country=record.get("country"))
@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from consts import FIND_BATCH_SIZE
+from data_layer import DBManager, manager_factory
+from instrumentation import get_logger
+from parsers.parse_summary import ParseSummary
+from parsers.process_pool import init_worker, revalidate_records
+
+logger = get_logger("parsers.revalidation")
+
+PAGE_DATA_PROJECTION = {"title": 1, "header": 1, "body": 1, "footer": 1, "creation date": 1, "country": 1, "format": 1,
+                        "header cells": 1, "header text": 1, "rows": 1, "footer text": 1}
+
+
+class RevalidationJob:
+    def __init__(self, parser,
+                 db_manager: DBManager | None = None,
+                 validator_names: list | None = None,
+                 batch_size: int = FIND_BATCH_SIZE):
+        """Reruns validators over the page data that is already stored, so a change in their configuration, e.g. of
+        HEADER_MAX_LENGTH, refreshes the stored discrepancies without reading and parsing the source files again.
+        The page data is streamed in batches that are validated on the parser's pool of threads or processes, and the
+        discrepancies of every batch are replaced in a single atomic `replace`.
+
+        Args:
+            parser: The HTMLParser whose validators, configuration and collections are used. Its execution_mode,
+                max_workers and queue_size decide how the batches are validated in parallel.
+            db_manager: The DBManager of the stored documents, defaults to one of the parser's db_type.
+            validator_names: The names of the validators to rerun, defaults to the ones whose configuration changed
+                since their discrepancies were found.
+            batch_size: How many documents are read, validated and replaced at a time.
+        """
+
+        self.parser = parser
+        self.db_manager: DBManager = db_manager or manager_factory.get_manager(parser.db_type)
+        self.validator_names: list | None = validator_names
+        self.batch_size: int = batch_size
+
+    def changed_validators(self) -> list:
+        """Compares the configuration of the parser's validators to the stored ones.
+
+        Returns:
+            The names of the validators whose configuration changed or was never stored.
+        """
+
+        stored_configs = {record["validator"]: record["config"]
+                          for record in self.db_manager.find(self.parser.validator_config_collection) or []}
+
+        return [validator.name for validator in self.parser.validation_engine.validators
+                if stored_configs.get(validator.name) != validator.config()]
+
+    def run(self, query: dict | None = None) -> ParseSummary:
+        """Revalidates the stored documents and replaces their discrepancies, then stores the configuration of the
+        rerun validators.
+
+        Args:
+            query: Limits the job to the matching page data, e.g. {"country": "Chad"}.
+
+        Returns:
+            A ParseSummary of how many documents were revalidated ("parsed"), how many failed and how many
+            discrepancies were found.
+        """
+
+        summary = ParseSummary()
+        validator_names = self.validator_names if self.validator_names is not None else self.changed_validators()
+
+        if not validator_names:
+            logger.info("No validator changed, nothing to revalidate")
+
+            return summary
+
+        logger.info("Revalidating %s with %s", self.parser.data_collection, ", ".join(validator_names))
+
+        if self.parser.execution_mode == "processes":
+            executor = ProcessPoolExecutor(max_workers=self.parser.max_workers, initializer=init_worker,
+                                           initargs=(self.parser,))
+        else:
+            executor = ThreadPoolExecutor(max_workers=self.parser.max_workers, initializer=init_worker,
+                                          initargs=(self.parser,))
+
+        pending = set()
+        max_pending = self.parser.max_workers + self.parser.queue_size
+
+        with executor:
+            for records in self.db_manager.paginate(self.parser.data_collection, query, page_size=self.batch_size,
+                                                    projection=PAGE_DATA_PROJECTION):
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        self.replace_discrepancies(future.result(), validator_names, summary)
+
+                pending.add(executor.submit(revalidate_records, records, validator_names))
+
+            for future in wait(pending).done:
+                self.replace_discrepancies(future.result(), validator_names, summary)
+
+        if not summary.failed:
+            self.store_configs(validator_names)
+        else:
+            logger.error("%d documents failed to be revalidated, the configuration of %s is not stored",
+                         summary.failed, ", ".join(validator_names))
+
+        return summary
+
+    def replace_discrepancies(self, results: list, validator_names: list, summary: ParseSummary):
+        """Atomically replaces the discrepancies the given validators found in a batch of documents with the new ones.
+        The discrepancies of documents that failed to be revalidated are kept.
+        """
+
+        document_ids = []
+        discrepancies = []
+
+        for result in results:
+            if "error" in result:
+                logger.warning("Failed to revalidate %s: %s", result["document_id"], result["error"])
+                summary.increment("failed")
+            else:
+                document_ids.append(result["document_id"])
+                discrepancies.extend(result["discrepancies"])
+
+        if not document_ids:
+            return
+
+        query = {"document_id": {"$in": document_ids}, "validator": {"$in": validator_names}}
+        analytics = self.parser.analytics
+        replaced_discrepancies = list(self.db_manager.find(self.parser.discrepancy_collection, query,
+                                                           projection={"discrepancy_type": 1, "country": 1,
+                                                                       "creation date": 1}) or []) \
+            if analytics else []
+
+        if self.db_manager.replace(self.parser.discrepancy_collection, query, discrepancies) is None:
+            logger.error("Failed to replace the discrepancies of %d documents", len(document_ids))
+            summary.increment("failed", len(document_ids))
+
+            return
+
+        if analytics:
+            analytics.record(replaced_discrepancies, amount=-1)
+            analytics.record(discrepancies)
+
+        summary.increment("parsed", len(document_ids))
+        summary.increment("discrepancies", len(discrepancies))
+
+    def store_configs(self, validator_names: list):
+        for validator in self.parser.validation_engine.validators:
+            if validator.name in validator_names:
+                self.db_manager.update(collection_name=self.parser.validator_config_collection,
+                                       query={"validator": validator.name},
+                                       update_type="$set",
+                                       new_data={"config": validator.config()},
+                                       upsert=True)
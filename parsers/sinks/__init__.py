@@ -0,0 +1,3 @@
+from .sink import Sink
+from .db_sink import DBSink
+from .json_lines_sink import JsonLinesSink
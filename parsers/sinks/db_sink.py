@@ -0,0 +1,90 @@
+from threading import Lock
+from data_layer import DBManager, WriteBatcher, DiscrepancyAnalytics
+from parsers.sinks.sink import Sink
+from consts import WRITE_BATCH_SIZE, WRITE_FLUSH_INTERVAL
+
+
+class DBSink(Sink):
+    def __init__(self, db_manager: DBManager,
+                 data_collection: str = "html data",
+                 discrepancy_collection: str = "html discrepancies",
+                 batch_size: int = WRITE_BATCH_SIZE,
+                 flush_interval: float = WRITE_FLUSH_INTERVAL,
+                 analytics: DiscrepancyAnalytics | None = None):
+        """Writes the page data of every record and its discrepancies into the db through a WriteBatcher, each
+        discrepancy referencing the `_id` of its page data under "document_id" and carrying the "country" and
+        "creation date" of its document, like the ones `HTMLParser.write_page` stores.
+        The discrepancies of page data the db rejected, e.g. because its document id is already stored, are deleted
+        once the sink is closed.
+
+        Args:
+            db_manager: The DBManager to write with, e.g. manager_factory.get_manager("mongo").
+            data_collection: The collection the page data is written into.
+            discrepancy_collection: The collection the discrepancies are written into.
+            batch_size: How many records of a single collection are buffered before they are written.
+            flush_interval: The maximum amount of seconds a record is buffered before it is written.
+            analytics: If given the written and deleted discrepancies are kept in its materialized summary.
+        """
+
+        self.db_manager: DBManager = db_manager
+        self.data_collection: str = data_collection
+        self.discrepancy_collection: str = discrepancy_collection
+        self.analytics: DiscrepancyAnalytics | None = analytics
+        self.failed: int = 0
+        self._failed_page_ids: list = []
+        self._lock: Lock = Lock()
+        self.batcher: WriteBatcher = WriteBatcher(db_manager, batch_size=batch_size, flush_interval=flush_interval,
+                                                  on_flush=self._on_flush)
+
+    def write(self, record: dict):
+        if "error" in record:
+            with self._lock:
+                self.failed += 1
+
+            return
+
+        # imported here so DBSink can be used without the html dependencies parsers.record_format pulls in
+        from parsers.record_format import creation_date_text
+
+        page_data = record["page_data"]
+        db_id = str(self.batcher.add(self.data_collection, page_data))
+
+        for discrepancy in record["discrepancies"]:
+            discrepancy["document_id"] = db_id
+            discrepancy["country"] = page_data.get("country")
+            discrepancy["creation date"] = creation_date_text(page_data.get("creation date"))
+            self.batcher.add(self.discrepancy_collection, discrepancy)
+
+    def _on_flush(self, collection_name: str, records: list, success: bool):
+        if collection_name == self.data_collection and not success:
+            with self._lock:
+                self.failed += len(records)
+                self._failed_page_ids.extend(str(record["_id"]) for record in records)
+        elif collection_name == self.discrepancy_collection and success and self.analytics:
+            self.analytics.record(records)
+
+    def delete_orphaned_discrepancies(self) -> int:
+        """Deletes the discrepancies that were written along with page data that failed to be inserted.
+
+        Returns:
+            How many discrepancies were deleted.
+        """
+
+        with self._lock:
+            failed_page_ids, self._failed_page_ids = self._failed_page_ids, []
+
+        if not failed_page_ids:
+            return 0
+
+        query = {"document_id": {"$in": failed_page_ids}}
+
+        if self.analytics:
+            self.analytics.record(list(self.db_manager.find(collection_name=self.discrepancy_collection, query=query,
+                                                            projection={"discrepancy_type": 1, "country": 1,
+                                                                        "creation date": 1}) or []), amount=-1)
+
+        return self.db_manager.delete(collection_name=self.discrepancy_collection, query=query)
+
+    def close(self):
+        self.batcher.close()
+        self.delete_orphaned_discrepancies()
@@ -0,0 +1,22 @@
+import json
+from parsers.sinks.sink import Sink
+
+
+class JsonLinesSink(Sink):
+    def __init__(self, path: str):
+        """Appends every record as a single json line to a local file, values json can not represent (e.g. dates)
+        are written as strings.
+
+        Args:
+            path: The path of the output file.
+        """
+
+        self.path: str = path
+        self._file = open(path, 'a')
+
+    def write(self, record: dict):
+        self._file.write(json.dumps(record, default=str))
+        self._file.write("\n")
+
+    def close(self):
+        self._file.close()
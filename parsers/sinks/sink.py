@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+
+
+class Sink(ABC):
+    """A destination for the records yielded by `Parser.iter_records`.
+    """
+
+    @abstractmethod
+    def write(self, record: dict):
+        raise NotImplementedError(f"Function `write` is not implemented for: {self.__class__.__name__}")
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+        return False
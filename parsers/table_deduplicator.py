@@ -0,0 +1,139 @@
+import json
+import math
+import hashlib
+from threading import Lock
+from consts import DEDUP_EXPECTED_TABLES, DEDUP_FALSE_POSITIVE_RATE, FIND_BATCH_SIZE
+from data_layer import DBManager
+from instrumentation import metrics, get_logger
+from validator import DocumentView
+
+logger = get_logger("parsers.dedup")
+dedup_checks = metrics.counter("dedup_checks_total", "Tables checked for duplicates, by result.")
+
+
+def normalize_text(text: str | None) -> str | None:
+    return " ".join(text.split()) if text is not None else None
+
+
+def table_fingerprint(page_data: dict, document: DocumentView) -> str:
+    """Fingerprints the normalized content of a table: its id, caption, header and body cells and footer, with runs
+    of whitespace collapsed, so the same table that is emitted again with different formatting has the same one.
+
+    Returns:
+        A hex digest of 128 bits.
+    """
+
+    content = [page_data.get("document id"),
+               normalize_text(document.title),
+               [normalize_text(cell) for cell in document.header_cells or []],
+               [[normalize_text(cell) for cell in row] for row in document.rows or []],
+               normalize_text(document.footer_text)]
+
+    return hashlib.blake2b(json.dumps(content, separators=(",", ":")).encode(), digest_size=16).hexdigest()
+
+
+class BloomFilter:
+    __slots__ = ("size", "hash_count", "bits")
+
+    def __init__(self, expected_items: int, false_positive_rate: float):
+        """A compact set of fingerprints that answers "maybe seen" or "never seen", sized to keep false positives at
+        false_positive_rate once expected_items were added, e.g. about 1.8 bytes per item at 0.1%.
+
+        Args:
+            expected_items: How many items are expected to be added.
+            false_positive_rate: The wanted probability that an item that was never added is reported as seen.
+        """
+
+        self.size: int = max(8, int(-expected_items * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count: int = max(1, round(self.size / max(expected_items, 1) * math.log(2)))
+        self.bits: bytearray = bytearray((self.size + 7) // 8)
+
+    def _positions(self, fingerprint: str):
+        first, second = int(fingerprint[:16], 16), int(fingerprint[16:32], 16) | 1
+
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, fingerprint: str):
+        for position in self._positions(fingerprint):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(fingerprint))
+
+
+class TableDeduplicator:
+    def __init__(self, db_manager: DBManager,
+                 collection_name: str,
+                 expected_tables: int = DEDUP_EXPECTED_TABLES,
+                 false_positive_rate: float = DEDUP_FALSE_POSITIVE_RATE):
+        """Tells whether a table was already ingested by its fingerprint. The fingerprints of the stored tables are
+        kept in a BloomFilter, so a new table is usually recognized without touching the db, and a possible duplicate
+        is confirmed exactly against the indexed "fingerprint" of the stored page data.
+        Tables that were accepted but may not be written yet are remembered until they are `settle`d.
+
+        Args:
+            db_manager: The DBManager of the page data.
+            collection_name: The collection of the page data, its "fingerprint" field must be indexed.
+            expected_tables: How many tables the filter is sized for, it gets less accurate (not wrong) beyond that.
+            false_positive_rate: The share of new tables that need an exact confirmation against the db.
+        """
+
+        self.db_manager: DBManager = db_manager
+        self.collection_name: str = collection_name
+        self.bloom_filter: BloomFilter = BloomFilter(expected_tables, false_positive_rate)
+        self._pending: dict = {}
+        self._lock: Lock = Lock()
+
+        loaded = 0
+
+        for record in self.db_manager.find(collection_name=collection_name, query={"fingerprint": {"$exists": True}},
+                                           projection={"fingerprint": 1}, batch_size=FIND_BATCH_SIZE) or []:
+            self.bloom_filter.add(record["fingerprint"])
+            loaded += 1
+
+        logger.info("Loaded the fingerprints of %d stored tables", loaded)
+
+    def check(self, fingerprint: str, db_id, source_file: str | None = None) -> dict | None:
+        """Checks whether a table was already ingested, if not it is remembered as the original of its fingerprint.
+
+        Args:
+            fingerprint: The `table_fingerprint` of the table.
+            db_id: The `_id` the table is going to be written with.
+            source_file: The file the table comes from.
+
+        Returns:
+            The `_id` and "source file" of the original table if it is a duplicate, None otherwise. The "source file"
+            is None for tables that were stored without one.
+        """
+
+        with self._lock:
+            if fingerprint in self.bloom_filter:
+                original = self._pending.get(fingerprint)
+
+                if original is None:
+                    original = next(iter(self.db_manager.find(collection_name=self.collection_name,
+                                                              query={"fingerprint": fingerprint},
+                                                              projection={"_id": 1, "source file": 1},
+                                                              limit=1) or []), None)
+
+                if original is not None:
+                    dedup_checks.inc(result="duplicate")
+
+                    return {"_id": original["_id"], "source file": original.get("source file")}
+
+                dedup_checks.inc(result="false positive")
+            else:
+                dedup_checks.inc(result="new")
+
+            self.bloom_filter.add(fingerprint)
+            self._pending[fingerprint] = {"_id": db_id, "source file": source_file}
+
+        return None
+
+    def settle(self, fingerprints: list):
+        """Forgets the tables that were written, or failed to be, the db answers for them from now on.
+        """
+
+        with self._lock:
+            for fingerprint in fingerprints:
+                self._pending.pop(fingerprint, None)
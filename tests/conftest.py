@@ -0,0 +1,70 @@
+import os
+import shutil
+import pytest
+
+DOCUMENTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "documents")
+PARSER_ARGUMENTS = {"id_tag": "table",
+                    "title_tag": "caption",
+                    "head_tag": "thead",
+                    "body_tag": "tbody",
+                    "footer_tag": "tfoot",
+                    "extract_country_and_date_from_footer": True,
+                    "country_date_regex": r"Creation: (\d{1,2}[A-Za-z]{3}\d{4}) ([A-Za-z]+)",
+                    "date_format": "%d%b%Y"}
+
+
+@pytest.fixture
+def documents_dir() -> str:
+    return DOCUMENTS_DIR
+
+
+@pytest.fixture
+def parser_arguments() -> dict:
+    return dict(PARSER_ARGUMENTS)
+
+
+@pytest.fixture
+def sqlite_path(tmp_path, monkeypatch) -> str:
+    """A fresh SQLite database that the sqlite managers of the test open by default.
+    """
+
+    from data_layer.sqlite import sqlite_manager
+
+    path = str(tmp_path / "beaconcure.db")
+    monkeypatch.setattr(sqlite_manager, "SQLITE_PATH", path)
+
+    return path
+
+
+@pytest.fixture
+def sqlite_manager(sqlite_path):
+    from data_layer import manager_factory
+
+    return manager_factory.get_manager("sqlite", db_path=sqlite_path)
+
+
+@pytest.fixture
+def documents_copy(documents_dir, tmp_path) -> str:
+    """A copy of the documents that a test may change.
+    """
+
+    copy_dir = tmp_path / "documents"
+    shutil.copytree(documents_dir, copy_dir)
+
+    return str(copy_dir)
+
+
+@pytest.fixture
+def tables_file(documents_dir, tmp_path) -> str:
+    """A directory with a single file that holds every table of the documents.
+    """
+
+    tables_dir = tmp_path / "tables"
+    tables_dir.mkdir()
+
+    with open(tables_dir / "tables.html", 'w') as tables:
+        for file_name in sorted(os.listdir(documents_dir)):
+            with open(os.path.join(documents_dir, file_name), 'r') as f:
+                tables.write(f.read())
+
+    return str(tables_dir / "tables.html")
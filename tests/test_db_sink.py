@@ -0,0 +1,25 @@
+from parsers import parser_wrapper, DBSink
+
+
+def test_db_sink_links_discrepancies_and_deletes_orphans(documents_dir, parser_arguments, sqlite_manager):
+    html_parser = parser_wrapper.get_parser("html-fast", **parser_arguments)
+
+    assert html_parser.ingest(documents_dir, DBSink(sqlite_manager)) == 67
+
+    pages = {page["_id"]: page for page in sqlite_manager.find("html data")}
+    discrepancies = list(sqlite_manager.find("html discrepancies"))
+
+    assert len(pages) == 67
+    assert discrepancies
+
+    for discrepancy in discrepancies:
+        page = pages[discrepancy["document_id"]]
+        assert discrepancy["country"] == page["country"]
+        assert discrepancy["creation date"] == page["creation date"]
+
+    sink = DBSink(sqlite_manager)
+    html_parser.ingest(documents_dir, sink)
+
+    assert sink.failed == 67
+    assert len(list(sqlite_manager.find("html data"))) == 67
+    assert len(list(sqlite_manager.find("html discrepancies"))) == len(discrepancies)
@@ -0,0 +1,53 @@
+import os
+import shutil
+import pytest
+from parsers import parser_wrapper
+
+
+@pytest.mark.parametrize("db_type", ["sqlite", "memory"])
+def test_aliases_are_recorded_once_and_only_for_other_files(db_type, documents_copy, parser_arguments, sqlite_path):
+    from data_layer import manager_factory
+
+    if db_type == "memory":
+        manager_factory.get_manager_class("memory").clear()
+
+    db_manager = manager_factory.get_manager(db_type)
+
+    def parse():
+        return parser_wrapper.get_parser("html-fast", **parser_arguments, db_type=db_type,
+                                         deduplicate="alias").parse(documents_copy)
+
+    assert parse().inserted == 67
+
+    for _ in range(2):
+        summary = parse()
+        assert (summary.inserted, summary.duplicates) == (0, 67)
+
+    assert list(db_manager.find("table aliases") or []) == []
+
+    shutil.copy(os.path.join(documents_copy, "0_table.html"), os.path.join(documents_copy, "copy.html"))
+
+    for _ in range(2):
+        assert parse().duplicates == 68
+
+    aliases = list(db_manager.find("table aliases"))
+    assert len(aliases) == 1
+    assert aliases[0]["file"].endswith("copy.html")
+
+    original = next(iter(db_manager.find("html data", query={"document id": aliases[0]["document id"]})))
+    assert aliases[0]["alias_of"] == str(original["_id"])
+    assert original["source file"].endswith("0_table.html")
+
+
+def test_fingerprint_ignores_the_whitespace_of_every_cell():
+    from parsers.table_deduplicator import table_fingerprint
+    from validator import DocumentView
+
+    def fingerprint(title, header_cells, rows):
+        return table_fingerprint({"document id": "0"}, DocumentView(title=title, header_cells=header_cells, rows=rows,
+                                                                    footer_text="Total"))
+
+    original = fingerprint("Table 1", ["Year", "Amount"], [["2020", "10 000"], ["2021", "12 000"]])
+
+    assert fingerprint(" Table\n1 ", ["Year ", "\tAmount"], [["2020", "10  000"], [" 2021\n", "12\n000"]]) == original
+    assert fingerprint("Table 1", ["Year", "Amount"], [["2020", "10 000"], ["2021", "12 001"]]) != original
@@ -0,0 +1,42 @@
+from data_layer import manager_factory, DiscrepancyAnalytics
+from parsers import parser_wrapper
+
+
+def parse_into(db_type: str, documents_dir: str, parser_arguments: dict) -> DiscrepancyAnalytics:
+    html_parser = parser_wrapper.get_parser("html-fast", **parser_arguments, db_type=db_type, materialize_summary=True)
+    html_parser.parse(documents_dir)
+
+    return html_parser.analytics
+
+
+def failing_validators(analytics: DiscrepancyAnalytics) -> list:
+    """The failing validators of every document, without the ids that differ between the backends.
+    """
+
+    return sorted((document["validator_count"], document["discrepancies"], sorted(document["validators"]))
+                  for document in analytics.documents_failing_validators(min_validators=1))
+
+
+def test_sqlite_rollups_match_the_memory_backend(documents_dir, parser_arguments, sqlite_path):
+    manager_factory.get_manager_class("memory").clear()
+    memory_analytics = parse_into("memory", documents_dir, parser_arguments)
+    sqlite_analytics = parse_into("sqlite", documents_dir, parser_arguments)
+
+    rollup = sqlite_analytics.discrepancies_by_type_country_month()
+
+    assert rollup
+    assert rollup == memory_analytics.discrepancies_by_type_country_month()
+    assert sqlite_analytics.discrepancies_by_type_country_month({"validator": "DateValidator"}) == \
+        memory_analytics.discrepancies_by_type_country_month({"validator": "DateValidator"})
+    assert failing_validators(sqlite_analytics) == failing_validators(memory_analytics)
+    assert sqlite_analytics.summary() == rollup
+
+
+def test_rebuild_summary_replaces_the_summary(documents_dir, parser_arguments, sqlite_manager):
+    analytics = parse_into("sqlite", documents_dir, parser_arguments)
+    rollup = analytics.discrepancies_by_type_country_month()
+    sqlite_manager.insert("discrepancy summary", {"discrepancy_type": "stale", "country": None, "month": None,
+                                                  "count": 5})
+
+    assert analytics.rebuild_summary() == len(rollup)
+    assert analytics.summary() == rollup
@@ -0,0 +1,18 @@
+from parsers import parser_wrapper
+
+
+def records_by_file(parser, source: str) -> dict:
+    return {record["file"]: record for record in parser.iter_records(source)}
+
+
+def test_html_fast_matches_html_parser(documents_dir, parser_arguments):
+    html_records = records_by_file(parser_wrapper.get_parser("html", **parser_arguments), documents_dir)
+    fast_records = records_by_file(parser_wrapper.get_parser("html-fast", **parser_arguments), documents_dir)
+
+    assert len(html_records) == 67
+    assert fast_records.keys() == html_records.keys()
+
+    for file_name, record in html_records.items():
+        assert "error" not in record, file_name
+        assert fast_records[file_name]["page_data"] == record["page_data"], file_name
+        assert fast_records[file_name]["discrepancies"] == record["discrepancies"], file_name
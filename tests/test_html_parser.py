@@ -0,0 +1,21 @@
+import pytest
+from parsers import parser_wrapper
+
+
+@pytest.mark.parametrize("batch_writes", [True, False])
+def test_discrepancies_of_rejected_pages_are_not_counted(batch_writes, documents_dir, parser_arguments,
+                                                        sqlite_manager):
+    def parse():
+        return parser_wrapper.get_parser("html-fast", **parser_arguments, db_type="sqlite",
+                                         batch_writes=batch_writes).parse(documents_dir)
+
+    summary = parse()
+    stored_discrepancies = len(list(sqlite_manager.find("html discrepancies")))
+
+    assert summary.inserted == 67
+    assert summary.discrepancies == stored_discrepancies > 0
+
+    summary = parse()
+
+    assert (summary.inserted, summary.failed, summary.discrepancies) == (0, 67, 0)
+    assert len(list(sqlite_manager.find("html discrepancies"))) == stored_discrepancies
@@ -0,0 +1,38 @@
+import os
+import pytest
+from parsers import parser_wrapper
+
+
+@pytest.mark.parametrize("db_type", ["sqlite", "memory"])
+def test_rerun_skips_unchanged_files_and_replaces_changed_ones(db_type, documents_copy, parser_arguments,
+                                                                sqlite_path):
+    from data_layer import manager_factory
+
+    if db_type == "memory":
+        manager_factory.get_manager_class("memory").clear()
+
+    db_manager = manager_factory.get_manager(db_type)
+
+    def parse():
+        return parser_wrapper.get_parser("html-fast", **parser_arguments, db_type=db_type,
+                                         incremental=True).parse(documents_copy)
+
+    assert parse().inserted == 67
+
+    summary = parse()
+    assert (summary.skipped, summary.failed) == (67, 0)
+
+    changed_file = os.path.join(documents_copy, "0_table.html")
+
+    with open(changed_file, 'r') as f:
+        content = f.read()
+
+    with open(changed_file, 'w') as f:
+        f.write(content.replace("Roberts LLC", "Roberts Ltd"))
+
+    summary = parse()
+    assert (summary.skipped, summary.updated, summary.failed) == (66, 1, 0)
+
+    pages = list(db_manager.find("html data"))
+    assert len(pages) == 67
+    assert sum("Roberts Ltd" in page["body"] for page in pages) == 1
@@ -0,0 +1,49 @@
+import os
+import re
+import sys
+import subprocess
+from parsers.lease_coordinator import LeaseCoordinator
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_several_processes_ingest_every_document_once(documents_dir, sqlite_manager, sqlite_path):
+    environment = {**os.environ, "SQLITE_PATH": sqlite_path, "LEASE_BATCH_SIZE": "5", "LEASE_POLL_INTERVAL": "0.1"}
+    nodes = [subprocess.Popen([sys.executable, "main.py", documents_dir, "--parser", "html-fast", "--db", "sqlite",
+                               "--workers", "2", "--distributed", "test-run"],
+                              cwd=ROOT_DIR, env=environment, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+             for _ in range(3)]
+    outputs = [node.communicate(timeout=120) for node in nodes]
+
+    assert [node.returncode for node in nodes] == [0, 0, 0], [stderr for _, stderr in outputs]
+
+    inserted = [int(re.search(r"inserted=(\d+)", stdout).group(1)) for stdout, _ in outputs]
+    failed = [int(re.search(r"failed=(\d+)", stdout).group(1)) for stdout, _ in outputs]
+    pages = list(sqlite_manager.find("html data"))
+
+    assert (sum(inserted), sum(failed)) == (67, 0)
+    assert len(pages) == len({page["document id"] for page in pages}) == 67
+    assert LeaseCoordinator("sqlite", "test-run").progress() == {"done": 14}
+
+
+def test_the_lease_of_a_node_that_stopped_heartbeating_is_taken_over(documents_dir, sqlite_manager):
+    files = sorted(os.path.join(documents_dir, file_name) for file_name in os.listdir(documents_dir))[:9]
+    stalled = LeaseCoordinator("sqlite", "takeover", node_id="stalled", lease_seconds=0.3)
+    stalled_lease, _ = next(stalled.leases(files, batch_size=3))
+
+    node = LeaseCoordinator("sqlite", "takeover", node_id="node", poll_interval=0.05)
+    node.register()
+
+    try:
+        leases = []
+
+        for lease_id, batch in node.leases(files, batch_size=3):
+            leases.append(lease_id)
+            node.complete(lease_id)
+    finally:
+        node.close()
+
+    assert len(leases) == 3
+    assert leases[-1] == stalled_lease
+    assert node.progress() == {"done": 3}
+    assert {lease["owner"] for lease in sqlite_manager.find("ingest leases")} == {"node"}
@@ -0,0 +1,110 @@
+import pytest
+from validator import (DocumentView, CompositeValidator, ValidationStatus, TableArray, TableBatch, RowTotalValidator,
+                       ColumnTotalValidator, CellBoundsValidator, OutlierValidator)
+
+np = pytest.importorskip("numpy")
+
+
+def document(rows: list | None, header_cells: list | None = None) -> DocumentView:
+    return DocumentView(header_cells=header_cells, rows=rows)
+
+
+def found(result: tuple) -> list:
+    status, details = result
+    assert status == ValidationStatus.INVALID
+
+    return next(finding for key, finding in details.items() if key != "Location")["Found"]
+
+
+def test_table_array_pads_uneven_rows_and_masks_text():
+    table = TableArray([["1", "2", "x"], ["3"], []], header_cells=[" A ", "B"])
+
+    assert table.shape == (3, 3)
+    assert table.mask.tolist() == [[False, False, True], [False, True, True], [True, True, True]]
+    assert table.values[:2, 0].tolist() == [1.0, 3.0]
+    assert (table.column_name(0), table.column_name(2)) == ("A", None)
+
+
+def test_table_batch_stacks_tables_and_locates_rows():
+    batch = TableBatch([TableArray([["1", "2"], ["3", "4"]]), TableArray([["5"], ["6"], ["7"]])])
+
+    assert batch.values.shape == (5, 2)
+    assert batch.row_offsets.tolist() == [0, 2]
+    assert batch.documents.tolist() == [0, 0, 1, 1, 1]
+    assert batch.document_sums(np.where(batch.mask, 0, batch.values)).tolist() == [[4, 6], [18, 0]]
+
+    documents, rows = batch.locate(np.array([1, 4]))
+    assert (documents.tolist(), rows.tolist()) == ([0, 1], [1, 2])
+
+
+def test_row_total_validator_reports_the_rows():
+    result = RowTotalValidator(10).validate(document([["5", "6"], ["1", "2"], ["x", "20"]]))
+
+    assert found(result) == [{"Row": 0, "Total": 11}, {"Row": 2, "Total": 20}]
+
+
+def test_column_total_validator_reports_the_columns_with_their_headers():
+    result = ColumnTotalValidator(10).validate(document([["5", "1"], ["6"], ["x", "2"]], header_cells=["A", "B"]))
+
+    assert found(result) == [{"Column": 0, "Total": 11, "Header": "A"}]
+
+
+def test_cell_bounds_validator_reports_the_cells():
+    result = CellBoundsValidator(min_value=0, max_value=10).validate(document([["-1", "5"], ["11"], ["x", "2.5"]]))
+
+    assert found(result) == [{"Row": 0, "Column": 0, "Value": -1, "Header": None},
+                             {"Row": 1, "Column": 0, "Value": 11, "Header": None}]
+
+
+def test_outlier_validator_reports_the_cells():
+    rows = [["10", "1"] for _ in range(10)] + [["1000", "1"]]
+    entry, = found(OutlierValidator().validate(document(rows)))
+
+    assert (entry["Row"], entry["Column"], entry["Value"]) == (10, 0, 1000)
+    assert entry["Z Score"] == pytest.approx(10 ** 0.5)
+
+
+@pytest.mark.parametrize("max_z_score", [1.5, 2.0, 3.0, 3.5])
+def test_outlier_validator_checks_the_smallest_columns_that_can_have_an_outlier(max_z_score):
+    validator = OutlierValidator(max_z_score)
+    rows = [["10"]] * (validator.min_count - 1) + [["1000"]]
+
+    assert found(validator.validate(document(rows)))[0]["Row"] == validator.min_count - 1
+    assert validator.validate(document(rows[1:]))[0] == ValidationStatus.VALID
+    assert OutlierValidator(3.0).min_count == 11
+
+
+def test_numeric_validators_report_missing_and_non_numeric_bodies():
+    validator = RowTotalValidator(10)
+
+    assert validator.validate(document(None))[0] == ValidationStatus.NOT_FOUND
+    assert validator.validate(document([["a", "b"]]))[0] == ValidationStatus.NOT_PROCESSED
+    assert validator.validate(document([["1", "2"]]))[0] == ValidationStatus.VALID
+
+
+def test_only_max_reported_coordinates_are_reported():
+    status, details = RowTotalValidator(0, max_reported=2).validate(document([["1"]] * 5))
+    finding = details["Row Total Sum Greater Than Max"]
+
+    assert (finding["Count"], len(finding["Found"])) == (5, 2)
+
+
+def test_batch_results_equal_the_results_of_every_document():
+    documents = [[["5", "6", "x"], ["1"], ["300", "2", "3"]],
+                 None,
+                 [["a", "b"]],
+                 [["1", "2"]],
+                 [[str(value), "-4"] for value in [10] * 12 + [900]],
+                 [["7"], ["8", "9", "10", "11"]]]
+
+    def validators():
+        return CompositeValidator([RowTotalValidator(10), ColumnTotalValidator(20),
+                                   CellBoundsValidator(min_value=0, max_value=100), OutlierValidator()])
+
+    batch_results = validators().validate_batch([document(rows, header_cells=["A", "B"]) for rows in documents])
+    results = [validators().validate(document(rows, header_cells=["A", "B"])) for rows in documents]
+
+    assert batch_results == results
+    assert [status for status, _ in results] == [ValidationStatus.INVALID, ValidationStatus.NOT_FOUND,
+                                                 ValidationStatus.NOT_PROCESSED, ValidationStatus.VALID,
+                                                 ValidationStatus.INVALID, ValidationStatus.INVALID]
@@ -0,0 +1,34 @@
+import os
+import sys
+import subprocess
+import pytest
+from parsers import parser_wrapper
+from validator import DocumentView, RowTotalValidator
+from validator import table_array
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_numeric_validators_need_numpy(monkeypatch):
+    monkeypatch.setattr(table_array, "np", None)
+
+    with pytest.raises(ImportError, match="pip install numpy"):
+        RowTotalValidator(10)
+
+    with pytest.raises(ImportError):
+        DocumentView(rows=[["1"]]).table
+
+
+def test_documents_are_parsed_and_validated_without_numpy(monkeypatch, documents_dir, parser_arguments):
+    monkeypatch.setattr(table_array, "np", None)
+
+    records = list(parser_wrapper.get_parser("html-fast", **parser_arguments).iter_records(documents_dir))
+
+    assert len(records) == 67
+    assert not any("error" in record for record in records)
+
+
+def test_sinks_are_imported_without_bs4():
+    code = "import sys; from parsers import DBSink, JsonLinesSink; assert 'bs4' not in sys.modules, 'bs4 was imported'"
+
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, check=True)
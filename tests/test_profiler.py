@@ -0,0 +1,44 @@
+from parsers import parser_wrapper
+
+
+def test_threads_mode_measures_every_stage_of_a_file(documents_dir, parser_arguments, sqlite_path):
+    html_parser = parser_wrapper.get_parser("html-fast", **parser_arguments, db_type="sqlite",
+                                            execution_mode="threads", profile=True)
+    assert html_parser.parse(documents_dir).inserted == 67
+
+    report = html_parser.profiler.report()
+    assert report["files"] == 67
+    assert report["slowest files"]
+
+    for entry in report["slowest files"]:
+        assert set(entry["stages"]) == {"read", "parse", "extract", "validate", "write"}, entry["file"]
+        assert entry["seconds"] >= sum(entry["stages"].values()) > 0
+
+
+def test_processes_mode_adds_the_write_stage_to_the_files_of_the_workers(documents_dir, parser_arguments,
+                                                                          sqlite_path):
+    html_parser = parser_wrapper.get_parser("html-fast", **parser_arguments, db_type="sqlite",
+                                            execution_mode="processes", max_workers=2, profile=True)
+    assert html_parser.parse(documents_dir).inserted == 67
+
+    report = html_parser.profiler.report()
+    assert report["files"] == 67
+    assert report["slowest files"]
+
+    for entry in report["slowest files"]:
+        assert set(entry["stages"]) == {"read", "parse", "extract", "validate", "write"}, entry["file"]
+        assert entry["seconds"] >= sum(entry["stages"].values()) > 0
+
+
+def test_collapsed_stacks_leave_out_the_frames_of_the_profiler(documents_dir, parser_arguments, sqlite_path):
+    html_parser = parser_wrapper.get_parser("html-fast", **parser_arguments, db_type="sqlite",
+                                            execution_mode="threads", profile=True)
+    html_parser.parse(documents_dir)
+
+    stacks = html_parser.profiler.collapsed_stacks()
+    assert stacks
+
+    for stack in stacks:
+        assert "profiler.py" not in stack and "contextlib.py" not in stack, stack
+        assert "_lsprof.Profiler" not in stack, stack
+        assert "builtins.next" not in stack.split(";")[1], stack
@@ -0,0 +1,45 @@
+import pytest
+from bs4 import BeautifulSoup
+from parsers import parser_wrapper
+
+
+def cells(page_data: dict) -> tuple:
+    header = BeautifulSoup(page_data["header"], "html.parser")
+    body = BeautifulSoup(page_data["body"], "html.parser")
+    footer = BeautifulSoup(page_data["footer"], "html.parser")
+
+    return ([cell.get_text(strip=True) for cell in header.find_all("th")],
+            [[cell.get_text(strip=True) for cell in row.find_all("td")] for row in body.find_all("tr")],
+            " ".join(footer.get_text().split()))
+
+
+@pytest.mark.parametrize("keep_html", [True, False])
+def test_compact_records_read_back_as_html_records(keep_html, documents_dir, parser_arguments, sqlite_manager):
+    html_records = {record["page_data"]["document id"]: record for record in
+                    parser_wrapper.get_parser("html-fast", **parser_arguments).iter_records(documents_dir)}
+
+    compact_parser = parser_wrapper.get_parser("html-fast", **parser_arguments, db_type="sqlite",
+                                               record_format="compact", keep_html=keep_html)
+    assert compact_parser.parse(documents_dir).inserted == 67
+
+    records = list(sqlite_manager.find("html data"))
+    assert len(records) == 67
+
+    for record in records:
+        assert record["format"] == "compact"
+        assert "header" not in record and "body" not in record
+        assert ("html" in record) == keep_html
+
+        expected = html_records[record["document id"]]["page_data"]
+        page_data = compact_parser.read_page(record)
+        page_data.pop("_id")
+
+        if keep_html:
+            assert page_data == expected
+        else:
+            assert {field: value for field, value in page_data.items() if field not in ("header", "body", "footer")} \
+                == {field: value for field, value in expected.items() if field not in ("header", "body", "footer")}
+            assert cells(page_data) == cells(expected)
+
+    assert len(list(sqlite_manager.find("html discrepancies"))) == \
+        sum(len(record["discrepancies"]) for record in html_records.values())
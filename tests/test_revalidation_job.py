@@ -0,0 +1,41 @@
+import pytest
+from parsers import parser_wrapper, RevalidationJob
+
+
+def without_ids(discrepancies: list) -> list:
+    return sorted((repr(sorted((key, value) for key, value in discrepancy.items() if key != "_id"))
+                   for discrepancy in discrepancies))
+
+
+@pytest.mark.parametrize("execution_mode", ["threads", "processes"])
+def test_only_the_discrepancies_of_changed_validators_are_replaced(execution_mode, documents_dir, parser_arguments,
+                                                                   sqlite_manager):
+    parser_wrapper.get_parser("html-fast", **parser_arguments, db_type="sqlite").parse(documents_dir)
+    stored = list(sqlite_manager.find("html discrepancies"))
+    unchanged = [discrepancy for discrepancy in stored if discrepancy["validator"] != "HeaderLengthValidator"]
+
+    html_parser = parser_wrapper.get_parser("html-fast", **parser_arguments, db_type="sqlite", header_max_length=5,
+                                            execution_mode=execution_mode, max_workers=2)
+    job = RevalidationJob(html_parser, batch_size=10)
+
+    assert job.changed_validators() == ["HeaderLengthValidator"]
+
+    summary = job.run()
+    revalidated = list(sqlite_manager.find("html discrepancies"))
+    header_discrepancies = [discrepancy for discrepancy in revalidated
+                            if discrepancy["validator"] == "HeaderLengthValidator"]
+    expected = sum(discrepancy["validator"] == "HeaderLengthValidator"
+                   for record in html_parser.iter_records(documents_dir) for discrepancy in record["discrepancies"])
+
+    assert (summary.parsed, summary.failed, summary.discrepancies) == (67, 0, expected)
+    assert len(header_discrepancies) == expected > sum(discrepancy["validator"] == "HeaderLengthValidator"
+                                                       for discrepancy in stored)
+    assert all(discrepancy["Max Length"] == 5 for discrepancy in header_discrepancies)
+    assert without_ids([discrepancy for discrepancy in revalidated
+                        if discrepancy["validator"] != "HeaderLengthValidator"]) == without_ids(unchanged)
+
+    configs = {record["validator"]: record["config"] for record in sqlite_manager.find("validator configs")}
+
+    assert configs["HeaderLengthValidator"] == html_parser.header_validator.config()
+    assert job.changed_validators() == []
+    assert RevalidationJob(html_parser).run().parsed == 0
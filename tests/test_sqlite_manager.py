@@ -0,0 +1,141 @@
+from threading import Thread, Barrier
+import pytest
+from data_layer import manager_factory, WriteBatcher
+
+
+def test_insert_find_update_delete(sqlite_manager):
+    sqlite_manager.insert("pages", [{"document id": "a", "country": "Chad", "rows": 3},
+                                    {"document id": "b", "country": "Peru", "rows": 5},
+                                    {"document id": "c", "country": "Chad", "rows": 7}])
+
+    assert sorted(page["document id"] for page in sqlite_manager.find("pages", {"country": "Chad"})) == ["a", "c"]
+    assert [page["document id"] for page in sqlite_manager.find("pages", {"rows": {"$gt": 4}},
+                                                                 sort=[("rows", -1)])] == ["c", "b"]
+    assert list(sqlite_manager.find("pages", {"document id": "b"}, projection={"_id": 0, "rows": 1})) == [{"rows": 5}]
+
+    assert sqlite_manager.update("pages", {"country": "Chad"}, "$inc", {"rows": 1}) == 2
+    assert sqlite_manager.update("pages", {"document id": "d"}, "$set", {"rows": 0}, upsert=True) == 1
+    assert sorted(page["rows"] for page in sqlite_manager.find("pages")) == [0, 4, 5, 8]
+
+    assert sqlite_manager.delete("pages", {"document id": {"$in": ["a", "d"]}}) == 2
+    assert sorted(page["document id"] for page in sqlite_manager.find("pages")) == ["b", "c"]
+
+
+def test_unique_index_rejects_duplicates_of_an_unordered_insert(sqlite_manager):
+    sqlite_manager.insert("html data", {"document id": "Table1"})
+    result = sqlite_manager.insert("html data", [{"document id": "Table1"}, {"document id": "Table2"}], ordered=False)
+
+    assert len(result.inserted_ids) == 1
+    assert sorted(page["document id"] for page in sqlite_manager.find("html data")) == ["Table1", "Table2"]
+    assert sqlite_manager.insert("html data", [{"document id": "Table3"}, {"document id": "Table1"}]) is None
+    assert len(list(sqlite_manager.find("html data"))) == 2
+
+
+def test_replace_and_upsert(sqlite_manager):
+    sqlite_manager.insert("summary", [{"key": "a", "count": 1}, {"key": "b", "count": 2}])
+
+    assert sqlite_manager.replace("summary", {}, [{"key": "c", "count": 3}]) == 2
+    assert [record["key"] for record in sqlite_manager.find("summary")] == ["c"]
+
+    records = [{"_id": "1", "value": 1}, {"_id": "2", "value": 2}]
+    sqlite_manager.upsert("values", records)
+    sqlite_manager.upsert("values", records)
+
+    assert sorted(record["value"] for record in sqlite_manager.find("values")) == [1, 2]
+
+
+def test_writes_of_other_threads_are_visible(sqlite_manager, sqlite_path):
+    with WriteBatcher(sqlite_manager, batch_size=1000, flush_interval=0.01) as batcher:
+        batcher.add("pages", {"document id": "a"})
+
+    reader = manager_factory.get_manager("sqlite", db_path=sqlite_path)
+    results = []
+    thread = Thread(target=lambda: results.extend(reader.find("pages")))
+    thread.start()
+    thread.join()
+
+    assert [record["document id"] for record in results] == ["a"]
+
+
+def test_in_memory_database_is_rejected():
+    with pytest.raises(ValueError):
+        manager_factory.get_manager("sqlite", db_path=":memory:")
+
+
+def test_find_on_a_new_collection_creates_its_table(sqlite_manager):
+    assert list(sqlite_manager.find("new collection")) == []
+    assert sqlite_manager.insert("new collection", {"value": 1})
+    assert [record["value"] for record in sqlite_manager.find("new collection")] == [1]
+
+
+def test_rolled_back_table_is_created_again(sqlite_manager):
+    assert sqlite_manager.insert("pages", [{"_id": "1"}, {"_id": "1"}]) is None
+    assert sqlite_manager.insert("pages", {"_id": "1"})
+    assert [record["_id"] for record in sqlite_manager.find("pages")] == ["1"]
+
+
+def test_a_manager_can_be_shared_by_threads(sqlite_manager):
+    def write(thread_number: int):
+        for value in range(50):
+            assert sqlite_manager.insert("pages", {"thread": thread_number, "value": value})
+            assert sqlite_manager.update("pages", {"thread": thread_number, "value": value}, "$inc", {"updates": 1})
+            assert list(sqlite_manager.find("pages", {"thread": thread_number}, limit=1))
+
+    threads = [Thread(target=write, args=(thread_number,)) for thread_number in range(8)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(list(sqlite_manager.find("pages"))) == 400
+    assert all(record["updates"] == 1 for record in sqlite_manager.find("pages"))
+
+
+def test_only_one_of_concurrent_claims_succeeds(sqlite_path):
+    managers = [manager_factory.get_manager("sqlite", db_path=sqlite_path) for _ in range(8)]
+
+    for lease_id in ("new lease", "free lease"):
+        if lease_id == "free lease":
+            assert managers[0].insert("leases", {"_id": lease_id, "state": "free"})
+
+        barrier = Barrier(len(managers))
+        results = {}
+
+        def claim(node: int):
+            barrier.wait()
+            results[node] = managers[node].claim("leases", lease_id, {"state": "free"},
+                                                 {"state": "leased", "owner": node})
+
+        threads = [Thread(target=claim, args=(node,)) for node in range(len(managers))]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        winners = [node for node, claimed in results.items() if claimed]
+        assert len(winners) == 1, lease_id
+        assert [record["owner"] for record in managers[0].find("leases", {"_id": lease_id})] == winners
+
+
+def test_negations_and_exists_treat_missing_and_null_fields_like_mongo(sqlite_manager):
+    sqlite_manager.insert("pages", [{"document id": "a", "country": "Chad"},
+                                    {"document id": "b", "country": "Peru"},
+                                    {"document id": "c", "country": None},
+                                    {"document id": "d"}])
+
+    def find(query):
+        return sorted(page["document id"] for page in sqlite_manager.find("pages", query))
+
+    assert find({"country": {"$ne": "Chad"}}) == ["b", "c", "d"]
+    assert find({"country": {"$ne": None}}) == ["a", "b"]
+    assert find({"country": {"$nin": ["Chad"]}}) == ["b", "c", "d"]
+    assert find({"country": {"$nin": ["Chad", None]}}) == ["b"]
+    assert find({"country": {"$in": ["Chad"]}}) == ["a"]
+    assert find({"country": {"$in": ["Chad", None]}}) == ["a", "c", "d"]
+    assert find({"country": {"$exists": True}}) == ["a", "b", "c"]
+    assert find({"country": {"$exists": False}}) == ["d"]
+    assert find({"_id": {"$exists": True}}) == ["a", "b", "c", "d"]
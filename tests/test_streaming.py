@@ -0,0 +1,57 @@
+import os
+import pytest
+from parsers import parser_wrapper
+from parsers.element_scanner import scan_elements, read_span
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 7, 64, 1024 * 1024])
+def test_scanner_finds_every_table_at_any_block_size(block_size, tables_file):
+    spans = list(scan_elements(tables_file, "table", block_size=block_size))
+
+    assert len(spans) == 67
+    assert spans == list(scan_elements(tables_file, "table"))
+
+    for start, end in spans:
+        table = read_span(tables_file, start, end)
+        assert table.startswith("<table") and table.endswith("</table>")
+
+
+def test_scanner_keeps_nested_tables_in_their_parent(tmp_path):
+    path = tmp_path / "nested.html"
+    path.write_text("<TABLE id='a'><tr><td><table id='b'></table></td></tr></TABLE>\n<table id='c'>")
+
+    assert list(scan_elements(str(path), "table", block_size=3)) == [(0, 62), (63, 77)]
+
+
+def test_streamed_file_is_only_committed_once_every_table_was_written(tables_file, parser_arguments,
+                                                                    sqlite_manager, monkeypatch):
+    from data_layer import SQLiteDBManager
+
+    def parse():
+        return parser_wrapper.get_parser("html-fast", **parser_arguments, db_type="sqlite", stream=True,
+                                         incremental=True, batch_size=10, flush_interval=60).parse(
+            os.path.dirname(tables_file))
+
+    insert = SQLiteDBManager.insert
+    page_inserts = []
+
+    def failing_insert(self, collection_name, data, ordered=True):
+        if collection_name == "html data":
+            page_inserts.append(len(data))
+
+            if len(page_inserts) > 2:
+                return None
+
+        return insert(self, collection_name, data, ordered)
+
+    monkeypatch.setattr(SQLiteDBManager, "insert", failing_insert)
+    summary = parse()
+
+    assert (summary.inserted, summary.failed) == (20, 47)
+
+    monkeypatch.setattr(SQLiteDBManager, "insert", insert)
+    summary = parse()
+
+    assert (summary.skipped, summary.updated, summary.inserted, summary.failed) == (0, 20, 47, 0)
+    assert len(list(sqlite_manager.find("html data"))) == 67
+    assert parse().skipped == 1
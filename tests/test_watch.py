@@ -0,0 +1,184 @@
+import os
+import shutil
+import pytest
+from threading import Thread, Event
+from time import time, sleep, monotonic
+from parsers import parser_wrapper
+from parsers.file_watcher import PollingWatcher, InotifyWatcher, create_watcher
+
+import main
+
+
+def write(path: str, content: str = "<table></table>", age: float = 0):
+    with open(path, 'w') as f:
+        f.write(content)
+
+    if age:
+        os.utime(path, (time() - age, time() - age))
+
+
+def wait_for(condition, timeout: float = 10) -> bool:
+    deadline = monotonic() + timeout
+
+    while not condition():
+        if monotonic() > deadline:
+            return False
+
+        sleep(0.01)
+
+    return True
+
+
+def test_polling_watcher_reports_settled_files_once(tmp_path):
+    write(tmp_path / "existing.html", age=10)
+    watcher = PollingWatcher(str(tmp_path), settle_time=0.2)
+
+    assert watcher.poll(0) == []
+
+    write(tmp_path / "dropped.html")
+    write(tmp_path / ".hidden.html", age=10)
+    write(tmp_path / "other.txt", age=10)
+
+    assert watcher.poll(0) == []
+    assert watcher.poll(2) == [str(tmp_path / "dropped.html")]
+    assert watcher.poll(0.3) == []
+
+    write(tmp_path / "existing.html", "<table>changed</table>", age=10)
+
+    assert watcher.poll(0) == [str(tmp_path / "existing.html")]
+
+
+def test_polling_watcher_waits_for_a_file_that_is_still_written(tmp_path):
+    watcher = PollingWatcher(str(tmp_path), settle_time=1)
+    path = tmp_path / "growing.html"
+
+    with open(path, 'w') as f:
+        for _ in range(5):
+            f.write("<tr>")
+            f.flush()
+            assert watcher.poll(0.05) == []
+
+    assert watcher.poll(3) == [str(path)]
+
+
+def test_inotify_watcher_reports_closed_and_renamed_files(tmp_path):
+    try:
+        watcher = InotifyWatcher(str(tmp_path))
+    except (OSError, AttributeError):
+        pytest.skip("inotify is not available")
+
+    with watcher, open(tmp_path / "open.html", 'w') as f:
+        f.write("<table>")
+        f.flush()
+
+        assert watcher.poll(0.1) == []
+
+        write(tmp_path / ".incoming.html")
+        os.rename(tmp_path / ".incoming.html", tmp_path / "renamed.html")
+
+        assert watcher.poll(1) == [str(tmp_path / "renamed.html")]
+
+        f.close()
+
+        assert watcher.poll(1) == [str(tmp_path / "open.html")]
+
+
+def test_create_watcher_falls_back_to_polling(tmp_path):
+    with create_watcher(str(tmp_path), use_inotify=False, settle_time=0.5) as watcher:
+        assert isinstance(watcher, PollingWatcher)
+        assert watcher.settle_time == 0.5
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_watch_ingests_dropped_files_in_micro_batches(use_inotify, tmp_path, monkeypatch, documents_dir,
+                                                      parser_arguments, sqlite_manager):
+    drop_dir = tmp_path / "drop"
+    drop_dir.mkdir()
+    file_names = sorted(os.listdir(documents_dir))
+
+    for file_name in file_names[:7]:
+        shutil.copy(os.path.join(documents_dir, file_name), drop_dir / file_name)
+
+    html_parser = parser_wrapper.get_parser("html-fast", **parser_arguments, db_type="sqlite")
+    batches = []
+    ingest_batch = html_parser.ingest_batch
+    monkeypatch.setattr(html_parser, "ingest_batch", lambda files, *args: batches.append(files) or
+                        ingest_batch(files, *args))
+
+    stop_event = Event()
+    results = []
+    watcher = Thread(target=lambda: results.append(html_parser.watch(str(drop_dir), stop_event=stop_event,
+                                                                     use_inotify=use_inotify, poll_interval=0.05,
+                                                                     settle_time=0.1, max_batch_size=10)))
+    watcher.start()
+
+    try:
+        assert wait_for(lambda: len(list(sqlite_manager.find("html data"))) == 7)
+
+        for file_name in file_names[7:]:
+            shutil.copy(os.path.join(documents_dir, file_name), drop_dir / f".{file_name}")
+            os.rename(drop_dir / f".{file_name}", drop_dir / file_name)
+
+        assert wait_for(lambda: len(list(sqlite_manager.find("html data"))) == 67)
+    finally:
+        stop_event.set()
+        watcher.join()
+
+    assert results[0].inserted == 67
+    assert all(len(batch) <= 10 for batch in batches)
+    assert sorted(os.path.basename(file_name) for batch in batches for file_name in batch) == file_names
+
+
+def test_watch_drains_the_files_that_are_there_on_shutdown(tmp_path, documents_dir, parser_arguments,
+                                                           sqlite_manager):
+    drop_dir = tmp_path / "drop"
+    shutil.copytree(documents_dir, drop_dir)
+    stop_event = Event()
+    stop_event.set()
+
+    summary = parser_wrapper.get_parser("html-fast", **parser_arguments, db_type="sqlite",
+                                        batch_writes=True).watch(str(drop_dir), stop_event=stop_event,
+                                                                 use_inotify=False, max_batch_size=16)
+
+    assert summary.inserted == 67
+    assert len(list(sqlite_manager.find("html data"))) == 67
+
+
+def test_the_cli_watches_the_source_directory(monkeypatch, tmp_path):
+    from parsers.parser_implementations.html_parser import HTMLParser
+
+    watched = []
+    monkeypatch.setattr(HTMLParser, "watch", lambda self, dir_path, use_inotify: watched.append((dir_path,
+                                                                                                   use_inotify)))
+
+    main.main([str(tmp_path), "--watch", "--poll", "--db", "memory", "--parser", "html-fast"])
+
+    assert watched == [(str(tmp_path), False)]
+
+    with pytest.raises(SystemExit):
+        main.parse_arguments([str(tmp_path), "--watch", "--output", "records.jsonl"])
+
+
+def test_watch_keeps_a_single_process_pool(tmp_path, monkeypatch, documents_dir, parser_arguments, sqlite_manager):
+    from concurrent.futures import ProcessPoolExecutor
+    from parsers.parser_implementations import html_parser
+
+    pools = []
+
+    class CountingPool(ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            pools.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(html_parser, "ProcessPoolExecutor", CountingPool)
+    drop_dir = tmp_path / "drop"
+    shutil.copytree(documents_dir, drop_dir)
+    stop_event = Event()
+    stop_event.set()
+
+    summary = parser_wrapper.get_parser("html-fast", **parser_arguments, db_type="sqlite", max_workers=2,
+                                        execution_mode="processes").watch(str(drop_dir), stop_event=stop_event,
+                                                                          use_inotify=False, max_batch_size=10)
+
+    assert summary.inserted == 67
+    assert len(pools) == 1
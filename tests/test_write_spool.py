@@ -0,0 +1,149 @@
+import os
+import json
+from glob import glob
+from data_layer import WriteSpool
+
+
+class FlakyDB:
+    """Drains into a real db only while it is available, and only for the first `limit` batches if one is set.
+    """
+
+    def __init__(self, db_manager, available: bool = True, limit: int | None = None):
+        self.db_manager = db_manager
+        self.available = available
+        self.limit = limit
+
+    def generate_id(self):
+        return self.db_manager.generate_id()
+
+    def upsert(self, collection_name: str, data: list):
+        if not self.available or self.limit == 0:
+            return None
+
+        if self.limit is not None:
+            self.limit -= 1
+
+        return self.db_manager.upsert(collection_name, data)
+
+
+def stored_values(db_manager) -> list:
+    return sorted(record["value"] for record in db_manager.find("records"))
+
+
+def test_spooled_records_survive_an_unavailable_db(tmp_path, sqlite_manager):
+    spool_dir = str(tmp_path / "spool")
+    spool = WriteSpool(spool_dir, FlakyDB(sqlite_manager, available=False), batch_size=10,
+                       retry_initial_delay=0.01, retry_max_delay=0.01)
+
+    for value in range(50):
+        spool.add("records", {"value": value})
+
+    spool.close(timeout=0.1)
+
+    assert stored_values(sqlite_manager) == []
+    assert glob(os.path.join(spool_dir, "segment-*.log"))
+
+    with open(sorted(glob(os.path.join(spool_dir, "segment-*.log")))[-1], "ab") as segment:
+        segment.write(b"\x10\x00\x00\x00torn")
+
+    WriteSpool(spool_dir, FlakyDB(sqlite_manager), batch_size=10).close()
+
+    assert stored_values(sqlite_manager) == list(range(50))
+    assert not glob(os.path.join(spool_dir, "segment-*.log"))
+
+
+def test_records_drained_before_the_checkpoint_are_not_duplicated(tmp_path, sqlite_manager):
+    spool_dir = str(tmp_path / "spool")
+    spool = WriteSpool(spool_dir, FlakyDB(sqlite_manager, available=False), batch_size=10,
+                       retry_initial_delay=0.01, retry_max_delay=0.01)
+
+    for value in range(30):
+        spool.add("records", {"value": value})
+
+    spool.close(timeout=0.1)
+    WriteSpool(spool_dir, FlakyDB(sqlite_manager, limit=2), batch_size=10,
+               retry_initial_delay=0.01, retry_max_delay=0.01).close(timeout=0.1)
+
+    assert stored_values(sqlite_manager) == list(range(20))
+
+    with open(os.path.join(spool_dir, "checkpoint.json"), "r") as f:
+        checkpoint = json.load(f)
+
+    assert checkpoint["offset"] > 0
+
+    with open(os.path.join(spool_dir, "checkpoint.json"), "w") as f:
+        json.dump({**checkpoint, "offset": 0}, f)
+
+    WriteSpool(spool_dir, FlakyDB(sqlite_manager), batch_size=10).close()
+
+    assert stored_values(sqlite_manager) == list(range(30))
+
+
+def test_parse_returns_during_an_outage_and_reports_what_stays_spooled(tmp_path, monkeypatch, documents_dir,
+                                                                      parser_arguments, sqlite_manager):
+    from data_layer.sqlite.sqlite_manager import SQLiteDBManager
+    from parsers import parser_wrapper
+    from parsers.parser_implementations import html_parser
+
+    spool_dir = str(tmp_path / "spool")
+
+    def parse():
+        return parser_wrapper.get_parser("html-fast", **parser_arguments, db_type="sqlite",
+                                         spool_dir=spool_dir).parse(documents_dir)
+
+    with monkeypatch.context() as outage:
+        outage.setattr(SQLiteDBManager, "upsert", lambda self, collection_name, data: None)
+        outage.setattr(html_parser, "SPOOL_CLOSE_TIMEOUT", 0.2)
+        summary = parse()
+
+    assert (summary.inserted, summary.spooled) == (0, 67)
+    assert list(sqlite_manager.find("html data")) == []
+
+    summary = parse()
+
+    assert (summary.inserted, summary.failed, summary.spooled) == (67, 67, 0)
+    assert len(list(sqlite_manager.find("html data"))) == 67
+
+
+def test_drain_waits_until_the_records_reach_the_db(tmp_path, sqlite_manager):
+    flaky_db = FlakyDB(sqlite_manager, available=False)
+    flushed = []
+    spool = WriteSpool(str(tmp_path / "spool"), flaky_db, batch_size=10, flush_interval=0.01,
+                       retry_initial_delay=0.01, retry_max_delay=0.01,
+                       on_flush=lambda collection_name, records, success: flushed.extend(records))
+
+    for value in range(25):
+        spool.add("records", {"value": value})
+
+    assert not spool.drain(timeout=0.1)
+    assert spool.pending == {"records": 25}
+
+    flaky_db.available = True
+
+    assert spool.drain()
+    assert stored_values(sqlite_manager) == list(range(25))
+    assert len(flushed) == 25
+    assert spool.pending == {}
+
+    spool.close()
+
+
+def test_a_node_gives_up_its_leases_when_its_writes_do_not_drain(tmp_path, monkeypatch, documents_dir,
+                                                                 parser_arguments, sqlite_manager):
+    from data_layer.sqlite.sqlite_manager import SQLiteDBManager
+    from parsers import parser_wrapper
+    from parsers.parser_implementations import html_parser
+
+    monkeypatch.setattr(SQLiteDBManager, "upsert", lambda self, collection_name, data: None)
+    monkeypatch.setattr(html_parser, "SPOOL_CLOSE_TIMEOUT", 0.1)
+    monkeypatch.setattr(html_parser, "SPOOL_DRAIN_TIMEOUT", 0.1)
+
+    summary = parser_wrapper.get_parser("html-fast", **parser_arguments, db_type="sqlite",
+                                        spool_dir=str(tmp_path / "spool"), distributed_run="outage",
+                                        lease_batch_size=10).parse(documents_dir)
+    leases = list(sqlite_manager.find("ingest leases"))
+
+    assert len(leases) == 1
+    # nodes start at different batches, the claimed one may be the last batch of 7 files
+    assert summary.parsed == summary.spooled == len(leases[0]["files"])
+    assert (leases[0]["state"], leases[0]["expires"]) == ("leased", 0)
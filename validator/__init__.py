@@ -1,3 +1,21 @@
+from importlib import import_module
 from .document_validator import ValidatorStrategy, DocumentValidator
-from .validation_enum import ValidationStatus
+from .validation_enum import ValidationStatus, ValidationPolicy
+from .document_view import DocumentView, DocumentIndex
+from .composite_validator import CompositeValidator
 from .validators import DateValidator, TotalSumValidator, HeaderLengthValidator
+
+LAZY_ATTRIBUTES = {"TableArray": "validator.table_array",
+                   "TableBatch": "validator.table_array",
+                   "NumericValidator": "validator.validators.numeric_validators",
+                   "RowTotalValidator": "validator.validators.numeric_validators",
+                   "ColumnTotalValidator": "validator.validators.numeric_validators",
+                   "CellBoundsValidator": "validator.validators.numeric_validators",
+                   "OutlierValidator": "validator.validators.numeric_validators"}
+
+
+def __getattr__(name: str):
+    if name in LAZY_ATTRIBUTES:
+        return getattr(import_module(LAZY_ATTRIBUTES[name]), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,98 @@
+from typing import Tuple, Dict, List
+from time import perf_counter
+from instrumentation import metrics
+from validator.document_view import DocumentView
+from validator.validation_enum import ValidationStatus, ValidationPolicy
+from validator.document_validator import ValidatorStrategy
+
+validator_seconds = metrics.histogram("validator_seconds", "Latency of every validator on a single document.")
+validator_findings = metrics.counter("validator_findings_total", "Findings by validator and status.")
+
+
+class CompositeValidator(ValidatorStrategy):
+    def __init__(self, validators: List[ValidatorStrategy] | None = None,
+                 policy: ValidationPolicy = ValidationPolicy.COLLECT_ALL):
+        """Runs every registered validator over the DocumentView of a document, which is extracted only once.
+
+        Args:
+            validators: The validators to register up front, more can be added with `register`.
+            policy: COLLECT_ALL runs every validator, SHORT_CIRCUIT stops at the first finding.
+        """
+
+        self.validators: List[ValidatorStrategy] = []
+        self.policy: ValidationPolicy = policy
+
+        for validator in validators or []:
+            self.register(validator)
+
+    def register(self, validator: ValidatorStrategy) -> ValidatorStrategy:
+        self.validators.append(validator)
+
+        return validator
+
+    def validate(self, document: DocumentView) -> Tuple[ValidationStatus, Dict[str, list]]:
+        """Validates the document with every registered validator.
+
+        Returns:
+            VALID with an empty findings list if no validator found a problem, otherwise the status of the first
+            finding along with the details of every finding, each marked with its "discrepancy_type" and "validator".
+        """
+
+        findings = []
+
+        for validator in self.validators:
+            start = perf_counter()
+            status, details = validator.validate(document)
+            validator_seconds.observe(perf_counter() - start, validator=validator.name)
+
+            if status != ValidationStatus.VALID:
+                validator_findings.inc(validator=validator.name, status=status.value)
+                details.update({"discrepancy_type": status.value,
+                                "validator": validator.name})
+                findings.append(details)
+
+                if self.policy == ValidationPolicy.SHORT_CIRCUIT:
+                    break
+
+        status = ValidationStatus(findings[0]["discrepancy_type"]) if findings else ValidationStatus.VALID
+
+        return status, {"findings": findings}
+
+    def validate_batch(self, documents: List[DocumentView]) -> list:
+        """Validates a batch of documents, validators that implement `validate_batch` (e.g. the numeric validators)
+        evaluate the whole batch in a single call, the others validate one document at a time.
+
+        Returns:
+            The result of `validate` for every document, in order.
+        """
+
+        findings = [[] for _ in documents]
+        stopped = [False] * len(documents)
+
+        for validator in self.validators:
+            pending = [position for position in range(len(documents)) if not stopped[position]]
+
+            if not pending:
+                break
+
+            start = perf_counter()
+
+            if hasattr(validator, "validate_batch"):
+                results = validator.validate_batch([documents[position] for position in pending])
+            else:
+                results = [validator.validate(documents[position]) for position in pending]
+
+            validator_seconds.observe((perf_counter() - start) / len(pending), validator=validator.name)
+
+            for position, (status, details) in zip(pending, results):
+                if status != ValidationStatus.VALID:
+                    validator_findings.inc(validator=validator.name, status=status.value)
+                    details.update({"discrepancy_type": status.value,
+                                    "validator": validator.name})
+                    findings[position].append(details)
+
+                    if self.policy == ValidationPolicy.SHORT_CIRCUIT:
+                        stopped[position] = True
+
+        return [(ValidationStatus(document_findings[0]["discrepancy_type"]) if document_findings
+                 else ValidationStatus.VALID, {"findings": document_findings}) for document_findings in findings]
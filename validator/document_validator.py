@@ -6,6 +6,17 @@ class ValidatorStrategy(ABC):
     def validate(self, document):
         pass
 
+    @property
+    def name(self) -> str:
+        return self.__class__.__name__
+
+    def config(self) -> dict:
+        """The settings of the validator, its findings on a document can only change if they do.
+        """
+
+        return {setting: value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+                for setting, value in vars(self).items()}
+
 
 class DocumentValidator:
     def __init__(self, validation_strategy: ValidatorStrategy):
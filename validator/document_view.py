@@ -0,0 +1,108 @@
+from datetime import datetime
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+from typing import Dict, List
+
+
+class DocumentIndex:
+    def __init__(self, document: BeautifulSoup):
+        """Indexes the first occurrence of every tag of a document in a single walk over its tree.
+        It answers `find(tag)` the way BeautifulSoup does.
+
+        Args:
+            document: The parsed document that is to be indexed.
+        """
+
+        self.document: BeautifulSoup = document
+        self.tags: Dict[str, Tag] = {}
+
+        for tag in document.descendants:
+            if isinstance(tag, Tag) and tag.name not in self.tags:
+                self.tags[tag.name] = tag
+
+    def find(self, name: str) -> Tag | None:
+        return self.tags.get(name)
+
+
+class DocumentView:
+    __slots__ = ("title", "header_text", "header_cells", "rows", "footer_text", "creation_date", "country",
+                 "_table")
+
+    def __init__(self, title: str | None = None,
+                 header_text: str | None = None,
+                 header_cells: List[str] | None = None,
+                 rows: List[List[str]] | None = None,
+                 footer_text: str | None = None,
+                 creation_date: datetime | None = None,
+                 country: str | None = None):
+        """The compact, plain data of a document that the validators work on, so the parsed tree can be freed as soon
+        as it is extracted. A field is None if its tag was not found in the document.
+
+        Args:
+            title: The text of the title.
+            header_text: The text of the header.
+            header_cells: The text of every 'th' cell of the header.
+            rows: The stripped text of every 'td' cell of every row of the body.
+            footer_text: The text of the footer.
+            creation_date: The creation date that was parsed from the footer.
+            country: The country that was parsed from the footer.
+        """
+
+        self.title: str | None = title
+        self.header_text: str | None = header_text
+        self.header_cells: List[str] | None = header_cells
+        self.rows: List[List[str]] | None = rows
+        self.footer_text: str | None = footer_text
+        self.creation_date: datetime | None = creation_date
+        self.country: str | None = country
+        self._table = None
+
+    @property
+    def first_row(self) -> List[str]:
+        return self.rows[0] if self.rows else []
+
+    @property
+    def table(self):
+        """The rows as a TableArray, built on first use and shared by every numeric validator. Requires numpy.
+        """
+
+        if self._table is None:
+            from validator.table_array import TableArray
+
+            self._table = TableArray(self.rows or [], header_cells=self.header_cells)
+
+        return self._table
+
+    @classmethod
+    def from_document(cls, document,
+                      title_tag: str = "title",
+                      head_tag: str = "head",
+                      body_tag: str = "body",
+                      footer_tag: str = "footer",
+                      creation_date: datetime | None = None,
+                      country: str | None = None):
+        """Builds the view of a parsed document.
+
+        Args:
+            document: Anything that answers `find(tag)` like BeautifulSoup, e.g. a DocumentIndex.
+            title_tag: The tag of the title.
+            head_tag: The tag of the header.
+            body_tag: The tag that contains the rows.
+            footer_tag: The tag of the footer.
+            creation_date: The creation date that was parsed from the footer.
+            country: The country that was parsed from the footer.
+        """
+
+        title = document.find(title_tag)
+        header = document.find(head_tag)
+        body = document.find(body_tag)
+        footer = document.find(footer_tag)
+
+        return cls(title=title.text if title is not None else None,
+                   header_text=header.text if header is not None else None,
+                   header_cells=[th.text for th in header.find_all('th')] if header is not None else None,
+                   rows=[[td.text.strip() for td in tr.find_all('td')] for tr in body.find_all('tr')]
+                   if body is not None else None,
+                   footer_text=footer.text if footer is not None else None,
+                   creation_date=creation_date,
+                   country=country)
@@ -0,0 +1,118 @@
+from typing import List
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError("The numeric validators need numpy, install it with `pip install numpy`")
+
+
+def parse_cells(cells: List[str]):
+    """Parses the text of cells into numbers in one call if all of them are numeric, otherwise cell by cell.
+
+    Returns:
+        A float64 array of the numbers, NaN where a cell is not a finite number.
+    """
+
+    try:
+        values = np.array(cells, dtype=np.float64)
+    except ValueError:
+        values = np.array([parse_number(cell) for cell in cells], dtype=np.float64)
+
+    values[~np.isfinite(values)] = np.nan
+
+    return values
+
+
+def parse_number(cell: str) -> float:
+    try:
+        return float(cell)
+    except ValueError:
+        return np.nan
+
+
+class TableArray:
+    __slots__ = ("values", "mask", "header_cells")
+
+    def __init__(self, rows: List[List[str]], header_cells: List[str] | None = None):
+        """The rows of a table as a two dimensional array that the numeric validators evaluate in single vectorized
+        operations. Rows that are shorter than the widest one are padded.
+
+        Args:
+            rows: The stripped text of every cell of every row, e.g. `DocumentView.rows`.
+            header_cells: The text of every header cell, used to name the columns in discrepancies.
+
+        Raises:
+            ImportError: If numpy is not installed.
+        """
+
+        require_numpy()
+
+        width = max(map(len, rows), default=0)
+        cells = [cell for row in rows for cell in row] if all(len(row) == width for row in rows) else \
+            [row[i] if i < len(row) else "" for row in rows for i in range(width)]
+
+        self.values = parse_cells(cells).reshape(len(rows), width)
+        self.mask = np.isnan(self.values)
+        self.header_cells: List[str] | None = header_cells
+
+    @property
+    def shape(self) -> tuple:
+        return self.values.shape
+
+    def column_name(self, column: int) -> str | None:
+        """The stripped text of the header cell of a column, if the header has one for it.
+        """
+
+        if self.header_cells and column < len(self.header_cells):
+            return self.header_cells[column].strip()
+
+        return None
+
+
+class TableBatch:
+    def __init__(self, tables: List[TableArray]):
+        """Stacks the rows of several tables into a single array, so a validator evaluates a whole batch of documents
+        in one call. Tables are padded to the widest one and must have at least one row.
+
+        Args:
+            tables: The TableArray of every document of the batch.
+        """
+
+        require_numpy()
+
+        self.tables: List[TableArray] = tables
+        self.row_counts = np.array([table.shape[0] for table in tables], dtype=np.intp)
+        self.row_offsets = np.concatenate(([0], np.cumsum(self.row_counts)[:-1])).astype(np.intp)
+        width = max((table.shape[1] for table in tables), default=0)
+        self.values = np.full((int(self.row_counts.sum()), width), np.nan)
+
+        for table, offset in zip(tables, self.row_offsets):
+            self.values[offset:offset + table.shape[0], :table.shape[1]] = table.values
+
+        self.mask = np.isnan(self.values)
+        self.documents = np.repeat(np.arange(len(tables)), self.row_counts)
+
+    def document_sums(self, values):
+        """Sums the rows of every document, e.g. into the column totals of every document.
+
+        Returns:
+            An array with a row for every document.
+        """
+
+        return np.add.reduceat(values, self.row_offsets, axis=0)
+
+    def locate(self, rows) -> tuple:
+        """Translates rows of the batch into their documents and their rows within them.
+
+        Returns:
+            A tuple of the (document indices, row indices within the documents).
+        """
+
+        documents = self.documents[rows]
+
+        return documents, rows - self.row_offsets[documents]
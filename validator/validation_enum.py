@@ -7,3 +7,8 @@ class ValidationStatus(Enum):
     ERROR = "ERROR"
     NOT_FOUND = "NOT_FOUND"
     NOT_PROCESSED = "NOT_PROCESSED"
+
+
+class ValidationPolicy(Enum):
+    COLLECT_ALL = "COLLECT_ALL"
+    SHORT_CIRCUIT = "SHORT_CIRCUIT"
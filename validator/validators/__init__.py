@@ -1,3 +1,14 @@
+from importlib import import_module
 from .date_validator import DateValidator
 from .header_validator import HeaderLengthValidator
 from .total_sum_validator import TotalSumValidator
+
+LAZY_ATTRIBUTES = {"NumericValidator", "RowTotalValidator", "ColumnTotalValidator", "CellBoundsValidator",
+                   "OutlierValidator"}
+
+
+def __getattr__(name: str):
+    if name in LAZY_ATTRIBUTES:
+        return getattr(import_module("validator.validators.numeric_validators"), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,10 +1,9 @@
 import re
 from datetime import datetime
-from bs4.element import Tag
-from bs4 import BeautifulSoup
 from typing import Tuple, Dict
 from validator import ValidationStatus
 from validator import ValidatorStrategy
+from validator.document_view import DocumentView
 
 
 class DateValidator(ValidatorStrategy):
@@ -17,26 +16,27 @@ class DateValidator(ValidatorStrategy):
         self.date_format: str = date_format
         self.footer_tag: str = footer_tag
 
-    def validate(self, document: BeautifulSoup) -> Tuple[ValidationStatus, Dict[str, str]]:
-        footer: Tag = document.find(self.footer_tag)
+    def validate(self, document: DocumentView) -> Tuple[ValidationStatus, Dict[str, str]]:
+        """Validates the creation date of the document, the date is only searched for in the footer's text if the
+        parser did not already extract it into document.creation_date.
+        """
 
-        if footer is None:
+        if document.footer_text is None:
             return (ValidationStatus.NOT_FOUND, {"Footer Tag Not Found": self.footer_tag,
                                                  "Location": self.footer_tag})
 
-        footer_text: str = footer.text
+        footer_text: str = document.footer_text
 
         if not footer_text:
             response: tuple = (ValidationStatus.NOT_PROCESSED, {"Footer Tag Empty": footer_text,
                                                                 "Location": self.footer_tag})
         else:
-            match = re.search(self.date_regex, footer.text)
+            match = document.creation_date or re.search(self.date_regex, footer_text)
 
             if match:
-                date = match.group()
-
                 try:
-                    date = datetime.strptime(date, self.date_format)
+                    date = match if isinstance(match, datetime) else datetime.strptime(match.group(),
+                                                                                        self.date_format)
 
                     if date > self.max_date:
                         response: tuple = (ValidationStatus.INVALID,
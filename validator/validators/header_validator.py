@@ -1,8 +1,7 @@
-from bs4.element import Tag
-from bs4 import BeautifulSoup
 from typing import Tuple, Dict
 from validator import ValidationStatus
 from validator import ValidatorStrategy
+from validator.document_view import DocumentView
 
 
 class HeaderLengthValidator(ValidatorStrategy):
@@ -10,20 +9,18 @@ class HeaderLengthValidator(ValidatorStrategy):
         self.header_max_length: int = header_max_length
         self.header_tag: str = header_tag
 
-    def validate(self, document: BeautifulSoup) -> Tuple[ValidationStatus, Dict[str, str]]:
-        header: Tag = document.find(self.header_tag)
-
-        if header is None:
+    def validate(self, document: DocumentView) -> Tuple[ValidationStatus, Dict[str, str]]:
+        if document.header_text is None:
             return (ValidationStatus.NOT_FOUND, {"Header Tag Not Found": self.header_tag,
                                                  "Location": self.header_tag})
 
         try:
             header_content: str = ""
             if self.header_tag == "thead":
-                for th in header.find_all('th'):
-                    header_content += th.text
+                for th in document.header_cells:
+                    header_content += th
             else:
-                header_content: str = header.text
+                header_content: str = document.header_text
         except Exception as e:
             response: tuple = (ValidationStatus.ERROR, {"Error Details": e,
                                                         "Location": self.header_tag})
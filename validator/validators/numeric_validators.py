@@ -0,0 +1,221 @@
+import math
+from abc import abstractmethod
+from typing import Tuple, Dict, List
+from validator import ValidationStatus
+from validator import ValidatorStrategy
+from validator.document_view import DocumentView
+from validator.table_array import TableBatch, np, require_numpy
+
+MAX_REPORTED = 100
+
+
+def plain_number(value) -> int | float:
+    """Converts a numpy number into a plain python one that every db can store, integral values into an int.
+    """
+
+    value = float(value)
+
+    return int(value) if value.is_integer() else value
+
+
+def min_outlier_count(max_z_score: float) -> int:
+    """The fewest cells a column needs for one of them to have a population z-score above max_z_score.
+    """
+
+    return math.floor(max_z_score ** 2) + 2
+
+
+class NumericValidator(ValidatorStrategy):
+    def __init__(self, row_container: str = "tbody", max_reported: int = MAX_REPORTED):
+        """The base of the validators that evaluate the numeric cells of every row and column of a table with
+        vectorized numpy operations, over the TableArray of a document or over a whole batch of documents at once.
+        A discrepancy names the row and column coordinates (zero based, in the cells of the body) of what it found.
+
+        Args:
+            row_container: The tag that contains the rows, only used to locate discrepancies.
+            max_reported: The maximal number of coordinates reported in a single discrepancy, the "Count" of a
+                discrepancy is the number of all of them.
+
+        Raises:
+            ImportError: If numpy is not installed.
+        """
+
+        require_numpy()
+
+        self.row_container: str = row_container
+        self.max_reported: int = max_reported
+
+    def validate(self, document: DocumentView) -> Tuple[ValidationStatus, Dict[str, str]]:
+        return self.validate_batch([document])[0]
+
+    def validate_batch(self, documents: List[DocumentView]) -> list:
+        """Validates a batch of documents with a single evaluation of the check.
+
+        Returns:
+            A (status, details) tuple for every document, in order.
+        """
+
+        results = [None] * len(documents)
+        tables = []
+        positions = []
+
+        for position, document in enumerate(documents):
+            if document.rows is None:
+                results[position] = (ValidationStatus.NOT_FOUND, {"Row Container Not Found": self.row_container,
+                                                                  "Location": self.row_container})
+            elif document.table.mask.all():
+                results[position] = (ValidationStatus.NOT_PROCESSED, {"No Numeric Cells": document.rows,
+                                                                      "Location": self.row_container})
+            else:
+                tables.append(document.table)
+                positions.append(position)
+
+        if tables:
+            for position, result in zip(positions, self.check(TableBatch(tables))):
+                results[position] = result
+
+        return results
+
+    @abstractmethod
+    def check(self, batch: TableBatch) -> list:
+        """Evaluates a batch of tables that each have at least one numeric cell.
+
+        Returns:
+            A (status, details) tuple for every table of the batch, in order.
+        """
+
+        raise NotImplementedError(f"Function `check` is not implemented for: {self.__class__.__name__}")
+
+    def results(self, batch: TableBatch, finding: str, settings: dict, documents, coordinates: dict) -> list:
+        """Groups what was found by document into a result for every table of the batch.
+
+        Args:
+            batch: The evaluated batch.
+            finding: The key of the finding in the details of an invalid result.
+            settings: The settings the finding is reported along with, e.g. {"Max Total": 100}.
+            documents: The sorted index of the document of everything that was found.
+            coordinates: The name of every coordinate or value that is reported, e.g. "Row", to an array of it. The
+                header of a "Column" is reported along with it.
+        """
+
+        results = []
+        bounds = np.searchsorted(documents, np.arange(len(batch.tables) + 1))
+
+        for document, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+            if start == end:
+                results.append((ValidationStatus.VALID, {"Location": self.row_container}))
+                continue
+
+            found = []
+
+            for i in range(start, min(end, start + self.max_reported)):
+                entry = {name: plain_number(values[i]) for name, values in coordinates.items()}
+
+                if "Column" in entry:
+                    entry["Header"] = batch.tables[document].column_name(entry["Column"])
+
+                found.append(entry)
+
+            results.append((ValidationStatus.INVALID, {finding: {**settings, "Count": int(end - start),
+                                                                 "Found": found},
+                                                       "Location": self.row_container}))
+
+        return results
+
+
+class RowTotalValidator(NumericValidator):
+    def __init__(self, max_sum: int, row_container: str = "tbody", max_reported: int = MAX_REPORTED):
+        """Finds every row whose numeric cells add up to more than max_sum.
+        """
+
+        super().__init__(row_container=row_container, max_reported=max_reported)
+        self.max_sum: int = max_sum
+
+    def check(self, batch: TableBatch) -> list:
+        totals = np.nansum(batch.values, axis=1)
+        rows = np.flatnonzero(totals > self.max_sum)
+        documents, document_rows = batch.locate(rows)
+
+        return self.results(batch, "Row Total Sum Greater Than Max", {"Max Total": self.max_sum}, documents,
+                            {"Row": document_rows, "Total": totals[rows]})
+
+
+class ColumnTotalValidator(NumericValidator):
+    def __init__(self, max_sum: int, row_container: str = "tbody", max_reported: int = MAX_REPORTED):
+        """Finds every column whose numeric cells add up to more than max_sum.
+        """
+
+        super().__init__(row_container=row_container, max_reported=max_reported)
+        self.max_sum: int = max_sum
+
+    def check(self, batch: TableBatch) -> list:
+        totals = batch.document_sums(np.where(batch.mask, 0, batch.values))
+        counts = batch.document_sums((~batch.mask).astype(np.intp))
+        documents, columns = np.nonzero((totals > self.max_sum) & (counts > 0))
+
+        return self.results(batch, "Column Total Sum Greater Than Max", {"Max Total": self.max_sum}, documents,
+                            {"Column": columns, "Total": totals[documents, columns]})
+
+
+class CellBoundsValidator(NumericValidator):
+    def __init__(self, min_value: float | None = None,
+                 max_value: float | None = None,
+                 row_container: str = "tbody",
+                 max_reported: int = MAX_REPORTED):
+        """Finds every numeric cell that is smaller than min_value or greater than max_value.
+        """
+
+        super().__init__(row_container=row_container, max_reported=max_reported)
+        self.min_value: float | None = min_value
+        self.max_value: float | None = max_value
+
+    def check(self, batch: TableBatch) -> list:
+        outside = np.zeros(batch.values.shape, dtype=bool)
+
+        with np.errstate(invalid="ignore"):
+            if self.min_value is not None:
+                outside |= batch.values < self.min_value
+
+            if self.max_value is not None:
+                outside |= batch.values > self.max_value
+
+        rows, columns = np.nonzero(outside)
+        documents, document_rows = batch.locate(rows)
+
+        return self.results(batch, "Cell Value Out Of Bounds", {"Min Value": self.min_value,
+                                                                "Max Value": self.max_value}, documents,
+                            {"Row": document_rows, "Column": columns, "Value": batch.values[rows, columns]})
+
+
+class OutlierValidator(NumericValidator):
+    def __init__(self, max_z_score: float = 3.0,
+                 min_count: int | None = None,
+                 row_container: str = "tbody",
+                 max_reported: int = MAX_REPORTED):
+        """Finds every numeric cell that is more than max_z_score standard deviations away from the mean of its
+        column. Columns with fewer than min_count numeric cells are not checked.
+        The z-score uses the population standard deviation of the column, so in a column of n cells it is at most
+        sqrt(n - 1) and no cell can be flagged in a column of max_z_score ** 2 + 1 cells or fewer, e.g. 10 cells
+        for 3.0. min_count defaults to the smallest count above that, e.g. 11 cells for 3.0.
+        """
+
+        super().__init__(row_container=row_container, max_reported=max_reported)
+        self.max_z_score: float = max_z_score
+        self.min_count: int = min_count if min_count is not None else min_outlier_count(max_z_score)
+
+    def check(self, batch: TableBatch) -> list:
+        counts = batch.document_sums((~batch.mask).astype(np.intp))
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = batch.document_sums(np.where(batch.mask, 0, batch.values)) / counts
+            deviations = np.where(batch.mask, 0, batch.values - means[batch.documents])
+            deviations_std = np.sqrt(batch.document_sums(deviations ** 2) / counts)
+            z_scores = np.abs(deviations) / deviations_std[batch.documents]
+            outliers = (z_scores > self.max_z_score) & (counts[batch.documents] >= self.min_count) & ~batch.mask
+
+        rows, columns = np.nonzero(outliers)
+        documents, document_rows = batch.locate(rows)
+
+        return self.results(batch, "Cell Value Is An Outlier", {"Max Z Score": self.max_z_score}, documents,
+                            {"Row": document_rows, "Column": columns, "Value": batch.values[rows, columns],
+                             "Z Score": z_scores[rows, columns]})
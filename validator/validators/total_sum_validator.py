@@ -1,8 +1,7 @@
-from bs4.element import Tag
-from bs4 import BeautifulSoup
 from typing import Tuple, Dict
 from validator import ValidationStatus
 from validator import ValidatorStrategy
+from validator.document_view import DocumentView
 
 
 class TotalSumValidator(ValidatorStrategy):
@@ -10,12 +9,11 @@ class TotalSumValidator(ValidatorStrategy):
         self.max_sum: int = max_sum
         self.row_container = row_container
 
-    def validate(self, document: BeautifulSoup) -> Tuple[ValidationStatus, Dict[str, str]]:
+    def validate(self, document: DocumentView) -> Tuple[ValidationStatus, Dict[str, str]]:
         total_row_sum: int = 0
-        body: Tag = document.find(self.row_container)
 
-        if body:
-            first_row_values: list = [td.text.strip() for td in body.find('tr').find_all('td')]
+        if document.rows is not None:
+            first_row_values: list = document.first_row
         else:
             return (ValidationStatus.NOT_FOUND, {"Row Container Not Found": self.row_container,
                                                  "Location": self.row_container})